@@ -1,781 +1,388 @@
-import pygame
-import random
 import time
 
-# ============================================
-# INITIALIZE PYGAME
-# ============================================
-pygame.init()
-pygame.mixer.init()
+# Taken before anything else is imported, so --profile-startup counts imports too
+launch_time = time.perf_counter()
+
+import argparse
+import asyncio
+
+import pygame
+
+from colors import GRAY
+from game_sim import GameSimulation, SimConfig, Input, PRESS_SPACE, PRESS_PAUSE, SUBMIT_ANSWER
+from game_sim import screen_width, screen_height
+from audio import AudioEngine, synthesize_buffers
+from background import BackgroundTasks
+from game_view import GameView
+from input_timing import EventPump, LatencyTracker, take_due
+from persistence import SessionStore, session_record
+from profiler import FrameProfiler
+from replay import InputRecorder, load_recording, new_session_seed, seed_argument, state_checksum
+from startup import StartupProfile, AssetLoader
+from telemetry import Telemetry, DEFAULT_PATH, open_sink
+from text_cache import draw_text
+from world_gen import Course, WorldStream
 
 # ============================================
-# GAME WINDOW SETUP
+# COMMAND LINE OPTIONS
 # ============================================
-screen_width = 800
-screen_height = 400
-screen = pygame.display.set_mode((screen_width, screen_height))
-pygame.display.set_caption("Cyclist Collector Game")
-clock = pygame.time.Clock()
+
+def positive_int(text):
+    """argparse type for rates and counts that must be at least 1"""
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"must be a whole number, not {text!r}")
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, not {value}")
+    return value
+
+
+parser = argparse.ArgumentParser(description="Cyclist Collector Game")
+parser.add_argument("--tick-rate", type=positive_int, default=60,
+                    help="simulation ticks per second; game speed is the same at any rate (default 60)")
+parser.add_argument("--fps", type=positive_int, default=60, help="frame rate cap (default 60)")
+parser.add_argument("--uncapped", action="store_true",
+                    help="render as fast as possible while playing, interpolating between ticks")
+parser.add_argument("--vsync", action="store_true", help="wait for the display refresh when presenting")
+parser.add_argument("--fullscreen", action="store_true", help="fill the screen (scaled up by the GPU)")
+parser.add_argument("--low-res", action="store_true",
+                    help="draw at half resolution and let the GPU scale it up (for slow machines; no scenery)")
+parser.add_argument("--scenery", action="store_true", help="parallax scenery behind the playfield instead of plain white")
+parser.add_argument("--no-effects", action="store_true", help="no particle effects for pickups and hits")
+parser.add_argument("--max-ticks-per-frame", type=positive_int, default=5,
+                    help="most ticks to catch up in one frame before the game slows down instead (default 5)")
+parser.add_argument("--profile", action="store_true",
+                    help="time every frame phase from the start (F3 shows the overlay either way)")
+parser.add_argument("--profile-csv", metavar="PATH", help="write per-frame phase timings to a CSV file")
+parser.add_argument("--seed", type=seed_argument, help="seed for this session's random numbers (default: random)")
+parser.add_argument("--record", metavar="PATH", help="record the seed and every input to a replay log")
+parser.add_argument("--replay", metavar="PATH", help="play back a replay log instead of reading the keyboard")
+parser.add_argument("--course", default="", help="play a fixed course from courses/ instead of a random one")
+parser.add_argument("--player", default="player", help="name to save high scores and stats under (default: player)")
+parser.add_argument("--audio-buffer", type=positive_int, default=256,
+                    help="mixer buffer in samples; smaller starts sounds sooner (default 256)")
+parser.add_argument("--profile-startup", action="store_true",
+                    help="print where the time to the first frame (and the loading after it) went")
+parser.add_argument("--telemetry", nargs="?", const=DEFAULT_PATH, metavar="PATH_OR_URL",
+                    help="send gameplay telemetry to a file or an http:// URL "
+                         "(telemetry/events.bin if no path is given; off by default and during replays)")
+args = parser.parse_args()
+
+startup = StartupProfile(launch_time)
+startup.mark("imports")
 
 # ============================================
-# COLORS
+# INITIALIZE PYGAME
 # ============================================
-WHITE = (255, 255, 255)
-BLACK = (0, 0, 0)
-BLUE = (50, 100, 200)
-RED = (200, 50, 50)
-YELLOW = (255, 215, 0)
-GREEN = (50, 200, 50)
-BROWN = (139, 69, 19)
-GRAY = (50, 50, 50)
-PURPLE = (128, 0, 128)
-ORANGE = (255, 165, 0)
+# Only the subsystems the game uses; the mixer is started after the
+# first frame, together with the sounds (see LOAD ASSETS)
+pygame.display.init()
+pygame.font.init()
+startup.mark("display + font init")
 
 # ============================================
-# CREATE SIMPLE SOUND EFFECTS
+# GAME WINDOW SETUP
 # ============================================
+# The game draws at a fixed 800x400 (or half that with --low-res) and
+# SDL's renderer scales the frame up to the window on the GPU (SCALED),
+# by whole multiples in a window so pixels stay square and sharp. A big
+# or full-screen window costs no more to draw than a small one.
+low_res_downscale = 2
+render_downscale = low_res_downscale if args.low_res else 1
+window_size = (screen_width // render_downscale, screen_height // render_downscale)
+window_flags = pygame.SCALED | (pygame.FULLSCREEN if args.fullscreen else 0)
 try:
-    import numpy as np
-    
-    def create_sound(frequency, duration):
-        """Create a simple beep sound"""
-        sample_rate = 22050
-        n_samples = int(round(duration * sample_rate))
-        buf = np.zeros((n_samples, 2), dtype=np.int16)
-        for i in range(n_samples):
-            value = int(32767 * 0.3 * ((i % int(sample_rate / frequency)) < (sample_rate / frequency / 2)))
-            buf[i] = [value, value]
-        sound = pygame.sndarray.make_sound(buf)
-        return sound
-    
-    coin_sound = create_sound(800, 0.1)
-    jump_sound = create_sound(400, 0.05)
-    hit_sound = create_sound(200, 0.2)
-    
-except ImportError:
-    print("NumPy not found - sounds disabled. Install with: pip install numpy")
-    class DummySound:
-        def play(self):
-            pass
-    coin_sound = DummySound()
-    jump_sound = DummySound()
-    hit_sound = DummySound()
+    # SDL only offers vsync through its renderer, which SCALED uses
+    screen = pygame.display.set_mode(window_size, window_flags, vsync=1 if args.vsync else 0)
+except pygame.error:
+    if args.vsync:
+        print("VSync not available - running without it")
+    try:
+        screen = pygame.display.set_mode(window_size, window_flags)
+    except pygame.error:
+        print("Hardware scaling not available - drawing at full size")
+        render_downscale = 1
+        screen = pygame.display.set_mode((screen_width, screen_height))
+pygame.display.set_caption("Cyclist Collector Game")
+startup.mark("window")
 
 # ============================================
-# GROUND POSITION
+# CREATE SIMPLE SOUND EFFECTS
 # ============================================
-ground_y = 300
+# Each sound has its own reserved mixer channels and the mixer runs with a
+# small buffer (see audio.py). Nothing plays until the sounds have loaded
+# behind the start screen.
+audio = AudioEngine(buffer=args.audio_buffer)
 
-# ============================================
-# PLAYER (CYCLIST) VARIABLES
-# ============================================
-player_x = 100
-player_y = ground_y - 60
-player_width = 50
-player_height = 60
-player_velocity_y = 0
-gravity = 0.8
-jump_strength = -15
-animation_frame = 0
+def create_sounds(buffers):
+    """Start the mixer and preload the synthesized sounds - runs on the main thread"""
+    if audio.start():
+        audio.load_buffers(buffers)
 
-# ============================================
-# OBSTACLE VARIABLES
-# ============================================
-obstacle_width = 20
-obstacle_height = 50
-base_obstacle_speed = 5
-obstacle_speed = base_obstacle_speed
-obstacles = []
+def sounds_failed(error):
+    if not isinstance(error, ImportError):
+        print(f"Could not synthesize sounds: {error}")
+    # No NumPy: use the same sounds, pre-generated as WAV files
+    if audio.start():
+        audio.load_wavs()
 
 # ============================================
-# COIN VARIABLES
+# GAME STATE
 # ============================================
-coin_width = 25
-coin_height = 25
-coins = []
-coin_timer = 0
-coin_spawn_rate = 120
+# All gameplay state lives in the simulation; the loop below only turns
+# key presses into inputs and draws whatever state it is in
+# Every random number comes from the session's seeded RNG, so a seed plus
+# the inputs on each tick reproduce a run exactly (see replay.py)
+# High scores and stats are saved to save_data/ by a background thread,
+# so finishing a game never waits on the disk (see persistence.py)
+store = SessionStore()
 
-# ============================================
-# LIFELINE (HEART) VARIABLES
-# ============================================
-heart_width = 30
-heart_height = 30
-hearts = []
-heart_timer = 0
-heart_spawn_rate = 600  # Spawn heart every 10 seconds (600 frames at 60 FPS)
-player_lives = 3  # Start with 3 lives
-max_lives = 5  # Maximum lives possible
+# The course ahead is generated in chunks on a worker thread, which keeps
+# a few ready so the game loop only ever copies one in (see world_gen.py)
+world = WorldStream(threaded=True)
 
-# ============================================
-# SCORE VARIABLES
-# ============================================
-score = 0
-coins_collected = 0
-distance = 0
-high_score = 0
+if args.replay:
+    recording = load_recording(args.replay)
+    sim = recording.new_simulation(world)
+else:
+    recording = None
+    # A fixed course is loaded and checked once, before the first game
+    course = None
+    if args.course:
+        try:
+            course = Course(args.course)
+        except (OSError, ValueError) as error:
+            parser.error(f"--course {args.course}: {error}")
+    session_seed = args.seed if args.seed is not None else new_session_seed()
+    sim = GameSimulation(SimConfig(tick_rate=args.tick_rate, course=args.course), seed=session_seed,
+                         high_score=store.best_score(args.player), world=world, course=course)
+user_input = ""
+
+recorder = None
+if args.record:
+    recorder = InputRecorder(args.record, sim.seed, sim.config, sim.high_score)
+startup.mark("game state")
 
 # ============================================
-# POSITIVE DISENGAGEMENT VARIABLES
+# GAME VIEW
 # ============================================
-play_start_time = 0
-play_duration = 0
-break_offered = False
-break_interval = 60
-last_break_time = 0
-
-# Skills tracking
-skills_learned = []
-all_skills = [
-    "Perfect Timing",
-    "Quick Reflexes",
-    "Coin Hunter",
-    "Risk Management",
-    "Persistence",
-    "Pattern Recognition"
-]
-
-# League system
-player_league = "Beginner"
-league_members = 0
+# Sprites, background and the dirty-rect renderer (see game_view.py)
+# The scenery is left out in low-res mode: it changes every frame, so it
+# would have to be shrunk every frame
+scenery = args.scenery and render_downscale == 1
+view = GameView(screen, sim.config.max_lives, render_downscale, scenery, not args.no_effects)
+startup.mark("view")
 
 # ============================================
-# GAME STATE
+# PROFILER
 # ============================================
-game_state = "start"
-break_quiz_active = False
-user_input = ""
-quiz_question = ""
-quiz_answer = ""
+# Costs one empty call per phase until it is switched on (F3 or --profile)
+profiler = FrameProfiler(enabled=args.profile, csv_path=args.profile_csv)
+
+# Every input is stamped when it arrives, so it can be applied on the right
+# tick and its time to reach the screen measured (see input_timing.py)
+event_pump = EventPump(pygame.event.get)
+input_latency = LatencyTracker()
+profiler.add_report(input_latency.summary_lines)
 
 # ============================================
-# HELPER FUNCTIONS
+# BACKGROUND TASKS
 # ============================================
+# Work that runs alongside the game gets the idle time between frames,
+# within a per-frame budget (see background.py)
+tasks = BackgroundTasks()
+profiler.add_report(tasks.summary_lines)
 
-def reset_game():
-    """Reset all variables to start new game"""
-    global player_y, player_velocity_y, obstacles, coins, hearts
-    global score, coins_collected, distance, obstacle_speed, coin_timer, animation_frame
-    global break_offered, play_start_time, player_lives, heart_timer
-    
-    player_y = ground_y - 60
-    player_velocity_y = 0
-    animation_frame = 0
-    
-    obstacles = []
-    obstacles.append(screen_width)
-    coins = []
-    hearts = []
-    
-    score = 0
-    coins_collected = 0
-    distance = 0
-    player_lives = 3
-    
-    obstacle_speed = base_obstacle_speed
-    coin_timer = 0
-    heart_timer = 0
-    break_offered = False
-    play_start_time = time.time()
-
-def draw_cyclist(x, y, frame):
-    """
-    Draw a simple person riding a bicycle
-    
-    Parameters:
-    - x: horizontal position (left-right) of the cyclist
-    - y: vertical position (up-down) of the cyclist
-    - frame: animation frame number for pedaling and wheel rotation
-    
-    The cyclist is made of:
-    1. Head (circle)
-    2. Body (line leaning forward)
-    3. Arms (two lines reaching to handlebars)
-    4. Legs (animated to show pedaling motion)
-    5. Bicycle frame (triangle shape)
-    6. Two wheels with rotating spokes
-    """
-    
-    # 1. DRAW HEAD
-    # Simple black circle for the head
-    pygame.draw.circle(screen, BLACK, (int(x + 25), int(y + 5)), 8)
-    
-    # 2. DRAW BODY
-    # Line from head to hip, leaning forward for cycling posture
-    pygame.draw.line(screen, BLACK, (x + 25, y + 13), (x + 30, y + 30), 3)
-    
-    # 3. DRAW ARMS - HOLDING HANDLEBARS
-    # Upper arm from shoulder to elbow
-    pygame.draw.line(screen, BLACK, (x + 25, y + 18), (x + 35, y + 25), 3)
-    # Lower arm from elbow to handlebars
-    pygame.draw.line(screen, BLACK, (x + 35, y + 25), (x + 40, y + 35), 2)
-    
-    # 4. DRAW LEGS - ANIMATED PEDALING MOTION
-    # Use frame number to create cycling animation
-    leg_angle = frame % 40  # Creates a cycle from 0 to 39
-    
-    if leg_angle < 20:
-        # First half of pedal cycle: Left leg down, right leg up
-        pygame.draw.line(screen, BLACK, (x + 30, y + 30), (x + 25, y + 45), 3)  # Left leg extended
-        pygame.draw.line(screen, BLACK, (x + 30, y + 30), (x + 35, y + 38), 3)  # Right leg bent
-    else:
-        # Second half: Right leg down, left leg up
-        pygame.draw.line(screen, BLACK, (x + 30, y + 30), (x + 35, y + 45), 3)  # Right leg extended
-        pygame.draw.line(screen, BLACK, (x + 30, y + 30), (x + 25, y + 38), 3)  # Left leg bent
-    
-    # 5. DRAW BICYCLE FRAME
-    bike_y = y + 45  # Vertical position of bike frame
-    
-    # Main frame forms a triangle (like a real bicycle)
-    pygame.draw.line(screen, BLUE, (x + 15, bike_y), (x + 40, bike_y - 10), 3)  # Top tube (horizontal)
-    pygame.draw.line(screen, BLUE, (x + 15, bike_y), (x + 28, bike_y + 10), 3)  # Seat tube (diagonal down)
-    pygame.draw.line(screen, BLUE, (x + 28, bike_y + 10), (x + 45, bike_y + 10), 3)  # Down tube (bottom)
-    
-    # Handlebars at the front
-    pygame.draw.line(screen, GRAY, (x + 40, bike_y - 10), (x + 40, bike_y - 5), 2)
-    
-    # Seat at the back
-    pygame.draw.line(screen, BLACK, (x + 13, bike_y - 2), (x + 20, bike_y - 2), 3)
-    
-    # 6. DRAW WHEELS
-    wheel_radius = 12
-    
-    # Back wheel (left side)
-    pygame.draw.circle(screen, BLACK, (int(x + 15), int(bike_y + 10)), wheel_radius, 2)
-    
-    # Front wheel (right side)
-    pygame.draw.circle(screen, BLACK, (int(x + 45), int(bike_y + 10)), wheel_radius, 2)
-    
-    # 7. DRAW WHEEL SPOKES - ANIMATED ROTATION
-    # Alternates between + shape and X shape to show spinning
-    if frame % 8 < 4:
-        # Draw + shaped spokes (vertical and horizontal)
-        
-        # Back wheel spokes
-        pygame.draw.line(screen, GRAY, (x + 15, bike_y + 10 - 8), (x + 15, bike_y + 10 + 8), 1)  # Vertical
-        pygame.draw.line(screen, GRAY, (x + 15 - 8, bike_y + 10), (x + 15 + 8, bike_y + 10), 1)  # Horizontal
-        
-        # Front wheel spokes
-        pygame.draw.line(screen, GRAY, (x + 45, bike_y + 10 - 8), (x + 45, bike_y + 10 + 8), 1)  # Vertical
-        pygame.draw.line(screen, GRAY, (x + 45 - 8, bike_y + 10), (x + 45 + 8, bike_y + 10), 1)  # Horizontal
-    else:
-        # Draw X shaped spokes (diagonal)
-        
-        # Back wheel spokes (top-left to bottom-right, top-right to bottom-left)
-        pygame.draw.line(screen, GRAY, (x + 15 - 6, bike_y + 10 - 6), (x + 15 + 6, bike_y + 10 + 6), 1)
-        pygame.draw.line(screen, GRAY, (x + 15 - 6, bike_y + 10 + 6), (x + 15 + 6, bike_y + 10 - 6), 1)
-        
-        # Front wheel spokes
-        pygame.draw.line(screen, GRAY, (x + 45 - 6, bike_y + 10 - 6), (x + 45 + 6, bike_y + 10 + 6), 1)
-        pygame.draw.line(screen, GRAY, (x + 45 - 6, bike_y + 10 + 6), (x + 45 + 6, bike_y + 10 - 6), 1)
-
-def check_collision(x1, y1, w1, h1, x2, y2, w2, h2):
-    """Check if two rectangles overlap"""
-    if (x1 < x2 + w2 and
-        x1 + w1 > x2 and
-        y1 < y2 + h2 and
-        y1 + h1 > y2):
-        return True
-    return False
-
-def update_league():
-    """Update player league based on score"""
-    global player_league, league_members
-    
-    if score < 100:
-        player_league = "Beginner League"
-        league_members = random.randint(45, 67)
-    elif score < 300:
-        player_league = "Intermediate League"
-        league_members = random.randint(28, 42)
-    elif score < 500:
-        player_league = "Advanced League"
-        league_members = random.randint(15, 25)
-    else:
-        player_league = "Pro League"
-        league_members = random.randint(8, 15)
+# With --telemetry, gameplay events go into a fixed-size buffer and are
+# shipped in compressed batches from the thread pool (see telemetry.py)
+telemetry = None
+if args.telemetry and recording is None:
+    telemetry = Telemetry(open_sink(args.telemetry))
+    telemetry.record("session", sim.tick, sim.config.tick_rate, args.fps)
+    profiler.add_report(telemetry.summary_lines)
 
-def add_skill():
-    """Add a new skill to the player's skills"""
-    global skills_learned
-    
-    if coins_collected >= 5 and "Coin Hunter" not in skills_learned:
-        skills_learned.append("Coin Hunter")
-    if distance >= 300 and "Persistence" not in skills_learned:
-        skills_learned.append("Persistence")
-    if score >= 200 and "Quick Reflexes" not in skills_learned:
-        skills_learned.append("Quick Reflexes")
-    if coins_collected >= 10 and "Perfect Timing" not in skills_learned:
-        skills_learned.append("Perfect Timing")
-
-def get_next_skill():
-    """Get a skill the player hasn't learned yet"""
-    for skill in all_skills:
-        if skill not in skills_learned:
-            return skill
-    return "Master Cyclist"
-
-def check_break_time():
-    """Check if it's time to offer a break"""
-    global break_offered, last_break_time, play_duration
-    
-    play_duration = time.time() - play_start_time
-    
-    if play_duration - last_break_time >= break_interval and not break_offered:
-        return True
-    return False
+# ============================================
+# LOAD ASSETS
+# ============================================
+# Started once the first frame is on screen; finished jobs are picked up
+# one per frame, so no frame waits on loading (see startup.py)
+assets = AssetLoader(startup)
+assets.in_background("sounds", synthesize_buffers, then=create_sounds, on_error=sounds_failed)
+assets.on_main_thread("sprites", view.preload)
+first_frame = True
 
-def create_break_quiz():
-    """Create a quiz question for the break"""
-    global quiz_question, quiz_answer
-    
-    questions = [
-        ("How many points do you get per coin?", "10"),
-        ("What key do you press to jump?", "space"),
-        ("What color are the coins?", "yellow"),
-        ("What are you avoiding?", "obstacles"),
-    ]
-    
-    q, a = random.choice(questions)
-    quiz_question = q
-    quiz_answer = a.lower()
-
-def draw_heart(x, y):
-    """Draw a heart shape for lifeline"""
-    # Draw heart using two circles and a triangle
-    heart_color = (255, 20, 20)  # Bright red
-    
-    # Left circle of heart
-    pygame.draw.circle(screen, heart_color, (int(x + 8), int(y + 8)), 8)
-    # Right circle of heart
-    pygame.draw.circle(screen, heart_color, (int(x + 22), int(y + 8)), 8)
-    # Bottom triangle
-    points = [(x + 2, y + 10), (x + 15, y + 25), (x + 28, y + 10)]
-    pygame.draw.polygon(screen, heart_color, points)
+async def load_assets():
+    assets.start()
+    while not assets.done:
+        assets.poll()
+        await tasks.checkpoint("assets", wait_for_next_frame=True)
+    if args.profile_startup:
+        print("\n".join(startup.report()))
 
 # ============================================
 # MAIN GAME LOOP
 # ============================================
 game_running = True
 
-while game_running:
-    
-    # ========================================
-    # HANDLE EVENTS
-    # ========================================
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            game_running = False
-        
-        if event.type == pygame.KEYDOWN:
-            # Handle text input for break quiz
-            if break_quiz_active:
-                if event.key == pygame.K_RETURN:
-                    if user_input.lower() == quiz_answer:
-                        break_quiz_active = False
+# Fixed-timestep loop: the simulation always advances in ticks of exactly
+# 1/tick_rate seconds, however fast or slow frames are drawn. Real time
+# piles up in the accumulator and is spent one tick at a time.
+tick_seconds = 1.0 / sim.config.tick_rate
+accumulator = 0.0
+pending_inputs = []
+last_time = time.perf_counter()
+
+async def run_game():
+    """The frame loop, as an asyncio task so background tasks can run while it waits"""
+    global game_running, accumulator, last_time, user_input, first_frame
+    
+    while game_running:
+    
+        profiler.begin_frame()
+        tasks.begin_frame()
+    
+        # ========================================
+        # HANDLE EVENTS
+        # ========================================
+        for event, arrived in event_pump.poll():
+            if event.type == pygame.QUIT:
+                game_running = False
+        
+            if event.type == pygame.WINDOWEXPOSED:
+                view.renderer.invalidate()
+        
+            if event.type == pygame.KEYDOWN:
+                # Handle text input for break quiz
+                if sim.break_quiz_active:
+                    if event.key == pygame.K_RETURN:
+                        pending_inputs.append((Input(SUBMIT_ANSWER, user_input), arrived))
                         user_input = ""
-                        last_break_time = time.time()
-                        break_offered = False
+                    elif event.key == pygame.K_BACKSPACE:
+                        user_input = user_input[:-1]
                     else:
-                        game_state = "break_screen"
-                        break_quiz_active = False
-                        user_input = ""
-                elif event.key == pygame.K_BACKSPACE:
-                    user_input = user_input[:-1]
-                else:
-                    user_input = user_input + event.unicode
+                        user_input = user_input + event.unicode
             
-            elif game_state == "start":
-                if event.key == pygame.K_SPACE:
-                    game_state = "playing"
-                    reset_game()
+                elif event.key == pygame.K_SPACE:
+                    pending_inputs.append((Input(PRESS_SPACE), arrived))
             
-            elif game_state == "playing":
-                if event.key == pygame.K_SPACE:
-                    if player_y >= ground_y - 60:
-                        player_velocity_y = jump_strength
-                        jump_sound.play()
                 elif event.key == pygame.K_p:
-                    game_state = "paused"
-            
-            elif game_state == "paused":
-                if event.key == pygame.K_p:
-                    game_state = "playing"
-            
-            elif game_state == "break_screen":
-                if event.key == pygame.K_SPACE:
-                    game_state = "playing"
-                    last_break_time = time.time()
-                    break_offered = False
+                    pending_inputs.append((Input(PRESS_PAUSE), arrived))
             
-            elif game_state == "game_over":
-                if event.key == pygame.K_SPACE:
-                    game_state = "playing"
-                    reset_game()
-    
-    # ========================================
-    # UPDATE GAME
-    # ========================================
-    if game_state == "playing":
-        
-        animation_frame = animation_frame + 1
-        
-        # Update player physics
-        player_velocity_y = player_velocity_y + gravity
-        player_y = player_y + player_velocity_y
-        
-        if player_y >= ground_y - 60:
-            player_y = ground_y - 60
-            player_velocity_y = 0
-        
-        # Move obstacles
-        for i in range(len(obstacles)):
-            obstacles[i] = obstacles[i] - obstacle_speed
-        
-        if len(obstacles) > 0 and obstacles[0] < -obstacle_width:
-            obstacles.pop(0)
-            if len(obstacles) > 0:
-                new_x = obstacles[-1] + random.randint(300, 500)
-            else:
-                new_x = screen_width
-            obstacles.append(new_x)
-        
-        # Check collision with obstacles
-        for obstacle_x in obstacles:
-            if check_collision(player_x, player_y, player_width, player_height,
-                             obstacle_x, ground_y - obstacle_height, obstacle_width, obstacle_height):
-                
-                # Lose a life instead of instant game over
-                player_lives = player_lives - 1
-                hit_sound.play()
-                
-                # Remove the obstacle that was hit
-                obstacles.remove(obstacle_x)
-                
-                # Check if game over (no lives left)
-                if player_lives <= 0:
-                    # Update high score
-                    if score > high_score:
-                        high_score = score
-                    else:
-                        high_score = score + random.randint(5, 15)
-                    
-                    game_state = "game_over"
-                break  # Exit loop after hit
-        
-        # Spawn coins
-        coin_timer = coin_timer + 1
-        if coin_timer >= coin_spawn_rate:
-            coin_x = screen_width
-            if random.random() < 0.5:
-                coin_y = ground_y - coin_height
+                if event.key == pygame.K_F3:
+                    profiler.toggle_overlay()
+    
+        profiler.mark("events")
+    
+        # Taken after reading events, so every input arrived before `now`
+        now = time.perf_counter()
+        # Never owe more than max_ticks_per_frame ticks; if drawing falls that
+        # far behind, the game slows down instead of skipping further ahead
+        accumulator = accumulator + min(now - last_time, args.max_ticks_per_frame * tick_seconds)
+        last_time = now
+    
+        # ========================================
+        # UPDATE GAME
+        # ========================================
+        # Each tick stands for the next tick_seconds of real time that hasn't
+        # been simulated yet. An input is applied on the tick covering the
+        # moment it arrived (or, in a replay, on the tick it was recorded on),
+        # so when a frame runs several ticks a jump lands on the right one.
+        # The frame's last tick takes everything still waiting rather than
+        # holding it back a whole frame.
+        ticks_run = 0
+        while accumulator >= tick_seconds and ticks_run < args.max_ticks_per_frame:
+            if recording is not None:
+                tick_inputs = recording.inputs_at(sim.tick)
+                arrivals = ()
             else:
-                coin_y = ground_y - 100 - random.randint(0, 50)
-            coins.append([coin_x, coin_y])
-            coin_timer = 0
-        
-        # Spawn hearts (lifelines) - rarer than coins
-        heart_timer = heart_timer + 1
-        if heart_timer >= heart_spawn_rate:
-            heart_x = screen_width
-            # Hearts appear in the air
-            heart_y = ground_y - 80 - random.randint(0, 40)
-            hearts.append([heart_x, heart_y])
-            heart_timer = 0
-        
-        # Move coins
-        for coin in coins:
-            coin[0] = coin[0] - obstacle_speed
-        
-        # Move hearts
-        for heart in hearts:
-            heart[0] = heart[0] - obstacle_speed
-        
-        coins = [coin for coin in coins if coin[0] > -coin_width]
-        hearts = [heart for heart in hearts if heart[0] > -heart_width]
-        
-        # Check coin collection
-        for coin in coins[:]:
-            if check_collision(player_x, player_y, player_width, player_height,
-                             coin[0], coin[1], coin_width, coin_height):
-                coins.remove(coin)
-                coins_collected = coins_collected + 1
-                score = score + 10
-                coin_sound.play()
-                add_skill()
-        
-        # Check heart collection (lifeline bonus!)
-        for heart in hearts[:]:
-            if check_collision(player_x, player_y, player_width, player_height,
-                             heart[0], heart[1], heart_width, heart_height):
-                hearts.remove(heart)
-                # Add a life (up to max)
-                if player_lives < max_lives:
-                    player_lives = player_lives + 1
-                    coin_sound.play()  # Happy sound for getting extra life
-                    score = score + 20  # Bonus points for collecting heart
-        
-        # Update score
-        distance = distance + 1
-        if distance % 10 == 0:
-            score = score + 1
-        
-        # Update league
-        update_league()
-        
-        # Check for break time
-        if check_break_time() and not break_quiz_active:
-            break_offered = True
-            break_quiz_active = True
-            create_break_quiz()
-        
-        # Make game easier after score 300
-        if score >= 300:
-            if obstacle_speed > base_obstacle_speed:
-                obstacle_speed = obstacle_speed - 0.05
-        elif distance % 500 == 0 and distance > 0:
-            obstacle_speed = obstacle_speed + 0.3
-    
-    # ========================================
-    # DRAW EVERYTHING
-    # ========================================
-    screen.fill(WHITE)
-    pygame.draw.line(screen, BLACK, (0, ground_y), (screen_width, ground_y), 2)
-    
-    if game_state == "start":
-        font_large = pygame.font.Font(None, 64)
-        title = font_large.render("CYCLIST COLLECTOR", True, BLACK)
-        title_rect = title.get_rect(center=(screen_width // 2, 60))
-        screen.blit(title, title_rect)
-        
-        font_small = pygame.font.Font(None, 24)
-        
-        instructions = [
-            ("HOW TO PLAY:", 130, BLACK),
-            ("Press SPACE to JUMP over obstacles", 160, BLACK),
-            ("Collect YELLOW coins for 10 points each", 185, YELLOW),
-            ("Collect RED HEARTS for extra lives! ❤️", 210, (255, 20, 20)),
-            ("You start with 3 lives", 235, BLACK),
-            ("Press P to PAUSE anytime", 260, BLACK),
-            ("", 285, BLACK),
-            ("BREAK SYSTEM:", 310, PURPLE),
-            ("You'll get break reminders every minute", 335, PURPLE),
-            ("", 360, BLACK),
-            ("HOW TO WIN:", 385, GREEN),
-            ("Unlock skills and reach Pro League!", 410, GREEN),
-        ]
-        
-        for text, y_pos, color in instructions:
-            if text:
-                text_surface = font_small.render(text, True, color)
-                text_rect = text_surface.get_rect(center=(screen_width // 2, y_pos))
-                screen.blit(text_surface, text_rect)
-        
-        font_medium = pygame.font.Font(None, 32)
-        start_text = font_medium.render("Press SPACE to Start", True, BLUE)
-        start_rect = start_text.get_rect(center=(screen_width // 2, screen_height - 30))
-        screen.blit(start_text, start_rect)
-    
-    elif break_quiz_active and game_state == "playing":
-        draw_cyclist(player_x, player_y, animation_frame)
-        
-        for obstacle_x in obstacles:
-            pygame.draw.rect(screen, RED, 
-                           (obstacle_x, ground_y - obstacle_height, obstacle_width, obstacle_height))
-        
-        for coin in coins:
-            pygame.draw.circle(screen, YELLOW, 
-                             (int(coin[0] + coin_width // 2), int(coin[1] + coin_height // 2)), 
-                             coin_width // 2)
-        
-        # Draw hearts (lifelines)
-        for heart in hearts:
-            draw_heart(heart[0], heart[1])
-        
-        overlay = pygame.Surface((screen_width, screen_height))
-        overlay.set_alpha(200)
-        overlay.fill(WHITE)
-        screen.blit(overlay, (0, 0))
-        
-        font_large = pygame.font.Font(None, 48)
-        font_medium = pygame.font.Font(None, 32)
-        
-        minutes_played = int(play_duration / 60)
-        
-        quiz_title = font_large.render("Time for a Quick Break?", True, PURPLE)
-        quiz_rect = quiz_title.get_rect(center=(screen_width // 2, 100))
-        screen.blit(quiz_title, quiz_rect)
-        
-        time_text = font_medium.render(f"You've been playing for {minutes_played} minute(s)!", True, BLACK)
-        time_rect = time_text.get_rect(center=(screen_width // 2, 150))
-        screen.blit(time_text, time_rect)
-        
-        question_text = font_medium.render("Answer this to keep playing:", True, BLACK)
-        question_rect = question_text.get_rect(center=(screen_width // 2, 200))
-        screen.blit(question_text, question_rect)
-        
-        quiz_text = font_medium.render(quiz_question, True, BLUE)
-        quiz_text_rect = quiz_text.get_rect(center=(screen_width // 2, 240))
-        screen.blit(quiz_text, quiz_text_rect)
-        
-        input_box = pygame.Rect(screen_width // 2 - 150, 280, 300, 40)
-        pygame.draw.rect(screen, BLACK, input_box, 2)
-        input_surface = font_medium.render(user_input, True, BLACK)
-        screen.blit(input_surface, (input_box.x + 10, input_box.y + 5))
-        
-        hint_text = font_medium.render("Press ENTER to submit", True, GRAY)
-        hint_rect = hint_text.get_rect(center=(screen_width // 2, 340))
-        screen.blit(hint_text, hint_rect)
-    
-    elif game_state == "playing" or game_state == "paused":
-        
-        draw_cyclist(player_x, player_y, animation_frame)
-        
-        for obstacle_x in obstacles:
-            pygame.draw.rect(screen, RED, 
-                           (obstacle_x, ground_y - obstacle_height, obstacle_width, obstacle_height))
-        
-        for coin in coins:
-            pygame.draw.circle(screen, YELLOW, 
-                             (int(coin[0] + coin_width // 2), int(coin[1] + coin_height // 2)), 
-                             coin_width // 2)
-        
-        # Draw hearts (lifelines)
-        for heart in hearts:
-            draw_heart(heart[0], heart[1])
-        
-        font = pygame.font.Font(None, 28)
-        score_text = font.render(f"Score: {score}", True, BLACK)
-        screen.blit(score_text, (10, 10))
-        
-        coins_text = font.render(f"Coins: {coins_collected}", True, YELLOW)
-        screen.blit(coins_text, (10, 40))
-        
-        # Draw lives indicator with hearts
-        lives_text = font.render(f"Lives:", True, BLACK)
-        screen.blit(lives_text, (10, 70))
-        
-        for i in range(player_lives):
-            # Draw small hearts for each life
-            heart_x = 70 + (i * 25)
-            heart_y = 72
-            small_heart_color = (255, 20, 20)
-            # Small heart circles
-            pygame.draw.circle(screen, small_heart_color, (int(heart_x + 4), int(heart_y + 4)), 4)
-            pygame.draw.circle(screen, small_heart_color, (int(heart_x + 11), int(heart_y + 4)), 4)
-            # Small heart triangle
-            points = [(heart_x + 1, heart_y + 5), (heart_x + 7.5, heart_y + 12), (heart_x + 14, heart_y + 5)]
-            pygame.draw.polygon(screen, small_heart_color, points)
-        
-        league_text = font.render(f"{player_league} ({league_members} players)", True, PURPLE)
-        screen.blit(league_text, (10, 100))
-        
-        if score >= 200:
-            encourage = font.render("You're really getting this game! 🌟", True, GREEN)
-            screen.blit(encourage, (screen_width - 350, 10))
-        elif score >= 100:
-            encourage = font.render("You're getting it! Keep going!", True, GREEN)
-            screen.blit(encourage, (screen_width - 320, 10))
-        
-        if game_state == "paused":
-            font_large = pygame.font.Font(None, 72)
-            pause_text = font_large.render("PAUSED", True, BLACK)
-            pause_rect = pause_text.get_rect(center=(screen_width // 2, screen_height // 2))
-            screen.blit(pause_text, pause_rect)
-            
-            font_small = pygame.font.Font(None, 36)
-            resume_text = font_small.render("Press P to Resume", True, BLACK)
-            resume_rect = resume_text.get_rect(center=(screen_width // 2, screen_height // 2 + 60))
-            screen.blit(resume_text, resume_rect)
-    
-    elif game_state == "break_screen":
-        font_large = pygame.font.Font(None, 64)
-        font_medium = pygame.font.Font(None, 36)
-        font_small = pygame.font.Font(None, 28)
-        
-        break_title = font_large.render("Great Job! Take a Break 🎉", True, GREEN)
-        break_rect = break_title.get_rect(center=(screen_width // 2, 80))
-        screen.blit(break_title, break_rect)
-        
-        progress_text = font_medium.render(f"You've earned {score} points!", True, BLACK)
-        progress_rect = progress_text.get_rect(center=(screen_width // 2, 140))
-        screen.blit(progress_text, progress_rect)
-        
-        if len(skills_learned) > 0:
-            skills_title = font_medium.render("Skills Mastered:", True, BLUE)
-            skills_rect = skills_title.get_rect(center=(screen_width // 2, 190))
-            screen.blit(skills_title, skills_rect)
-            
-            y_offset = 230
-            for skill in skills_learned:
-                skill_text = font_small.render(f"✓ {skill}", True, GREEN)
-                skill_rect = skill_text.get_rect(center=(screen_width // 2, y_offset))
-                screen.blit(skill_text, skill_rect)
-                y_offset = y_offset + 30
-        
-        next_skill = get_next_skill()
-        next_text = font_small.render(f"Next time: Try for '{next_skill}'!", True, ORANGE)
-        next_rect = next_text.get_rect(center=(screen_width // 2, y_offset + 20))
-        screen.blit(next_text, next_rect)
-        
-        continue_text = font_medium.render("Press SPACE when ready to continue", True, BLUE)
-        continue_rect = continue_text.get_rect(center=(screen_width // 2, screen_height - 40))
-        screen.blit(continue_text, continue_rect)
-    
-    elif game_state == "game_over":
-        font_large = pygame.font.Font(None, 64)
-        font_medium = pygame.font.Font(None, 36)
-        font_small = pygame.font.Font(None, 26)
-        
-        y_position = 40
-        
-        game_over_text = font_large.render("GAME OVER!", True, RED)
-        game_over_rect = game_over_text.get_rect(center=(screen_width // 2, y_position))
-        screen.blit(game_over_text, game_over_rect)
-        y_position = y_position + 60
-        
-        score_text = font_medium.render(f"Final Score: {score}", True, BLACK)
-        score_rect = score_text.get_rect(center=(screen_width // 2, y_position))
-        screen.blit(score_text, score_rect)
-        y_position = y_position + 45
-        
-        high_text = font_small.render(f"High Score: {high_score}", True, BLUE)
-        high_rect = high_text.get_rect(center=(screen_width // 2, y_position))
-        screen.blit(high_text, high_rect)
-        y_position = y_position + 35
-        
-        coins_text = font_small.render(f"Coins Collected: {coins_collected}", True, YELLOW)
-        coins_rect = coins_text.get_rect(center=(screen_width // 2, y_position))
-        screen.blit(coins_text, coins_rect)
-        y_position = y_position + 40
-        
-        league_text = font_small.render(f"League: {player_league}", True, PURPLE)
-        league_rect = league_text.get_rect(center=(screen_width // 2, y_position))
-        screen.blit(league_text, league_rect)
-        y_position = y_position + 30
-        
-        members_text = font_small.render(f"You joined {league_members} other players!", True, PURPLE)
-        members_rect = members_text.get_rect(center=(screen_width // 2, y_position))
-        screen.blit(members_text, members_rect)
-        y_position = y_position + 40
-        
-        if len(skills_learned) > 0:
-            skills_title = font_small.render("Skills You Mastered:", True, GREEN)
-            skills_rect = skills_title.get_rect(center=(screen_width // 2, y_position))
-            screen.blit(skills_title, skills_rect)
-            y_position = y_position + 30
-            
-            for skill in skills_learned[:3]:
-                skill_text = font_small.render(f"✓ {skill}", True, GREEN)
-                skill_rect = skill_text.get_rect(center=(screen_width // 2, y_position))
-                screen.blit(skill_text, skill_rect)
-                y_position = y_position + 28
-        
-        restart_text = font_medium.render("Press SPACE to Play Again", True, BLUE)
-        restart_rect = restart_text.get_rect(center=(screen_width // 2, screen_height - 25))
-        screen.blit(restart_text, restart_rect)
-    
-    pygame.display.flip()
-    clock.tick(60)
+                last_tick = accumulator < 2 * tick_seconds or ticks_run + 1 == args.max_ticks_per_frame
+                due = take_due(pending_inputs, now if last_tick else now - accumulator + tick_seconds)
+                tick_inputs = [item for item, _ in due]
+                arrivals = [arrived for _, arrived in due]
+            if recorder is not None:
+                recorder.record(sim.tick, tick_inputs)
+            input_latency.applied(arrivals)
+        
+            for event in sim.step(tick_inputs):
+                view.effect(event)
+                if event.kind == "jump":
+                    # Timed from the key press, for the sound latency report
+                    audio.play("jump", arrivals[-1] if arrivals else None)
+                elif event.kind == "hit":
+                    audio.play("hit")
+                elif event.kind == "coin" or event.kind == "heart":
+                    # Hearts reuse the coin sound - a happy sound for getting an extra life
+                    audio.play("coin")
+                elif event.kind == "game_over" and recording is None:
+                    store.record_session(session_record(sim, args.player))
+                if telemetry is not None:
+                    telemetry.record_event(event, sim)
+            accumulator = accumulator - tick_seconds
+            ticks_run = ticks_run + 1
+        
+            if recording is not None and sim.tick >= recording.final_tick:
+                game_running = False
+                break
+    
+        profiler.mark("update")
+    
+        # ========================================
+        # DRAW EVERYTHING
+        # ========================================
+        # Draw the world part of the way between the last two ticks so motion
+        # stays smooth when frames and ticks don't line up
+        view.draw(sim, user_input, accumulator / tick_seconds)
+    
+        profiler.draw(view.renderer, draw_text, GRAY)
+        profiler.mark("draw")
+    
+        view.present()
+        input_latency.presented()
+        profiler.mark("present")
+    
+        if first_frame:
+            startup.mark_first_frame()
+            tasks.spawn("assets", load_assets())
+            if telemetry is not None:
+                tasks.spawn("telemetry", telemetry.run(tasks))
+            first_frame = False
+    
+        # Uncapped mode only applies while playing; menus never need more than the cap.
+        # Events keep being read and stamped while waiting, and background
+        # tasks run in the meantime.
+        if args.uncapped and sim.game_state == "playing":
+            late = await event_pump.wait_for_frame_async(None)
+        else:
+            late = await event_pump.wait_for_frame_async(args.fps)
+        tasks.woke_late(late)
+        if telemetry is not None:
+            telemetry.frame(sim.tick)
+        profiler.mark("wait")
+        profiler.end_frame()
+    
+    tasks.close()
+
+asyncio.run(run_game())
+
+profiler.close()
+store.close()
+world.close()
+if telemetry is not None:
+    telemetry.close()
+
+if args.profile:
+    print("\n".join(input_latency.summary_lines()))
+    if audio.latency_summary():
+        print(audio.latency_summary())
+
+if recorder is not None:
+    recorder.close(sim)
+
+if recording is not None and recording.checksum is not None:
+    if state_checksum(sim) == recording.checksum:
+        print("Replay finished - checksum OK")
+    else:
+        print("Replay finished - CHECKSUM MISMATCH")
 
-pygame.quit()
\ No newline at end of file
+pygame.quit()
@@ -0,0 +1,207 @@
+"""
+Low-latency sound playback for the cyclist game.
+
+AudioEngine opens the mixer with a small buffer (so a sound starts a few
+milliseconds after play() instead of tens), and gives every sound its own
+reserved mixer channels. pygame never hands reserved channels to anyone
+else, so a burst of coin pickups can no longer take the channel the hit
+sound needs. When all of a sound's channels are busy its stealing rule
+decides what happens: "oldest" cuts off the voice that has played
+longest, "skip" drops the new one.
+
+Sounds are loaded once, up front, either from synthesized buffers (see
+synth.py, needs NumPy) or - without NumPy - from the WAV files in
+sounds/, which are the same buffers written out ahead of time:
+
+    python audio.py --write-wavs
+
+Every play() reports its delay to a latency hook: the time from the
+trigger (e.g. the key press, if the caller passes it) to the sound being
+queued, plus the mixer buffer it then waits behind. The default hook
+keeps recent delays for latency_summary().
+"""
+import argparse
+import os
+import time
+import wave
+from array import array
+
+import pygame
+
+# ============================================
+# SETTINGS
+# ============================================
+SAMPLE_RATE = 22050  # The rate synth.py generates at, so sounds play at their real pitch
+BUFFER_SAMPLES = 256  # About 12 ms at 22050 Hz; pygame's default is 512 or more
+WAV_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sounds")
+LATENCY_WINDOW = 256
+
+STEAL_OLDEST = "oldest"
+STEAL_SKIP = "skip"
+
+# name: (synth.synthesize parameters, reserved channels, stealing rule)
+SOUNDS = {
+    "hit": (dict(frequency=200, duration=0.2, waveform="square"), 1, STEAL_OLDEST),
+    "jump": (dict(frequency=400, duration=0.05, waveform="square"), 1, STEAL_OLDEST),
+    "coin": (dict(frequency=800, duration=0.1, waveform="square"), 3, STEAL_OLDEST),
+}
+
+# ============================================
+# SOUND DATA
+# ============================================
+
+def synthesize_buffers(sounds=SOUNDS):
+    """Int16 stereo buffers for every sound (needs NumPy; safe to call off the main thread)"""
+    from synth import SoundBank
+
+    # Synthesized buffers are cached in sound_cache/ so later launches skip synthesis
+    sound_bank = SoundBank(sample_rate=SAMPLE_RATE)
+    return {name: sound_bank.get(**params) for name, (params, _, _) in sounds.items()}
+
+
+def write_wavs(directory=WAV_DIR, sounds=SOUNDS):
+    """Save every sound as a 16-bit stereo WAV for machines without NumPy"""
+    os.makedirs(directory, exist_ok=True)
+    for name, buf in synthesize_buffers(sounds).items():
+        path = os.path.join(directory, name + ".wav")
+        with wave.open(path, "wb") as f:
+            f.setnchannels(2)
+            f.setsampwidth(2)
+            f.setframerate(SAMPLE_RATE)
+            f.writeframes(buf.astype("<i2").tobytes())
+        print(f"wrote {path}")
+
+# ============================================
+# AUDIO ENGINE
+# ============================================
+
+class AudioEngine:
+    """Preloaded sounds on reserved mixer channels, with voice stealing and latency reporting"""
+
+    def __init__(self, frequency=SAMPLE_RATE, buffer=BUFFER_SAMPLES, sounds=SOUNDS, latency_hook=None):
+        self.frequency = frequency
+        self.buffer = buffer
+        self.sounds = sounds
+        self.latency_hook = latency_hook or self.record_latency
+
+        self.started = False
+        self.loaded = {}
+        self.voices = {}   # name -> list of [channel, time started]
+        self.output_latency = 0.0
+
+        self.latencies = array("d", [0.0] * LATENCY_WINDOW)
+        self.latency_count = 0
+        self.stolen = 0
+        self.skipped = 0
+
+    def start(self):
+        """Open the mixer and reserve the channels; False if there is no audio device"""
+        pygame.mixer.pre_init(self.frequency, -16, 2, self.buffer)
+        try:
+            pygame.mixer.init(self.frequency, -16, 2, self.buffer)
+        except pygame.error as error:
+            print(f"No audio device ({error}) - sounds disabled")
+            return False
+
+        total = sum(channels for _, channels, _ in self.sounds.values())
+        pygame.mixer.set_num_channels(total)
+        pygame.mixer.set_reserved(total)
+
+        index = 0
+        for name, (_, channels, _) in self.sounds.items():
+            self.voices[name] = [[pygame.mixer.Channel(index + i), 0.0] for i in range(channels)]
+            index = index + channels
+
+        # What a sound waits behind once queued: one mixer buffer
+        frequency = pygame.mixer.get_init()[0]
+        self.output_latency = self.buffer / frequency
+        self.started = True
+        return True
+
+    def load_buffers(self, buffers):
+        """Make Sounds from synthesized buffers (needs NumPy)"""
+        for name, buf in buffers.items():
+            self.loaded[name] = pygame.sndarray.make_sound(buf)
+
+    def load_wavs(self, directory=WAV_DIR):
+        """Make Sounds from the pre-generated WAV files"""
+        for name in self.sounds:
+            path = os.path.join(directory, name + ".wav")
+            try:
+                self.loaded[name] = pygame.mixer.Sound(path)
+            except (pygame.error, FileNotFoundError) as error:
+                print(f"Could not load {path}: {error}")
+
+    # ----------------------------------------
+    # Playing
+    # ----------------------------------------
+
+    def play(self, name, triggered_at=None):
+        """
+        Play a sound on one of its own channels
+
+        triggered_at is the time.perf_counter() of whatever caused the
+        sound, for the latency hook; by default it is now.
+        """
+        sound = self.loaded.get(name)
+        if sound is None:
+            return
+        now = time.perf_counter()
+        if triggered_at is None:
+            triggered_at = now
+
+        voices = self.voices[name]
+        voice = None
+        for candidate in voices:
+            if not candidate[0].get_busy():
+                voice = candidate
+                break
+        if voice is None:
+            if self.sounds[name][2] == STEAL_SKIP:
+                self.skipped = self.skipped + 1
+                return
+            voice = min(voices, key=lambda candidate: candidate[1])
+            self.stolen = self.stolen + 1
+
+        voice[0].play(sound)
+        voice[1] = now
+        self.latency_hook(name, time.perf_counter() - triggered_at + self.output_latency)
+
+    def stop(self):
+        if self.started:
+            pygame.mixer.stop()
+
+    # ----------------------------------------
+    # Latency
+    # ----------------------------------------
+
+    def record_latency(self, name, seconds):
+        """Default latency hook: keep the last LATENCY_WINDOW delays"""
+        self.latencies[self.latency_count % LATENCY_WINDOW] = seconds
+        self.latency_count = self.latency_count + 1
+
+    def latency_summary(self):
+        """p50 / p99 / worst trigger-to-play delay in ms over recent sounds, or None"""
+        count = min(self.latency_count, LATENCY_WINDOW)
+        if count == 0:
+            return None
+        ordered = sorted(self.latencies[:count])
+        p50 = ordered[count // 2] * 1000
+        p99 = ordered[min(count - 1, int(0.99 * count))] * 1000
+        return (f"sound latency p50 {p50:.1f} ms, p99 {p99:.1f} ms, worst {ordered[-1] * 1000:.1f} ms "
+                f"({self.buffer}-sample buffer, {self.stolen} voices stolen, {self.skipped} skipped)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cyclist game sound tools")
+    parser.add_argument("--write-wavs", action="store_true",
+                        help=f"write the synthesized sounds to {WAV_DIR} (used when NumPy is missing)")
+    args = parser.parse_args(argv)
+    if args.write_wavs:
+        write_wavs()
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Background work that shares the game's frames without stalling them.
+
+The game loop runs as an asyncio task (see addictive_game2.py). Between
+presenting a frame and starting the next one it waits in short
+asyncio.sleep()s, and that idle time is where everything else runs:
+
+- cooperative tasks, started with spawn(), do a little work at a time
+  and call checkpoint() between steps. A task that has used its per-frame
+  budget is parked until the next frame, so however much work is queued
+  each task takes at most `budget` seconds out of any one frame.
+- blocking work (disk, network, heavy computation) goes to a small
+  thread pool with offload(), so it never holds up the loop at all.
+
+The frame loop tells BackgroundTasks how late it woke up from each wait.
+That lateness - the time background work actually cost the frame - and
+each task's time per frame are kept for the F3 overlay.
+"""
+import asyncio
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
+# ============================================
+# SETTINGS
+# ============================================
+TASK_BUDGET = 0.002  # Seconds of one frame each cooperative task may use
+WORKERS = 2
+WINDOW_FRAMES = 600
+
+# ============================================
+# BACKGROUND TASKS
+# ============================================
+
+class BackgroundTasks:
+    """Cooperative tasks and thread-pool jobs fitted into the idle time between frames"""
+
+    def __init__(self, budget=TASK_BUDGET, workers=WORKERS, window=WINDOW_FRAMES):
+        self.budget = budget
+        self.executor = ThreadPoolExecutor(workers, thread_name_prefix="background")
+        self.tasks = {}
+        self.used = {}         # task name -> seconds used this frame
+        self.resumed_at = {}   # task name -> when it last got control back
+        self.frame_started = None
+
+        self.window = window
+        self.frames = 0
+        self.late = array("d", [0.0] * window)       # how late each frame's wait ended
+        self.task_time = array("d", [0.0] * window)  # all tasks' time in each frame
+        self.parked = 0
+
+    def spawn(self, name, coroutine):
+        """Run a coroutine as a cooperative task; it should await checkpoint(name) between steps"""
+        self.used[name] = 0.0
+        self.resumed_at[name] = time.perf_counter()
+        task = asyncio.get_running_loop().create_task(coroutine, name=name)
+        task.add_done_callback(self._finished)
+        self.tasks[name] = task
+        return task
+
+    def _finished(self, task):
+        self.tasks.pop(task.get_name(), None)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Background task {task.get_name()} failed: {task.exception()!r}")
+
+    async def offload(self, function, *args):
+        """Run a blocking function on the thread pool and wait for its result"""
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+        finally:
+            # The wait was spent on another thread, not out of the calling task's budget
+            name = asyncio.current_task().get_name()
+            if name in self.resumed_at:
+                self.resumed_at[name] = time.perf_counter()
+
+    # ----------------------------------------
+    # Budgets (called from tasks)
+    # ----------------------------------------
+
+    async def checkpoint(self, name, wait_for_next_frame=False):
+        """
+        Let the frame loop run. Waits for the next frame if `name` is over
+        its budget, or if asked to (for tasks that do one step per frame).
+        """
+        now = time.perf_counter()
+        self.used[name] = self.used.get(name, 0.0) + now - self.resumed_at.get(name, now)
+        if wait_for_next_frame or self.used[name] >= self.budget:
+            if not wait_for_next_frame:
+                self.parked = self.parked + 1
+            await self.next_frame()
+        else:
+            await asyncio.sleep(0)
+        self.resumed_at[name] = time.perf_counter()
+
+    async def next_frame(self):
+        """Wait until the next frame has started"""
+        if self.frame_started is None:
+            self.frame_started = asyncio.get_running_loop().create_future()
+        await asyncio.shield(self.frame_started)
+
+    # ----------------------------------------
+    # Frame bookkeeping (called from the frame loop)
+    # ----------------------------------------
+
+    def begin_frame(self):
+        """A new frame started: record the last one and give every task a fresh budget"""
+        slot = self.frames % self.window
+        self.task_time[slot] = sum(self.used.values())
+        self.frames = self.frames + 1
+        for name in self.used:
+            self.used[name] = 0.0
+        if self.frame_started is not None:
+            self.frame_started.set_result(None)
+            self.frame_started = None
+
+    def woke_late(self, seconds):
+        """The frame loop's wait ended this long after it was due"""
+        # begin_frame() has already counted this frame, so its slot is one back
+        self.late[(self.frames - 1) % self.window] = max(0.0, seconds)
+
+    def summary_lines(self):
+        count = min(self.frames, self.window)
+        if count == 0:
+            return ["tasks  no frames yet"]
+        late = sorted(self.late[:count])
+        used = sorted(self.task_time[:count])
+        p99 = min(count - 1, int(0.99 * count))
+        return [f"tasks  {len(self.tasks)} running  time p99 {used[p99] * 1000:5.2f}  "
+                f"late p99 {late[p99] * 1000:5.2f}  worst {late[-1] * 1000:5.2f} ms"]
+
+    def close(self):
+        """Cancel running tasks and stop the thread pool"""
+        for task in list(self.tasks.values()):
+            task.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
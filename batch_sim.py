@@ -0,0 +1,307 @@
+"""
+Batched NumPy simulation of many independent cyclist games at once.
+
+BatchSimulation keeps every game's state in structure-of-arrays form
+(one NumPy array per field, one row per game) and advances all of them
+in lockstep with the same rules as GameSimulation.update(): gravity,
+jump strength, AABB collisions, the course's spacing rules and the
+speed ramp every speed_ramp_interval ticks, all scaled to config.tick_rate
+the same way. Obstacles, coins and hearts live in a few fixed slots per
+game with validity masks.
+
+The batch skips the parts that only matter to a human player - leagues,
+skills and the break quiz - and draws its random numbers from a NumPy
+Generator, so runs are statistically equivalent to GameSimulation but
+not bit-for-bit identical. GameSimulation loads its course a chunk at a
+time (see world_gen.py); the batch places each item as it comes within
+LOOKAHEAD of the right edge instead, with the same spacing - obstacles
+obstacle_gap_min..obstacle_gap_max apart, coins and hearts at fixed
+distances - so the games see the same course density.
+
+    batch = BatchSimulation(10000, seed=1)
+    result = batch.run(jump_when_close, max_ticks=20000)
+    print(result["score"].mean())
+"""
+import numpy as np
+
+from game_sim import SimConfig
+from game_sim import screen_width, ground_y, player_x, player_width, player_height, player_ground_y
+from game_sim import obstacle_width, obstacle_height, coin_width, coin_height, heart_width, heart_height
+from world_gen import LOOKAHEAD
+
+# ============================================
+# SLOT COUNTS
+# ============================================
+
+def slots_for(spacing, width):
+    """Slots enough for every item between the left edge and LOOKAHEAD past the right edge"""
+    return int(np.ceil((screen_width + LOOKAHEAD + width) / spacing)) + 1
+
+# ============================================
+# BATCH SIMULATION
+# ============================================
+
+class BatchSimulation:
+    """N independent games advanced together as NumPy arrays"""
+
+    def __init__(self, n_games, config=None, seed=None):
+        self.n_games = n_games
+        self.config = config or SimConfig()
+        self.rng = np.random.default_rng(seed)
+        self.tick_scale = self.config.tick_scale
+
+        # Coins and hearts are as far apart as they used to spawn at the
+        # starting speed, like in SeededCourse
+        config = self.config
+        self.coin_spacing = config.coin_spawn_rate * config.base_obstacle_speed
+        self.heart_spacing = config.heart_spawn_rate * config.base_obstacle_speed
+        self.obstacle_slots = slots_for(config.obstacle_gap_min, obstacle_width)
+        self.coin_slots = slots_for(self.coin_spacing, coin_width)
+        self.heart_slots = slots_for(self.heart_spacing, heart_width)
+        self.rows = np.arange(n_games)
+        self.reset()
+
+    def reset(self):
+        """Start every game from scratch"""
+        n = self.n_games
+        config = self.config
+
+        self.player_y = np.full(n, float(player_ground_y))
+        self.player_velocity_y = np.zeros(n)
+        self.obstacle_speed = np.full(n, float(config.base_obstacle_speed))
+
+        self.lives = np.full(n, config.start_lives, dtype=np.int32)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.coins_collected = np.zeros(n, dtype=np.int64)
+        self.distance = np.zeros(n)  # In reference ticks, so fractional below 60 ticks/s
+
+        # Screen x of the next item of each kind still to be placed; the
+        # course starts at the right edge
+        self.next_obstacle_x = np.full(n, float(screen_width))
+        self.next_coin_x = np.full(n, float(screen_width + self.coin_spacing))
+        self.next_heart_x = np.full(n, float(screen_width + self.heart_spacing))
+
+        # Games stop advancing once they run out of lives
+        self.alive = np.ones(n, dtype=bool)
+        self.ticks_survived = np.zeros(n, dtype=np.int64)
+        self.lives_lost = np.zeros(n, dtype=np.int32)
+        self.jumps = np.zeros(n, dtype=np.int64)
+
+        # Entity slots: x positions plus a validity mask per slot
+        self.obstacle_x = np.zeros((n, self.obstacle_slots))
+        self.obstacle_valid = np.zeros((n, self.obstacle_slots), dtype=bool)
+
+        self.coin_x = np.zeros((n, self.coin_slots))
+        self.coin_y = np.zeros((n, self.coin_slots))
+        self.coin_valid = np.zeros((n, self.coin_slots), dtype=bool)
+
+        self.heart_x = np.zeros((n, self.heart_slots))
+        self.heart_y = np.zeros((n, self.heart_slots))
+        self.heart_valid = np.zeros((n, self.heart_slots), dtype=bool)
+
+    # ----------------------------------------
+    # Update
+    # ----------------------------------------
+
+    def step(self, jump=None):
+        """
+        Advance every live game by one tick
+
+        jump is an optional bool array (one per game) - True presses SPACE
+        for that game this tick. Jumps only start from the ground, like
+        in the real game.
+        """
+        config = self.config
+        alive = self.alive
+        dt = self.tick_scale
+
+        if jump is not None:
+            starts = jump & alive & (self.player_y >= player_ground_y)
+            self.player_velocity_y[starts] = config.jump_strength
+            self.jumps += starts
+
+        # Update player physics
+        self.player_velocity_y += config.gravity * dt * alive
+        self.player_y += self.player_velocity_y * dt * alive
+        grounded = self.player_y >= player_ground_y
+        self.player_y[grounded] = player_ground_y
+        self.player_velocity_y[grounded] = 0
+
+        # Move the course along (dead games don't scroll), drop what has
+        # gone past and place more ahead
+        speed = self.obstacle_speed * dt * alive
+        self._move_course(speed)
+        self._place_course()
+
+        self._collide_obstacles()
+        self._collect_pickups()
+
+        # Update score - a point every 10 distance
+        old_distance = self.distance.copy()
+        self.distance += dt * alive
+        self.ticks_survived += alive
+        self.score += alive & (self.distance // 10 > old_distance // 10)
+
+        # Make game easier after score 300, otherwise ramp the speed up
+        easy = alive & (self.score >= config.easy_score)
+        slow_down = easy & (self.obstacle_speed > config.base_obstacle_speed)
+        self.obstacle_speed[slow_down] -= config.easy_decay * dt
+        interval = config.speed_ramp_interval
+        ramp = alive & ~easy & (self.distance // interval > old_distance // interval)
+        self.obstacle_speed[ramp] += config.speed_ramp
+
+    def _move_course(self, speed):
+        self.next_obstacle_x -= speed
+        self.next_coin_x -= speed
+        self.next_heart_x -= speed
+
+        speed = speed[:, None]
+        self.obstacle_x -= speed
+        self.coin_x -= speed
+        self.heart_x -= speed
+        self.obstacle_valid &= self.obstacle_x > -obstacle_width
+        self.coin_valid &= self.coin_x > -coin_width
+        self.heart_valid &= self.heart_x > -heart_width
+
+    def _place_course(self):
+        config = self.config
+        rng = self.rng
+        horizon = screen_width + LOOKAHEAD
+
+        # Obstacles, each a random gap after the last
+        due = self.alive & (self.next_obstacle_x < horizon)
+        while due.any():
+            rows = self.rows[due]
+            self._place(self.obstacle_x, None, self.obstacle_valid, rows, self.next_obstacle_x[rows], None)
+            self.next_obstacle_x[rows] += rng.integers(config.obstacle_gap_min, config.obstacle_gap_max + 1, len(rows))
+            due = self.alive & (self.next_obstacle_x < horizon)
+
+        # Coins - half on the ground, half up where a jump reaches
+        due = self.alive & (self.next_coin_x < horizon)
+        while due.any():
+            rows = self.rows[due]
+            low = rng.random(len(rows)) < 0.5
+            coin_y = np.where(low, ground_y - coin_height,
+                              ground_y - 100 - rng.integers(0, 51, len(rows)))
+            self._place(self.coin_x, self.coin_y, self.coin_valid, rows, self.next_coin_x[rows], coin_y)
+            self.next_coin_x[rows] += self.coin_spacing
+            due = self.alive & (self.next_coin_x < horizon)
+
+        # Hearts (lifelines) - rarer than coins, and in the air
+        due = self.alive & (self.next_heart_x < horizon)
+        while due.any():
+            rows = self.rows[due]
+            heart_y = ground_y - 80 - rng.integers(0, 41, len(rows))
+            self._place(self.heart_x, self.heart_y, self.heart_valid, rows, self.next_heart_x[rows], heart_y)
+            self.next_heart_x[rows] += self.heart_spacing
+            due = self.alive & (self.next_heart_x < horizon)
+
+    def _collide_obstacles(self):
+        hit = self.obstacle_valid & player_overlaps(
+            self.player_y, self.obstacle_x, ground_y - obstacle_height, obstacle_width, obstacle_height)
+        hit &= self.alive[:, None]
+        any_hit = hit.any(axis=1)
+        if not any_hit.any():
+            return
+
+        # Lose a life and remove the first obstacle that was hit
+        rows = self.rows[any_hit]
+        slots = hit[any_hit].argmax(axis=1)
+        self.obstacle_valid[rows, slots] = False
+        self.lives[rows] -= 1
+        self.lives_lost[rows] += 1
+        self.alive &= self.lives > 0
+
+    def _place(self, xs, ys, valid, rows, new_x, new_y):
+        # Use the first free slot; slots_for() leaves enough that none should run out
+        free = ~valid[rows]
+        has_free = free.any(axis=1)
+        rows = rows[has_free]
+        slots = free[has_free].argmax(axis=1)
+        xs[rows, slots] = new_x[has_free]
+        if ys is not None:
+            ys[rows, slots] = new_y[has_free]
+        valid[rows, slots] = True
+
+    def _collect_pickups(self):
+        config = self.config
+        alive = self.alive[:, None]
+
+        # Check coin collection
+        got = self.coin_valid & alive & player_overlaps(
+            self.player_y, self.coin_x, self.coin_y, coin_width, coin_height)
+        if got.any():
+            count = got.sum(axis=1)
+            self.coin_valid &= ~got
+            self.coins_collected += count
+            self.score += 10 * count
+
+        # Check heart collection (lifeline bonus!) - one slot at a time so
+        # two hearts in one tick still respect max_lives
+        got = self.heart_valid & alive & player_overlaps(
+            self.player_y, self.heart_x, self.heart_y, heart_width, heart_height)
+        if got.any():
+            self.heart_valid &= ~got
+            for slot in range(self.heart_slots):
+                bonus = got[:, slot] & (self.lives < config.max_lives)
+                self.lives += bonus
+                self.score += 20 * bonus
+
+    # ----------------------------------------
+    # Running policies
+    # ----------------------------------------
+
+    def run(self, policy=None, max_ticks=36000):
+        """
+        Step until every game is over or max_ticks have passed
+
+        policy(batch) returns a bool array of jumps for this tick (or None
+        for no jumps). Returns a dict of per-game result arrays.
+        """
+        for _ in range(max_ticks):
+            if not self.alive.any():
+                break
+            self.step(policy(self) if policy is not None else None)
+        return self.results()
+
+    def results(self):
+        """Per-game outcome arrays (copies, safe to keep after reset)"""
+        return {
+            "ticks_survived": self.ticks_survived.copy(),
+            "score": self.score.copy(),
+            "coins_collected": self.coins_collected.copy(),
+            "lives_lost": self.lives_lost.copy(),
+            "jumps": self.jumps.copy(),
+            "finished": ~self.alive,
+        }
+
+# ============================================
+# HELPERS AND EXAMPLE POLICIES
+# ============================================
+
+def player_overlaps(player_y, xs, ys, width, height):
+    """Vectorized check_collision between each game's cyclist and its entity slots"""
+    py = player_y[:, None]
+    return ((player_x < xs + width) & (player_x + player_width > xs) &
+            (py < ys + height) & (py + player_height > ys))
+
+
+def never_jump(batch):
+    """Baseline policy: ride straight into everything"""
+    return None
+
+
+def jump_when_close(batch, distance=40):
+    """Jump when the nearest obstacle ahead is within `distance` pixels"""
+    gap = batch.obstacle_x - (player_x + player_width)
+    near = batch.obstacle_valid & (gap > 0) & (gap < distance)
+    return near.any(axis=1)
+
+
+def sloppy_jumper(batch, distance=40, hesitation=0.5):
+    """
+    Like jump_when_close, but each tick the player hesitates with some
+    probability, so a few jumps come too late - closer to a real player
+    """
+    wants = jump_when_close(batch, distance)
+    return wants & (batch.rng.random(batch.n_games) >= hesitation)
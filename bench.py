@@ -0,0 +1,338 @@
+"""
+Benchmark suite for the cyclist game.
+
+Runs a handful of scripted scenarios headless (SDL dummy video and audio
+drivers) and measures, for each one:
+
+- simulation ticks per second (GameSimulation.step with a scripted player)
+- render frames per second (GameView.draw plus present, timed without the
+  simulation step that feeds it)
+- allocations per frame (how far traced memory rises above its starting
+  point during a frame, and how often Python's youngest GC generation
+  runs, which tracks object churn)
+
+Every scenario uses a fixed seed, so numbers are comparable between
+commits. Results can be saved as JSON and later used as a baseline; a
+metric more than --threshold worse than the baseline fails the run.
+
+Usage:
+    python bench.py                                  # print a table
+    python bench.py --out before.json                # save results
+    python bench.py --baseline before.json           # compare, exit 1 on regression
+    python bench.py --quick --scenario playing       # one short scenario
+"""
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import gc
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import replace
+
+import pygame
+
+from game_sim import GameSimulation, SimConfig, Input, PRESS_SPACE
+from game_sim import screen_width, screen_height, player_x, player_width, player_ground_y
+from game_view import GameView
+
+# ============================================
+# SETTINGS
+# ============================================
+SEED = 12345
+SIM_TICKS = 20000
+RENDER_FRAMES = 600
+ALLOC_FRAMES = 200
+WARMUP_FRAMES = 60
+REPEATS = 3
+
+# Metrics compared against a baseline, and whether bigger is better
+METRICS = {
+    "ticks_per_sec": True,
+    "frames_per_sec": True,
+    "alloc_bytes_per_frame": False,
+}
+# Allocation numbers this small are noise, not regressions
+ALLOC_FLOOR_BYTES = 1024
+
+JUMP = (Input(PRESS_SPACE),)
+NO_INPUT = ()
+
+# ============================================
+# SCRIPTED PLAYERS
+# ============================================
+
+def idle(sim):
+    """Never press anything"""
+    return NO_INPUT
+
+
+def jump_when_close(sim, distance=40):
+    """Jump over the next obstacle; start a new game if this one ended"""
+    if sim.game_state != "playing":
+        return JUMP
+    obstacle_x = sim.obstacles.first_x()
+    if obstacle_x is None or sim.player_y < player_ground_y:
+        return NO_INPUT
+    gap = obstacle_x - (player_x + player_width)
+    if 0 < gap < distance:
+        return JUMP
+    return NO_INPUT
+
+
+def crash(sim):
+    """Start the game and never jump"""
+    if sim.game_state == "start":
+        return JUMP
+    return NO_INPUT
+
+
+def run_until(sim, policy, done, limit=100000):
+    """Step with `policy` until done(sim) is true"""
+    for _ in range(limit):
+        if done(sim):
+            return
+        sim.step(policy(sim))
+    raise RuntimeError("scenario never reached its starting state")
+
+# ============================================
+# SCENARIOS
+# ============================================
+# Each scenario is a config, a way to get into the state being measured,
+# and a player that keeps the game in that state.
+
+def setup_start(sim):
+    pass
+
+
+def setup_playing(sim):
+    sim.step(JUMP)
+    run_until(sim, jump_when_close, lambda s: s.tick >= 600)
+
+
+def setup_quiz(sim):
+    run_until(sim, jump_when_close, lambda s: s.break_quiz_active)
+
+
+def setup_game_over(sim):
+    run_until(sim, crash, lambda s: s.game_state == "game_over")
+
+
+def quiz_player(sim):
+    """Sit on the quiz; if it was somehow answered, wait for the next one"""
+    if sim.break_quiz_active:
+        return NO_INPUT
+    return jump_when_close(sim)
+
+
+no_breaks = SimConfig(breaks_enabled=False)
+
+SCENARIOS = {
+    "start": (SimConfig(), setup_start, idle),
+    "playing": (no_breaks, setup_playing, jump_when_close),
+    "dense": (replace(no_breaks, coin_spawn_rate=6, heart_spawn_rate=30), setup_playing, jump_when_close),
+    "quiz": (SimConfig(break_interval=2), setup_quiz, quiz_player),
+    "game_over": (SimConfig(), setup_game_over, idle),
+}
+
+# ============================================
+# MEASUREMENTS
+# ============================================
+
+def new_scenario(name):
+    config, setup, policy = SCENARIOS[name]
+    sim = GameSimulation(config, seed=SEED)
+    setup(sim)
+    return sim, policy
+
+
+def measure_ticks(name, ticks):
+    """Simulation ticks per second in this scenario"""
+    sim, policy = new_scenario(name)
+    step = sim.step
+    started = time.perf_counter()
+    for _ in range(ticks):
+        step(policy(sim))
+    return ticks / (time.perf_counter() - started)
+
+
+def measure_frames(name, view_factory, frames):
+    """Frames per second of drawing and presenting; the simulation runs untimed"""
+    sim, policy = new_scenario(name)
+    view = view_factory(sim)
+    typed = "4" if sim.break_quiz_active else ""
+
+    for _ in range(WARMUP_FRAMES):
+        sim.step(policy(sim))
+        view.draw(sim, typed, 0.5)
+        view.present()
+
+    elapsed = 0.0
+    perf_counter = time.perf_counter
+    for _ in range(frames):
+        sim.step(policy(sim))
+        started = perf_counter()
+        view.draw(sim, typed, 0.5)
+        view.present()
+        elapsed = elapsed + perf_counter() - started
+    return frames / elapsed
+
+
+def measure_allocations(name, view_factory, frames):
+    """Mean peak bytes allocated per frame (tick + draw + present) and gen-0 GCs per 1000 frames"""
+    sim, policy = new_scenario(name)
+    view = view_factory(sim)
+    typed = "4" if sim.break_quiz_active else ""
+
+    for _ in range(WARMUP_FRAMES):
+        sim.step(policy(sim))
+        view.draw(sim, typed, 0.5)
+        view.present()
+
+    gc_before = gc.get_stats()[0]["collections"]
+    tracemalloc.start()
+    allocated = 0
+    for _ in range(frames):
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        sim.step(policy(sim))
+        view.draw(sim, typed, 0.5)
+        view.present()
+        _, peak = tracemalloc.get_traced_memory()
+        allocated = allocated + peak - before
+    tracemalloc.stop()
+    gc_runs = gc.get_stats()[0]["collections"] - gc_before
+
+    return allocated / frames, gc_runs * 1000 / frames
+
+
+def run_scenario(name, view_factory, ticks, frames, alloc_frames, repeats):
+    """Best-of-`repeats` throughput plus allocation figures for one scenario"""
+    ticks_per_sec = max(measure_ticks(name, ticks) for _ in range(repeats))
+    frames_per_sec = max(measure_frames(name, view_factory, frames) for _ in range(repeats))
+    alloc_bytes, gc_runs = measure_allocations(name, view_factory, alloc_frames)
+    return {
+        "ticks_per_sec": round(ticks_per_sec, 1),
+        "frames_per_sec": round(frames_per_sec, 1),
+        "alloc_bytes_per_frame": round(alloc_bytes, 1),
+        "gc_gen0_per_1k_frames": round(gc_runs, 2),
+    }
+
+# ============================================
+# REPORTING
+# ============================================
+
+def git_commit():
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+    return result.stdout.strip() or "unknown"
+
+
+def environment():
+    return {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "sdl": ".".join(str(part) for part in pygame.get_sdl_version()),
+        "platform": platform.platform(),
+        "video_driver": os.environ.get("SDL_VIDEODRIVER", ""),
+    }
+
+
+def print_table(results):
+    print(f"{'scenario':<10} {'ticks/s':>12} {'frames/s':>10} {'bytes/frame':>12} {'gc0/1k':>8}")
+    for name, row in results.items():
+        print(f"{name:<10} {row['ticks_per_sec']:>12,.0f} {row['frames_per_sec']:>10,.1f} "
+              f"{row['alloc_bytes_per_frame']:>12,.0f} {row['gc_gen0_per_1k_frames']:>8.2f}")
+
+
+def compare(results, baseline, threshold):
+    """Lines describing every metric more than `threshold` worse than the baseline"""
+    regressions = []
+    for name, row in results.items():
+        old_row = baseline.get(name)
+        if old_row is None:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            old = old_row.get(metric)
+            new = row[metric]
+            if not old:
+                continue
+            if higher_is_better:
+                change = (old - new) / old
+            else:
+                if max(old, new) < ALLOC_FLOOR_BYTES:
+                    continue
+                change = (new - max(old, ALLOC_FLOOR_BYTES)) / max(old, ALLOC_FLOOR_BYTES)
+            if change > threshold:
+                regressions.append(f"{name}: {metric} {old:,.1f} -> {new:,.1f} ({change:+.0%} worse)")
+    return regressions
+
+# ============================================
+# MAIN
+# ============================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the cyclist game's simulation and rendering")
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS),
+                        help="scenario to run (repeatable; default all)")
+    parser.add_argument("--quick", action="store_true", help="fewer ticks, frames and repeats")
+    parser.add_argument("--repeats", type=int, help=f"runs per measurement, best kept (default {REPEATS})")
+    parser.add_argument("--out", metavar="PATH", help="write results as JSON")
+    parser.add_argument("--baseline", metavar="PATH", help="JSON from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="fail if a metric is this fraction worse than the baseline (default 0.15)")
+    args = parser.parse_args(argv)
+
+    ticks, frames, alloc_frames, repeats = SIM_TICKS, RENDER_FRAMES, ALLOC_FRAMES, REPEATS
+    if args.quick:
+        ticks, frames, alloc_frames, repeats = SIM_TICKS // 10, RENDER_FRAMES // 5, ALLOC_FRAMES // 4, 1
+    if args.repeats:
+        repeats = args.repeats
+
+    pygame.display.init()
+    pygame.font.init()
+    screen = pygame.display.set_mode((screen_width, screen_height))
+
+    def view_factory(sim):
+        return GameView(screen, sim.config.max_lives)
+
+    results = {}
+    for name in args.scenario or SCENARIOS:
+        results[name] = run_scenario(name, view_factory, ticks, frames, alloc_frames, repeats)
+        print(f"  {name} done", file=sys.stderr)
+
+    pygame.quit()
+
+    print_table(results)
+    report = {"environment": environment(), "settings": {"ticks": ticks, "frames": frames,
+              "alloc_frames": alloc_frames, "repeats": repeats, "seed": SEED}, "results": results}
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"\ncompared with {args.baseline} (commit {baseline['environment']['commit']}, "
+              f"threshold {args.threshold:.0%})")
+        regressions = compare(results, baseline["results"], args.threshold)
+        for line in regressions:
+            print("REGRESSION " + line)
+        if regressions:
+            return 1
+        print("no regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,16 @@
+"""Colors shared by the game and its rendering helpers"""
+
+# ============================================
+# COLORS
+# ============================================
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+BLUE = (50, 100, 200)
+RED = (200, 50, 50)
+YELLOW = (255, 215, 0)
+GREEN = (50, 200, 50)
+BROWN = (139, 69, 19)
+GRAY = (50, 50, 50)
+PURPLE = (128, 0, 128)
+ORANGE = (255, 165, 0)
+HEART_RED = (255, 20, 20)
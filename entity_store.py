@@ -0,0 +1,149 @@
+"""
+Ring-buffer entity storage for obstacles, coins and hearts.
+
+Everything in the game spawns at the right edge and scrolls left at the
+same speed, so entities are always sorted by x and always leave from
+the left. EntityRing takes advantage of that:
+
+- positions are stored in world coordinates, so scrolling every entity
+  is one addition to an offset instead of a loop
+- despawning at the left edge just moves the head of the ring (O(1))
+- collected or hit entities are marked dead in place and cleared out
+  when they reach the head, so nothing is ever shifted
+- collision checks binary-search for the few entities overlapping the
+  player's column instead of testing every entity
+
+So the per-tick cost stays flat however many entities are on screen.
+"""
+
+# ============================================
+# ENTITY RING
+# ============================================
+
+class EntityRing:
+    """Same-sized entities sorted by x, stored in a growable ring buffer"""
+
+    def __init__(self, width, height, capacity=16):
+        self.width = width
+        self.height = height
+        self.capacity = capacity
+        self.xs = [0.0] * capacity
+        self.ys = [0.0] * capacity
+        self.alive = [False] * capacity
+        self.head = 0
+        self.used = 0   # slots between head and tail, dead ones included
+        self.live = 0   # slots holding a live entity
+        self.scroll = 0.0
+
+    def __len__(self):
+        return self.live
+
+    def __iter__(self):
+        """Screen positions (x, y) of live entities, left to right"""
+        xs, ys, alive = self.xs, self.ys, self.alive
+        scroll = self.scroll
+        capacity = self.capacity
+        for i in range(self.used):
+            slot = (self.head + i) % capacity
+            if alive[slot]:
+                yield xs[slot] - scroll, ys[slot]
+
+    # ----------------------------------------
+    # Adding and scrolling
+    # ----------------------------------------
+
+    def append(self, x, y=0.0):
+        """Add an entity at screen position (x, y); x must not be left of the last entity"""
+        if self.used == self.capacity:
+            self._grow()
+        slot = (self.head + self.used) % self.capacity
+        self.xs[slot] = x + self.scroll
+        self.ys[slot] = y
+        self.alive[slot] = True
+        self.used = self.used + 1
+        self.live = self.live + 1
+
+    def advance(self, dx):
+        """Move every entity left by dx pixels"""
+        self.scroll = self.scroll + dx
+
+    def _grow(self):
+        # Unroll the ring into a list twice the size, oldest entity first
+        order = [(self.head + i) % self.capacity for i in range(self.used)]
+        extra = self.capacity
+        self.xs = [self.xs[i] for i in order] + [0.0] * extra
+        self.ys = [self.ys[i] for i in order] + [0.0] * extra
+        self.alive = [self.alive[i] for i in order] + [False] * extra
+        self.head = 0
+        self.capacity = self.capacity * 2
+
+    # ----------------------------------------
+    # Removing
+    # ----------------------------------------
+
+    def _trim_head(self):
+        # Drop dead slots from the left so the head is always live (or empty)
+        while self.used and not self.alive[self.head]:
+            self.head = (self.head + 1) % self.capacity
+            self.used = self.used - 1
+
+    def first_x(self):
+        """Screen x of the leftmost live entity, or None"""
+        self._trim_head()
+        if not self.used:
+            return None
+        return self.xs[self.head] - self.scroll
+
+    def drop_offscreen(self):
+        """Remove entities that have scrolled fully past the left edge (x <= -width)"""
+        limit = self.scroll - self.width
+        while True:
+            self._trim_head()
+            if not self.used or self.xs[self.head] > limit:
+                return
+            self.remove(self.head)
+
+    def remove(self, slot):
+        """Remove the entity in this slot (slots come from overlapping())"""
+        if self.alive[slot]:
+            self.alive[slot] = False
+            self.live = self.live - 1
+
+    # ----------------------------------------
+    # Broadphase
+    # ----------------------------------------
+
+    def overlapping(self, left, right):
+        """
+        Slots of live entities whose x-interval overlaps [left, right)
+
+        Binary-searches the sorted ring for the first entity that could
+        reach past `left`, then walks right until entities start beyond
+        `right`.
+        """
+        scroll = self.scroll
+        low_world = left - self.width + scroll
+        high_world = right + scroll
+        xs, alive, capacity, head = self.xs, self.alive, self.capacity, self.head
+
+        # Binary search for the first entity with world x > low_world
+        lo, hi = 0, self.used
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if xs[(head + mid) % capacity] > low_world:
+                hi = mid
+            else:
+                lo = mid + 1
+
+        slots = []
+        for i in range(lo, self.used):
+            slot = (head + i) % capacity
+            if xs[slot] >= high_world:
+                break
+            if alive[slot]:
+                slots.append(slot)
+        return slots
+
+    def position(self, slot):
+        """Screen position (x, y) of the entity in this slot"""
+        return self.xs[slot] - self.scroll, self.ys[slot]
@@ -0,0 +1,474 @@
+"""
+Headless simulation of the cyclist game.
+
+Everything that changes the state of a run - physics, obstacle, coin and
+heart movement, collisions, scoring, leagues, skills and the break quiz -
+lives in GameSimulation. The course itself (where obstacles, coins and
+hearts are) is built ahead of the player in chunks by world_gen.py.
+GameSimulation never touches pygame, so it can run with no display at
+all, far faster than real time:
+
+    sim = GameSimulation(seed=1)
+    sim.step([Input(PRESS_SPACE)])   # start the game
+    for _ in range(10000):
+        sim.step([Input(PRESS_SPACE)] if wants_jump(sim) else ())
+
+The main game (addictive_game2.py) turns key presses into Inputs, calls
+step() once per tick and draws whatever state the simulation is in.
+"""
+import random
+from collections import namedtuple
+from dataclasses import dataclass
+from functools import partial
+
+from entity_store import EntityRing
+from stats import StatsTracker
+from world_gen import WorldStream, SeededCourse, Course, LOOKAHEAD
+
+# ============================================
+# WORLD GEOMETRY
+# ============================================
+screen_width = 800
+screen_height = 400
+ground_y = 300
+
+player_x = 100
+player_width = 50
+player_height = 60
+player_ground_y = ground_y - player_height
+
+obstacle_width = 20
+obstacle_height = 50
+
+coin_width = 25
+coin_height = 25
+
+heart_width = 30
+heart_height = 30
+
+all_skills = [
+    "Perfect Timing",
+    "Quick Reflexes",
+    "Coin Hunter",
+    "Risk Management",
+    "Persistence",
+    "Pattern Recognition"
+]
+
+# League by score: (lowest score, name, range of other players in it)
+leagues = [
+    (0, "Beginner League", (45, 67)),
+    (100, "Intermediate League", (28, 42)),
+    (300, "Advanced League", (15, 25)),
+    (500, "Pro League", (8, 15)),
+]
+
+# Skills unlocked during a run: (counter, value it must reach, skill)
+skill_rules = [
+    ("coins_collected", 5, "Coin Hunter"),
+    ("distance", 300, "Persistence"),
+    ("score", 200, "Quick Reflexes"),
+    ("coins_collected", 10, "Perfect Timing"),
+]
+
+quiz_questions = [
+    ("How many points do you get per coin?", "10"),
+    ("What key do you press to jump?", "space"),
+    ("What color are the coins?", "yellow"),
+    ("What are you avoiding?", "obstacles"),
+]
+
+# ============================================
+# INPUTS AND EVENTS
+# ============================================
+# SPACE starts, jumps, continues or restarts depending on the game state;
+# PAUSE toggles pause; ANSWER submits the text typed into the break quiz
+PRESS_SPACE = "space"
+PRESS_PAUSE = "pause"
+SUBMIT_ANSWER = "answer"
+
+Input = namedtuple("Input", ["action", "text"], defaults=[""])
+
+# step() returns a list of (kind, x, y) events so the caller can play
+# sounds or effects, or log them; kinds are "jump", "hit", "coin", "heart",
+# "game_over", "league", "skill", "quiz_right" and "quiz_wrong"
+Event = namedtuple("Event", ["kind", "x", "y"])
+
+# ============================================
+# TUNABLE RULES
+# ============================================
+# Speeds, gravity and spawn timers are written per tick at this rate
+# (the game's original 60 FPS). At any other tick_rate the simulation
+# scales them, so the game plays at the same speed in real time.
+reference_tick_rate = 60
+
+@dataclass
+class SimConfig:
+    """Gameplay numbers that balance runs and tuning sweeps may change"""
+    gravity: float = 0.8
+    jump_strength: float = -15
+    base_obstacle_speed: float = 5
+    # One obstacle on screen at a time, the next entering as the last one
+    # leaves; lower both (e.g. 300 and 500) for a denser course
+    obstacle_gap_min: int = screen_width + obstacle_width
+    obstacle_gap_max: int = screen_width + obstacle_width
+    coin_spawn_rate: int = 120
+    heart_spawn_rate: int = 600  # Spawn heart every 10 seconds (600 reference ticks)
+    start_lives: int = 3
+    max_lives: int = 5
+    speed_ramp_interval: int = 500
+    speed_ramp: float = 0.3
+    easy_score: int = 300  # Game gets easier again after this score
+    easy_decay: float = 0.05
+    break_interval: float = 60  # Seconds of play between break quizzes
+    breaks_enabled: bool = True
+    tick_rate: int = 60
+    course: str = ""  # A fixed course from courses/ (see world_gen.py); empty for a random one
+
+    def __post_init__(self):
+        # A zero gap would place obstacles forever without moving on
+        if self.obstacle_gap_min <= 0 or self.obstacle_gap_max <= 0:
+            raise ValueError("obstacle gaps must be greater than 0")
+        if self.tick_rate <= 0:
+            raise ValueError("tick_rate must be greater than 0")
+
+    @property
+    def tick_scale(self):
+        """How much of a reference (60 FPS) tick each of our ticks is worth"""
+        scale = reference_tick_rate / self.tick_rate
+        return int(scale) if scale.is_integer() else scale
+
+# ============================================
+# SIMULATION
+# ============================================
+
+class GameSimulation:
+    """The complete state of one player's session, advanced with step()"""
+
+    def __init__(self, config=None, seed=None, high_score=0, world=None, course=None):
+        self.config = config or SimConfig()
+        # Chunks of course are made inline unless the caller passes a
+        # threaded WorldStream (the real game does)
+        self.world = world or WorldStream()
+        # A fixed course is read once, here or by the caller, and replayed
+        # from its start every game
+        if course is None and self.config.course:
+            course = Course(self.config.course)
+        self.course = course
+        self.rng = random.Random(seed)
+
+        self.tick_scale = self.config.tick_scale
+        self.seed = seed
+
+        self.game_state = "start"
+        self.tick = 0
+        self.high_score = high_score  # Carried over from earlier sessions (see persistence.py)
+        self.skills_learned = []
+        self.skills_known = set()
+        self.player_league = "Beginner"
+        self.league_members = 0
+
+        # Leagues and skills change only when a counter reaches one of
+        # these thresholds (see stats.py), never by polling every tick
+        self.stats = StatsTracker()
+        for lowest_score, league, members in leagues:
+            self.stats.watch("score", lowest_score, partial(self.enter_league, league, members))
+        for counter, value, skill in skill_rules:
+            self.stats.watch(counter, value, partial(self.learn_skill, skill))
+
+        self.break_quiz_active = False
+        self.quiz_question = ""
+        self.quiz_answer = ""
+
+        self.events = []
+        self.reset_game()
+
+    def reset_game(self):
+        """Reset all variables to start new game"""
+        config = self.config
+
+        self.player_y = player_ground_y
+        self.player_velocity_y = 0
+        self.animation_frame = 0
+
+        # How far the world has scrolled, plus the previous tick's values
+        # so the renderer can interpolate between ticks
+        self.scroll = 0
+        self.previous_scroll = 0
+        self.previous_player_y = self.player_y
+
+        # Entities are kept sorted by x in ring buffers (see entity_store.py)
+        self.obstacles = EntityRing(obstacle_width, obstacle_height)
+        self.coins = EntityRing(coin_width, coin_height)
+        self.hearts = EntityRing(heart_width, heart_height)
+
+        # Every game gets its own course, starting at the right edge of the screen
+        if self.course is not None:
+            source = self.course.rewound()
+        else:
+            source = SeededCourse(config, self.rng.getrandbits(64), ground_y, coin_height)
+        self.world.restart(source)
+        self.course_end = screen_width  # In scroll coordinates, like the rings
+        self.load_course()
+
+        self.score = 0
+        self.coins_collected = 0
+        self.distance = 0
+        self.player_lives = config.start_lives
+
+        stats = self.stats
+        stats.reset("score")
+        stats.reset("coins_collected")
+        stats.reset("distance")
+
+        self.obstacle_speed = config.base_obstacle_speed
+
+        # Play time is simulation time, so breaks come after a minute of
+        # play whether we run in real time or flat out
+        self.play_time = 0.0
+        self.last_break_time = 0.0
+        self.break_offered = False
+
+    # ----------------------------------------
+    # Inputs
+    # ----------------------------------------
+
+    def handle_input(self, action, text=""):
+        """Apply one input the same way the key handlers used to"""
+        state = self.game_state
+
+        # While the quiz is up, only a submitted answer counts
+        if self.break_quiz_active:
+            if action == SUBMIT_ANSWER:
+                if text.lower() == self.quiz_answer:
+                    self.break_quiz_active = False
+                    self.finish_break()
+                    self.events.append(Event("quiz_right", player_x, self.player_y))
+                else:
+                    self.game_state = "break_screen"
+                    self.break_quiz_active = False
+                    self.events.append(Event("quiz_wrong", player_x, self.player_y))
+
+        elif state == "start" or state == "game_over":
+            if action == PRESS_SPACE:
+                self.game_state = "playing"
+                self.reset_game()
+
+        elif state == "playing":
+            if action == PRESS_SPACE:
+                if self.player_y >= player_ground_y:
+                    self.player_velocity_y = self.config.jump_strength
+                    self.events.append(Event("jump", player_x, self.player_y))
+            elif action == PRESS_PAUSE:
+                self.game_state = "paused"
+
+        elif state == "paused":
+            if action == PRESS_PAUSE:
+                self.game_state = "playing"
+
+        elif state == "break_screen":
+            if action == PRESS_SPACE:
+                self.game_state = "playing"
+                self.finish_break()
+
+    def finish_break(self):
+        """Start counting towards the next break from now"""
+        self.last_break_time = self.play_time
+        self.break_offered = False
+
+    # ----------------------------------------
+    # Update
+    # ----------------------------------------
+
+    def step(self, inputs=()):
+        """
+        Advance the game by one tick
+
+        inputs is a sequence of Input tuples (or (action, text) pairs) that
+        arrived since the last tick. Returns the list of Events this tick.
+        """
+        self.events = []
+        for item in inputs:
+            self.handle_input(*item)
+
+        # The world stands still while the break quiz is up, the same as
+        # when paused, so nothing can hit the player while they type
+        if self.game_state == "playing" and not self.break_quiz_active:
+            self.update()
+
+        self.tick = self.tick + 1
+        return self.events
+
+    def update(self):
+        """Run one tick of gameplay (only called while playing)"""
+        config = self.config
+        stats = self.stats
+        dt = self.tick_scale
+
+        self.previous_player_y = self.player_y
+        self.previous_scroll = self.scroll
+
+        self.animation_frame = self.animation_frame + dt
+        self.play_time = self.play_time + 1.0 / config.tick_rate
+
+        # Update player physics
+        self.player_velocity_y = self.player_velocity_y + config.gravity * dt
+        self.player_y = self.player_y + self.player_velocity_y * dt
+
+        if self.player_y >= player_ground_y:
+            self.player_y = player_ground_y
+            self.player_velocity_y = 0
+
+        # Move the course along, drop what has gone past and load more ahead
+        step_x = self.obstacle_speed * dt
+        self.scroll = self.scroll + step_x
+        obstacles = self.obstacles
+        coins = self.coins
+        hearts = self.hearts
+        for ring in (obstacles, coins, hearts):
+            ring.advance(step_x)
+            ring.drop_offscreen()
+        self.load_course()
+
+        # Check collision with obstacles - only the ones in the player's column
+        for slot in obstacles.overlapping(player_x, player_x + player_width):
+            obstacle_x, obstacle_y = obstacles.position(slot)
+            if check_collision(player_x, self.player_y, player_width, player_height,
+                               obstacle_x, obstacle_y, obstacle_width, obstacle_height):
+
+                # Lose a life instead of instant game over
+                self.player_lives = self.player_lives - 1
+                self.events.append(Event("hit", obstacle_x, obstacle_y))
+
+                # Remove the obstacle that was hit
+                obstacles.remove(slot)
+
+                # Check if game over (no lives left)
+                if self.player_lives <= 0:
+                    self.end_game()
+                break  # Exit loop after hit
+
+        # Check coin collection
+        for slot in coins.overlapping(player_x, player_x + player_width):
+            coin_x, coin_y = coins.position(slot)
+            if check_collision(player_x, self.player_y, player_width, player_height,
+                               coin_x, coin_y, coin_width, coin_height):
+                coins.remove(slot)
+                self.coins_collected = self.coins_collected + 1
+                self.score = self.score + 10
+                self.events.append(Event("coin", coin_x, coin_y))
+                stats.publish("coins_collected", self.coins_collected)
+                stats.publish("score", self.score)
+
+        # Check heart collection (lifeline bonus!)
+        for slot in hearts.overlapping(player_x, player_x + player_width):
+            heart_x, heart_y = hearts.position(slot)
+            if check_collision(player_x, self.player_y, player_width, player_height,
+                               heart_x, heart_y, heart_width, heart_height):
+                hearts.remove(slot)
+                # Add a life (up to max)
+                if self.player_lives < config.max_lives:
+                    self.player_lives = self.player_lives + 1
+                    self.score = self.score + 20  # Bonus points for collecting heart
+                    self.events.append(Event("heart", heart_x, heart_y))
+                    stats.publish("score", self.score)
+
+        # Update score - a point every 10 distance
+        old_distance = self.distance
+        self.distance = self.distance + dt
+        stats.publish("distance", self.distance)
+        if self.distance // 10 > old_distance // 10:
+            self.score = self.score + 1
+            stats.publish("score", self.score)
+
+        # Check for break time
+        if self.check_break_time() and not self.break_quiz_active:
+            self.break_offered = True
+            self.break_quiz_active = True
+            self.create_break_quiz()
+
+        # Make game easier after score 300
+        if self.score >= config.easy_score:
+            if self.obstacle_speed > config.base_obstacle_speed:
+                self.obstacle_speed = self.obstacle_speed - config.easy_decay * dt
+        elif self.distance // config.speed_ramp_interval > old_distance // config.speed_ramp_interval:
+            self.obstacle_speed = self.obstacle_speed + config.speed_ramp
+
+    def interpolated(self, alpha):
+        """
+        Player y and entity x offset to draw at, `alpha` of the way from
+        the previous tick to the current one (0 = previous, 1 = current)
+        """
+        player_y = self.previous_player_y + (self.player_y - self.previous_player_y) * alpha
+        x_offset = (self.scroll - self.previous_scroll) * (1 - alpha)
+        return player_y, x_offset
+
+    def load_course(self):
+        """Copy chunks of course into the rings until it reaches LOOKAHEAD past the right edge"""
+        while self.course_end - self.scroll < screen_width + LOOKAHEAD:
+            chunk = self.world.next_chunk()
+            start = self.course_end - self.scroll
+            obstacle_y = ground_y - obstacle_height
+            for x in chunk.obstacles:
+                self.obstacles.append(start + x, obstacle_y)
+            for x, y in chunk.coins:
+                self.coins.append(start + x, y)
+            for x, y in chunk.hearts:
+                self.hearts.append(start + x, y)
+            self.course_end = self.course_end + chunk.length
+            self.world.recycle(chunk)
+
+    def end_game(self):
+        """Out of lives - record the high score and show the game over screen"""
+        # The best score so far, including the saved one this session started with
+        self.high_score = max(self.high_score, self.score)
+
+        self.game_state = "game_over"
+        self.events.append(Event("game_over", player_x, self.player_y))
+
+    # ----------------------------------------
+    # Leagues, skills and breaks
+    # ----------------------------------------
+
+    def enter_league(self, league, members):
+        """The score just reached a new league - join it and see who else is there"""
+        self.player_league = league
+        self.league_members = self.rng.randint(*members)
+        self.events.append(Event("league", player_x, self.player_y))
+
+    def learn_skill(self, skill):
+        """Add a new skill to the player's skills"""
+        if skill not in self.skills_known:
+            self.skills_known.add(skill)
+            self.skills_learned.append(skill)
+            self.events.append(Event("skill", player_x, self.player_y))
+
+    def get_next_skill(self):
+        """Get a skill the player hasn't learned yet"""
+        for skill in all_skills:
+            if skill not in self.skills_known:
+                return skill
+        return "Master Cyclist"
+
+    def check_break_time(self):
+        """Check if it's time to offer a break"""
+        if not self.config.breaks_enabled:
+            return False
+        return self.play_time - self.last_break_time >= self.config.break_interval and not self.break_offered
+
+    def create_break_quiz(self):
+        """Create a quiz question for the break"""
+        q, a = self.rng.choice(quiz_questions)
+        self.quiz_question = q
+        self.quiz_answer = a.lower()
+
+# ============================================
+# HELPERS
+# ============================================
+
+def check_collision(x1, y1, w1, h1, x2, y2, w2, h2):
+    """Check if two rectangles overlap"""
+    return (x1 < x2 + w2 and
+            x1 + w1 > x2 and
+            y1 < y2 + h2 and
+            y1 + h1 > y2)
@@ -0,0 +1,348 @@
+"""
+Drawing for the cyclist game.
+
+GameView turns a GameSimulation's state into blits on a DirtyRenderer:
+the start screen, the playfield and HUD, the pause and break-quiz
+overlays, the break screen and the game-over screen. It only reads the
+simulation, so the same view is used by the real game loop and by tools
+that render scripted scenarios (bench.py).
+
+Only the moving playfield and HUD are drawn blit by blit each frame.
+The other screens are RetainedScreens (see ui_screens.py): composed
+once, rebuilt when what they show changes, and otherwise one blit. The
+pause and quiz screens are built on a snapshot of the playfield taken
+when the game froze, with the quiz's white veil already blended in.
+"""
+import pygame
+
+from colors import WHITE, BLACK, BLUE, RED, YELLOW, GREEN, GRAY, PURPLE, ORANGE, HEART_RED
+from game_sim import screen_width, screen_height, ground_y, player_x
+from game_sim import coin_width, coin_height, obstacle_width, obstacle_height
+from parallax import Scenery
+from renderer import DirtyRenderer
+from sprites import SpriteAtlas, CYCLIST_PAD
+from text_cache import draw_text
+from ui_screens import RetainedScreen
+
+try:
+    from particles import ParticleSystem
+except ImportError:  # No NumPy - the game runs without particle effects
+    ParticleSystem = None
+
+# ============================================
+# SCREEN TEXT
+# ============================================
+start_instructions = [
+    ("HOW TO PLAY:", 130, BLACK),
+    ("Press SPACE to JUMP over obstacles", 160, BLACK),
+    ("Collect YELLOW coins for 10 points each", 185, YELLOW),
+    ("Collect RED HEARTS for extra lives! ❤️", 210, HEART_RED),
+    ("You start with 3 lives", 235, BLACK),
+    ("Press P to PAUSE anytime", 260, BLACK),
+    ("", 285, BLACK),
+    ("BREAK SYSTEM:", 310, PURPLE),
+    ("You'll get break reminders every minute", 335, PURPLE),
+    ("", 360, BLACK),
+    ("HOW TO WIN:", 385, GREEN),
+    ("Unlock skills and reach Pro League!", 410, GREEN),
+]
+
+# ============================================
+# GAME VIEW
+# ============================================
+
+class GameView:
+    """Everything needed to draw the game: sprites, background and the dirty-rect renderer"""
+
+    def __init__(self, screen, max_lives=5, downscale=1, scenery=False, effects=True):
+        self.screen = screen
+
+        # Every sprite is baked once, the first time it is needed (or by
+        # preload()); drawing them is then a single blit each
+        self.max_lives = max_lives
+        self._atlas = None
+
+        # Parallax layers behind the playfield, also built on first use
+        # (see parallax.py); without them (the default) the playfield is
+        # plain white
+        self.scenery_enabled = scenery
+        self._scenery = None
+
+        # Sparkles and debris for pickups and hits (see particles.py)
+        self.particles = ParticleSystem() if effects and ParticleSystem is not None else None
+
+        background = pygame.Surface((screen_width, screen_height)).convert()
+        background.fill(WHITE)
+        pygame.draw.line(background, BLACK, (0, ground_y), (screen_width, ground_y), 2)
+
+        # Only the parts of the screen that changed since last frame are
+        # repainted (see renderer.py); the white sky and ground line come
+        # from the cached background. With downscale the screen is smaller
+        # than the 800x400 everything is drawn at (see --low-res)
+        self.renderer = DirtyRenderer(screen, background, downscale)
+
+        # Break quiz overlay and answer box, made once instead of every frame
+        self.quiz_overlay = pygame.Surface((screen_width, screen_height)).convert()
+        self.quiz_overlay.set_alpha(200)
+        self.quiz_overlay.fill(WHITE)
+
+        self.quiz_input_box = pygame.Surface((300, 40), pygame.SRCALPHA)
+        pygame.draw.rect(self.quiz_input_box, BLACK, self.quiz_input_box.get_rect(), 2)
+
+        # Composed screens, each rebuilt only when its key changes
+        self.start_screen = RetainedScreen(self.draw_start)
+        self.pause_screen = RetainedScreen(self.draw_paused)
+        self.quiz_backdrop = RetainedScreen(self.draw_quiz_backdrop)
+        self.quiz_screen = RetainedScreen(self.draw_quiz)
+        self.break_screen = RetainedScreen(self.draw_break_screen)
+        self.game_over_screen = RetainedScreen(self.draw_game_over)
+
+        # Counts the times the game froze (paused or quiz), so each freeze
+        # gets a fresh snapshot of the playfield
+        self.frozen = False
+        self.freezes = 0
+
+    @property
+    def atlas(self):
+        if self._atlas is None:
+            self._atlas = SpriteAtlas(coin_width, (obstacle_width, obstacle_height), self.max_lives)
+        return self._atlas
+
+    @property
+    def scenery(self):
+        if self._scenery is None and self.scenery_enabled:
+            self._scenery = Scenery()
+            self.renderer.set_backdrop(self._scenery.backdrop)
+        return self._scenery
+
+    def preload(self):
+        """Bake the sprites and scenery now rather than on the first frame that draws them"""
+        return self.atlas, self.scenery
+
+    def effect(self, event):
+        """Start the particle effect (if any) for a simulation Event"""
+        if self.particles is not None:
+            self.particles.burst(event.kind, event.x, event.y)
+
+    def present(self):
+        """Push this frame's changes to the display"""
+        self.renderer.present()
+
+    # ----------------------------------------
+    # Sprites
+    # ----------------------------------------
+
+    def draw_cyclist(self, target, x, y, frame):
+        """
+        Draw a simple person riding a bicycle
+
+        The pedaling and spinning-wheel poses are pre-rendered by SpriteAtlas
+        (see sprites.paint_cyclist for how they are drawn), so this is one blit.
+        """
+        target.blit(self.atlas.cyclist(frame), (x - CYCLIST_PAD, y - CYCLIST_PAD))
+
+    def draw_heart(self, target, x, y):
+        """Draw a heart shape for lifeline"""
+        target.blit(self.atlas.heart, (x, y))
+
+    def draw_coin(self, target, x, y):
+        """Draw a coin"""
+        target.blit(self.atlas.coin, (int(x + coin_width // 2) - coin_width // 2,
+                                      int(y + coin_height // 2) - coin_height // 2))
+
+    def draw_obstacle(self, target, x):
+        """Draw an obstacle standing on the ground"""
+        target.blit(self.atlas.obstacle, (x, ground_y - obstacle_height))
+
+    # ----------------------------------------
+    # Screens
+    # ----------------------------------------
+
+    def draw(self, sim, user_input="", alpha=1.0):
+        """
+        Queue everything for the simulation's current screen
+
+        alpha is how far real time is between the previous tick and the
+        current one; moving things are drawn interpolated by that much.
+        """
+        state = sim.game_state
+        renderer = self.renderer
+        background = renderer.background
+
+        quiz = sim.break_quiz_active and state == "playing"
+        frozen = quiz or state == "paused"
+        if frozen and not self.frozen:
+            self.freezes = self.freezes + 1
+        self.frozen = frozen
+
+        if state == "start":
+            renderer.blit(self.start_screen.get(None, background), (0, 0))
+
+        elif quiz:
+            backdrop = self.quiz_backdrop.get(self.freezes, background, sim)
+            minutes_played = int(sim.play_time / 60)
+            key = (self.freezes, sim.quiz_question, minutes_played, user_input)
+            renderer.blit(self.quiz_screen.get(key, backdrop, sim, user_input), (0, 0))
+
+        elif state == "playing":
+            self.draw_playfield(renderer, sim, alpha)
+            self.draw_hud(renderer, sim)
+
+        elif state == "paused":
+            renderer.blit(self.pause_screen.get(self.freezes, background, sim), (0, 0))
+
+        elif state == "break_screen":
+            key = (sim.score, tuple(sim.skills_learned))
+            renderer.blit(self.break_screen.get(key, background, sim), (0, 0))
+
+        elif state == "game_over":
+            key = (sim.score, sim.high_score, sim.coins_collected, sim.player_league,
+                   sim.league_members, tuple(sim.skills_learned[:3]))
+            renderer.blit(self.game_over_screen.get(key, background, sim), (0, 0))
+
+    def draw_playfield(self, target, sim, alpha=1.0):
+        """The scenery, cyclist, obstacles, coins and hearts"""
+        draw_y, x_offset = sim.interpolated(alpha)
+
+        # Scenery moves with the course, interpolated the same way. It is
+        # the renderer's backdrop, so the renderer only needs to know which
+        # bands moved; a snapshot surface gets the whole backdrop
+        if self.scenery is not None:
+            for rect in self.scenery.advance(sim.scroll - x_offset):
+                self.renderer.backdrop_changed(rect)
+            if target is not self.renderer:
+                target.blit(self.scenery.backdrop, (0, 0))
+
+        self.draw_cyclist(target, player_x, draw_y, sim.animation_frame)
+
+        # The rings hold the course a little past the right edge, sorted by
+        # x, so each loop stops at the first entity that is off screen
+        for obstacle_x, _ in sim.obstacles:
+            if obstacle_x >= screen_width:
+                break
+            self.draw_obstacle(target, obstacle_x + x_offset)
+
+        for coin_x, coin_y in sim.coins:
+            if coin_x >= screen_width:
+                break
+            self.draw_coin(target, coin_x + x_offset, coin_y)
+
+        # Draw hearts (lifelines)
+        for heart_x, heart_y in sim.hearts:
+            if heart_x >= screen_width:
+                break
+            self.draw_heart(target, heart_x + x_offset, heart_y)
+
+        # Particles move in play time, so they freeze with the game
+        if self.particles is not None:
+            play_time = sim.play_time - (1 - alpha) / sim.config.tick_rate
+            self.particles.advance(play_time, sim.scroll - x_offset)
+            self.particles.draw(target)
+
+    def draw_hud(self, target, sim):
+        draw_text(target, f"Score: {sim.score}", 28, BLACK, topleft=(10, 10))
+        draw_text(target, f"Coins: {sim.coins_collected}", 28, YELLOW, topleft=(10, 40))
+
+        # Draw lives indicator with hearts
+        draw_text(target, "Lives:", 28, BLACK, topleft=(10, 70))
+
+        # Small hearts for each life, pre-drawn as one row
+        target.blit(self.atlas.lives_row(sim.player_lives), (70, 72))
+
+        draw_text(target, f"{sim.player_league} ({sim.league_members} players)", 28, PURPLE, topleft=(10, 100))
+
+        if sim.score >= 200:
+            draw_text(target, "You're really getting this game! 🌟", 28, GREEN, topleft=(screen_width - 350, 10))
+        elif sim.score >= 100:
+            draw_text(target, "You're getting it! Keep going!", 28, GREEN, topleft=(screen_width - 320, 10))
+
+    # ----------------------------------------
+    # Retained screens (painted onto a copy of their base)
+    # ----------------------------------------
+
+    def draw_start(self, target):
+        draw_text(target, "CYCLIST COLLECTOR", 64, BLACK, center=(screen_width // 2, 60))
+
+        for text, y_pos, color in start_instructions:
+            if text:
+                draw_text(target, text, 24, color, center=(screen_width // 2, y_pos))
+
+        draw_text(target, "Press SPACE to Start", 32, BLUE, center=(screen_width // 2, screen_height - 30))
+
+    def draw_paused(self, target, sim):
+        self.draw_playfield(target, sim)
+        self.draw_hud(target, sim)
+
+        draw_text(target, "PAUSED", 72, BLACK, center=(screen_width // 2, screen_height // 2))
+        draw_text(target, "Press P to Resume", 36, BLACK,
+                  center=(screen_width // 2, screen_height // 2 + 60))
+
+    def draw_quiz_backdrop(self, target, sim):
+        """The frozen playfield with the white veil blended over it"""
+        self.draw_playfield(target, sim)
+        target.blit(self.quiz_overlay, (0, 0))
+
+    def draw_quiz(self, target, sim, user_input):
+        minutes_played = int(sim.play_time / 60)
+
+        draw_text(target, "Time for a Quick Break?", 48, PURPLE, center=(screen_width // 2, 100))
+        draw_text(target, f"You've been playing for {minutes_played} minute(s)!", 32, BLACK,
+                  center=(screen_width // 2, 150))
+        draw_text(target, "Answer this to keep playing:", 32, BLACK, center=(screen_width // 2, 200))
+        draw_text(target, sim.quiz_question, 32, BLUE, center=(screen_width // 2, 240))
+
+        input_box = target.blit(self.quiz_input_box, (screen_width // 2 - 150, 280))
+        draw_text(target, user_input, 32, BLACK, topleft=(input_box.x + 10, input_box.y + 5))
+
+        draw_text(target, "Press ENTER to submit", 32, GRAY, center=(screen_width // 2, 340))
+
+    def draw_break_screen(self, target, sim):
+        draw_text(target, "Great Job! Take a Break 🎉", 64, GREEN, center=(screen_width // 2, 80))
+        draw_text(target, f"You've earned {sim.score} points!", 36, BLACK, center=(screen_width // 2, 140))
+
+        y_offset = 230
+        if len(sim.skills_learned) > 0:
+            draw_text(target, "Skills Mastered:", 36, BLUE, center=(screen_width // 2, 190))
+
+            for skill in sim.skills_learned:
+                draw_text(target, f"✓ {skill}", 28, GREEN, center=(screen_width // 2, y_offset))
+                y_offset = y_offset + 30
+
+        next_skill = sim.get_next_skill()
+        draw_text(target, f"Next time: Try for '{next_skill}'!", 28, ORANGE,
+                  center=(screen_width // 2, y_offset + 20))
+
+        draw_text(target, "Press SPACE when ready to continue", 36, BLUE,
+                  center=(screen_width // 2, screen_height - 40))
+
+    def draw_game_over(self, target, sim):
+        y_position = 40
+
+        draw_text(target, "GAME OVER!", 64, RED, center=(screen_width // 2, y_position))
+        y_position = y_position + 60
+
+        draw_text(target, f"Final Score: {sim.score}", 36, BLACK, center=(screen_width // 2, y_position))
+        y_position = y_position + 45
+
+        draw_text(target, f"High Score: {sim.high_score}", 26, BLUE, center=(screen_width // 2, y_position))
+        y_position = y_position + 35
+
+        draw_text(target, f"Coins Collected: {sim.coins_collected}", 26, YELLOW, center=(screen_width // 2, y_position))
+        y_position = y_position + 40
+
+        draw_text(target, f"League: {sim.player_league}", 26, PURPLE, center=(screen_width // 2, y_position))
+        y_position = y_position + 30
+
+        draw_text(target, f"You joined {sim.league_members} other players!", 26, PURPLE,
+                  center=(screen_width // 2, y_position))
+        y_position = y_position + 40
+
+        if len(sim.skills_learned) > 0:
+            draw_text(target, "Skills You Mastered:", 26, GREEN, center=(screen_width // 2, y_position))
+            y_position = y_position + 30
+
+            for skill in sim.skills_learned[:3]:
+                draw_text(target, f"✓ {skill}", 26, GREEN, center=(screen_width // 2, y_position))
+                y_position = y_position + 28
+
+        draw_text(target, "Press SPACE to Play Again", 36, BLUE, center=(screen_width // 2, screen_height - 25))
@@ -0,0 +1,260 @@
+"""
+Gym-style environment for training agents on the cyclist game's pixels.
+
+CyclistEnv runs a GameSimulation and draws it with the real GameView, and
+returns what is on screen as a NumPy observation:
+
+    env = CyclistEnv(gray=True, downsample=4, stack=4)
+    obs, info = env.reset(seed=1)
+    obs, reward, terminated, truncated, info = env.step(JUMP_ACTION)
+
+The screen is read through pygame.surfarray.pixels3d(), a view of the
+surface's own pixels, and downsampling is a strided view of that.
+Grayscale is integer NumPy arithmetic into scratch arrays made once.
+Each frame is then copied out of pygame once, into its slot of a
+frame-stack buffer made once, and copied a second time into that slot's
+mirror (see below). A step allocates no frame-sized arrays.
+
+The stack buffer holds every frame twice (slots i and i + stack), so the
+last `stack` frames are always one contiguous slice of it and the
+observation is a view, never a concatenation. Observations are only
+valid until the next step(); copy one to keep it. With shared=True the
+buffer lives in a multiprocessing SharedMemory block that another
+process can attach to with attach_frames().
+
+Reward is the score gained during the step; an episode ends at game
+over. Break quizzes are turned off, since an agent cannot type answers.
+With headless=True (the default) the environment uses SDL's dummy video
+and audio drivers, unless pygame's display is already open.
+
+    python gym_env.py --gray --downsample 4 --stack 4    # steps per second
+"""
+import argparse
+import os
+import time
+from dataclasses import replace
+from multiprocessing import shared_memory
+
+import numpy as np
+import pygame
+
+from game_sim import GameSimulation, SimConfig, Input, PRESS_SPACE
+from game_sim import screen_width, screen_height
+from game_view import GameView
+from replay import new_session_seed
+
+# ============================================
+# SETTINGS
+# ============================================
+NOOP_ACTION = 0
+JUMP_ACTION = 1
+ACTIONS = ((), (Input(PRESS_SPACE),))
+
+# ITU-R 601 luma weights in 1/256ths (they add up to 256)
+GRAY_WEIGHTS = (77, 150, 29)
+
+# ============================================
+# FRAME PROCESSING
+# ============================================
+
+class FrameReader:
+    """Reads a surface into a preallocated (height, width[, 3]) uint8 array"""
+
+    def __init__(self, surface, gray=False, downsample=1):
+        width, height = surface.get_size()
+        self.gray = gray
+        self.downsample = downsample
+        self.height = -(-height // downsample)
+        self.width = -(-width // downsample)
+        self.shape = (self.height, self.width) if gray else (self.height, self.width, 3)
+        if gray:
+            self.total = np.empty((self.height, self.width), np.uint16)
+            self.term = np.empty((self.height, self.width), np.uint16)
+
+    def read(self, surface, out):
+        """Write the surface's pixels (grayscale and downsampled if asked) into `out`"""
+        # pixels3d is indexed [x, y, channel]; transposing and striding are
+        # views, so `pixels` still points at the surface's own memory
+        pixels = pygame.surfarray.pixels3d(surface)
+        step = self.downsample
+        view = pixels.transpose(1, 0, 2)[::step, ::step]
+        if self.gray:
+            total, term = self.total, self.term
+            np.multiply(view[..., 0], GRAY_WEIGHTS[0], out=total, dtype=np.uint16)
+            np.multiply(view[..., 1], GRAY_WEIGHTS[1], out=term, dtype=np.uint16)
+            total += term
+            np.multiply(view[..., 2], GRAY_WEIGHTS[2], out=term, dtype=np.uint16)
+            total += term
+            np.right_shift(total, 8, out=out, casting="unsafe")
+        else:
+            np.copyto(out, view)
+        # The surface stays locked while a pixel view exists, and a locked
+        # surface cannot be drawn on
+        del view, pixels
+
+
+class FrameStack:
+    """
+    The last `depth` frames as one contiguous array, without reallocating
+
+    Each frame is written twice: once into next_slot() by the reader,
+    then copied by push() into its mirror slot `depth` further on, which
+    is what keeps every observation a single slice.
+    """
+
+    def __init__(self, depth, frame_shape, shared=False):
+        self.depth = depth
+        self.frame_shape = frame_shape
+        shape = (2 * depth,) + tuple(frame_shape)
+        self.shared = None
+        if shared:
+            size = int(np.prod(shape))
+            self.shared = shared_memory.SharedMemory(create=True, size=size)
+            self.frames = np.ndarray(shape, np.uint8, buffer=self.shared.buf)
+        else:
+            self.frames = np.empty(shape, np.uint8)
+        self.newest = depth - 1
+
+    def next_slot(self):
+        """Where the next frame goes (written once, then mirrored by push())"""
+        return self.frames[(self.newest + 1) % self.depth]
+
+    def push(self):
+        """The frame in next_slot() is complete; make it the newest"""
+        self.newest = (self.newest + 1) % self.depth
+        self.frames[self.newest + self.depth] = self.frames[self.newest]
+
+    def fill(self):
+        """Make every slot a copy of the newest frame (at the start of an episode)"""
+        self.frames[:] = self.frames[self.newest]
+
+    def observation(self):
+        """Oldest to newest, as a view of the buffer"""
+        start = self.newest + 1
+        return self.frames[start:start + self.depth]
+
+    @property
+    def name(self):
+        return self.shared.name if self.shared is not None else None
+
+    def close(self):
+        if self.shared is not None:
+            self.frames = None
+            self.shared.close()
+            self.shared.unlink()
+            self.shared = None
+
+
+def attach_frames(name, depth, frame_shape):
+    """
+    From another process: (SharedMemory, the whole 2 * depth frame buffer)
+    for a FrameStack made with shared=True. The current observation is
+    frames[newest + 1:newest + 1 + depth], with newest sent by the owner.
+    """
+    block = shared_memory.SharedMemory(name=name)
+    frames = np.ndarray((2 * depth,) + tuple(frame_shape), np.uint8, buffer=block.buf)
+    return block, frames
+
+# ============================================
+# ENVIRONMENT
+# ============================================
+
+class CyclistEnv:
+    """reset() / step() over the rendered game, in the Gym style"""
+
+    def __init__(self, gray=False, downsample=1, stack=1, ticks_per_step=1,
+                 config=None, shared=False, max_steps=None, headless=True):
+        if headless and not pygame.display.get_init():
+            # SDL reads these when the display starts, so they only apply here
+            os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+            os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+        pygame.display.init()
+        pygame.font.init()
+        self.screen = pygame.display.get_surface() or pygame.display.set_mode((screen_width, screen_height))
+        self.config = replace(config or SimConfig(), breaks_enabled=False)
+        self.ticks_per_step = ticks_per_step
+        self.max_steps = max_steps
+
+        self.reader = FrameReader(self.screen, gray, downsample)
+        self.frames = FrameStack(stack, self.reader.shape, shared=shared)
+        self.observation_shape = (stack,) + self.reader.shape
+        self.action_count = len(ACTIONS)
+
+        self.sim = None
+        self.view = None
+        self.steps = 0
+
+    def reset(self, seed=None):
+        """Start a new game; returns (observation, info)"""
+        seed = seed if seed is not None else new_session_seed()
+        self.sim = GameSimulation(self.config, seed=seed)
+        self.sim.step(ACTIONS[JUMP_ACTION])  # Leave the start screen
+        if self.view is None:
+            self.view = GameView(self.screen, self.config.max_lives)
+        self.view.renderer.invalidate()
+        self.steps = 0
+        self._render()
+        self.frames.fill()
+        return self.frames.observation(), self._info()
+
+    def step(self, action):
+        """Apply an action for ticks_per_step ticks; returns (obs, reward, terminated, truncated, info)"""
+        sim = self.sim
+        score = sim.score
+        inputs = ACTIONS[action]
+        for _ in range(self.ticks_per_step):
+            sim.step(inputs)
+            inputs = ACTIONS[NOOP_ACTION]
+            if sim.game_state == "game_over":
+                break
+        self.steps = self.steps + 1
+        self._render()
+
+        terminated = sim.game_state == "game_over"
+        truncated = self.max_steps is not None and self.steps >= self.max_steps
+        reward = sim.score - score
+        return self.frames.observation(), reward, terminated, truncated, self._info()
+
+    def _render(self):
+        self.view.draw(self.sim)
+        self.view.present()
+        self.reader.read(self.screen, self.frames.next_slot())
+        self.frames.push()
+
+    def _info(self):
+        sim = self.sim
+        return {"score": sim.score, "lives": sim.player_lives, "tick": sim.tick,
+                "newest": self.frames.newest, "shared_memory": self.frames.name}
+
+    def close(self):
+        self.frames.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the cyclist environment's steps per second")
+    parser.add_argument("--steps", type=int, default=2000)
+    parser.add_argument("--gray", action="store_true")
+    parser.add_argument("--downsample", type=int, default=1)
+    parser.add_argument("--stack", type=int, default=1)
+    parser.add_argument("--shared-memory", action="store_true")
+    args = parser.parse_args(argv)
+
+    from bench import jump_when_close
+
+    env = CyclistEnv(gray=args.gray, downsample=args.downsample, stack=args.stack,
+                     shared=args.shared_memory)
+    obs, info = env.reset(seed=1)
+    started = time.perf_counter()
+    for _ in range(args.steps):
+        action = JUMP_ACTION if jump_when_close(env.sim) else NOOP_ACTION
+        obs, reward, terminated, truncated, info = env.step(action)
+        if terminated or truncated:
+            obs, info = env.reset()
+    seconds = time.perf_counter() - started
+    print(f"observation {obs.shape} {obs.dtype}: {args.steps / seconds:.0f} steps/s")
+    env.close()
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
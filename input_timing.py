@@ -0,0 +1,128 @@
+"""
+Timestamped input and input-to-display latency for the cyclist game.
+
+pygame only hands events over when the queue is read, and the game used
+to read it once per frame, right after sleeping for the rest of the last
+frame. A key pressed early in that sleep waited the whole frame before
+anyone noticed it, and then took effect on whatever tick came next.
+
+EventPump keeps reading the queue while it waits for the next frame (a
+couple of milliseconds at a time), so every event is stamped with
+time.perf_counter() within a few ms of arriving. When a frame runs
+several ticks, the main loop uses the stamps to apply each input on the
+tick whose slice of real time it arrived in (see take_due) instead of
+lumping them all onto the first, and LatencyTracker measures how long each
+input took to reach the screen: from its stamp to the end of the
+present() of the first frame showing its effect.
+"""
+import asyncio
+import time
+from array import array
+
+# ============================================
+# SETTINGS
+# ============================================
+POLL_SECONDS = 0.002  # How often the queue is read while waiting for the next frame
+LATENCY_WINDOW = 256
+
+# ============================================
+# EVENT PUMP
+# ============================================
+
+class EventPump:
+    """Reads pygame events as they arrive and paces frames"""
+
+    def __init__(self, get_events):
+        self.get_events = get_events  # pygame.event.get
+        self.buffered = []
+        self.next_frame = time.perf_counter()
+
+    def poll(self):
+        """Every event since the last poll, as (event, arrival time) pairs"""
+        self._read()
+        events = self.buffered
+        self.buffered = []
+        return events
+
+    def _read(self):
+        now = time.perf_counter()
+        for event in self.get_events():
+            self.buffered.append((event, now))
+
+    async def wait_for_frame_async(self, fps):
+        """
+        Sleep until the next frame is due at `fps` (None or 0 means don't
+        wait), reading and stamping events the whole time. Other asyncio
+        tasks run during the wait. Returns how late (in seconds) it ended.
+        """
+        now = time.perf_counter()
+        if not fps:
+            self.next_frame = now
+        else:
+            self.next_frame = self.next_frame + 1.0 / fps
+            if self.next_frame < now:
+                self.next_frame = now  # Running late; don't try to catch up with short frames
+
+        while True:
+            self._read()
+            remaining = self.next_frame - time.perf_counter()
+            if remaining <= 0:
+                break
+            await asyncio.sleep(min(remaining, POLL_SECONDS))
+        if not fps:
+            # Uncapped: still give background tasks a turn every frame
+            await asyncio.sleep(0)
+            self._read()
+        return time.perf_counter() - self.next_frame
+
+
+def take_due(pending, tick_end):
+    """
+    Remove and return the (input, arrival time) pairs that arrived by
+    tick_end; pending is kept in arrival order
+    """
+    count = 0
+    for _, arrived in pending:
+        if arrived > tick_end:
+            break
+        count = count + 1
+    due = pending[:count]
+    del pending[:count]
+    return due
+
+# ============================================
+# LATENCY TRACKER
+# ============================================
+
+class LatencyTracker:
+    """Time from an input arriving to the first presented frame that shows it"""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.window = window
+        self.samples = array("d", [0.0] * window)
+        self.count = 0
+        self.waiting = []
+
+    def applied(self, arrivals):
+        """These inputs were just applied to the simulation"""
+        self.waiting.extend(arrivals)
+
+    def presented(self):
+        """A frame was just presented; everything applied so far is now on screen"""
+        if not self.waiting:
+            return
+        now = time.perf_counter()
+        samples, window = self.samples, self.window
+        for arrived in self.waiting:
+            samples[self.count % window] = now - arrived
+            self.count = self.count + 1
+        self.waiting = []
+
+    def summary_lines(self):
+        count = min(self.count, self.window)
+        if count == 0:
+            return ["input  no inputs yet"]
+        ordered = sorted(self.samples[:count])
+        p50 = ordered[count // 2] * 1000
+        p99 = ordered[min(count - 1, int(0.99 * count))] * 1000
+        return [f"input  p50 {p50:5.2f}  p99 {p99:5.2f}  worst {ordered[-1] * 1000:6.2f} ms  ({self.count} inputs)"]
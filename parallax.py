@@ -0,0 +1,127 @@
+"""
+Parallax scenery behind the cyclist game's playfield.
+
+The scenery is three horizontal bands that together cover the screen -
+sky with clouds, hills, and the road with the ground line - each
+scrolling at its own fraction of the course's speed.
+
+Each band is pre-rendered once as a tile that repeats every `period`
+pixels, laid out into a cached strip one period wider than the screen.
+The bands are shown on one full-screen backdrop surface that is kept
+from frame to frame: when a band moves on by a few pixels it is
+shifted in place with Surface.scroll() and only the newly exposed
+column on the right is copied from the strip. A band that didn't move
+this frame - paused, or a slow band between whole-pixel steps - costs
+nothing.
+
+DirtyRenderer shows the backdrop instead of its plain background (see
+set_backdrop()), and each band that moved is repainted as one rect
+under the sprites.
+"""
+import math
+
+import pygame
+
+from colors import BLACK
+from game_sim import screen_width, screen_height, ground_y
+
+# ============================================
+# SETTINGS
+# ============================================
+SKY = (226, 240, 252)
+CLOUD = (250, 252, 255)
+HILL = (200, 226, 196)
+HILL_EDGE = (170, 204, 166)
+ROAD = (236, 234, 228)
+ROAD_MARK = (200, 196, 188)
+
+SKY_BOTTOM = 200
+ROAD_TOP = ground_y - 2  # The road band starts just above the 2-pixel ground line
+
+# ============================================
+# LAYERS
+# ============================================
+
+class ParallaxLayer:
+    """One band of the backdrop, scrolled in place and refilled from a cached strip"""
+
+    def __init__(self, backdrop, top, height, period, speed, paint):
+        self.rect = pygame.Rect(0, top, screen_width, height)
+        self.period = period
+        self.speed = speed  # Fraction of the course's speed
+
+        # The tile repeated across screen_width + period, so any screen-wide stretch fits
+        tile = pygame.Surface((period, height)).convert()
+        paint(tile)
+        self.strip = pygame.Surface((screen_width + period, height)).convert()
+        for x in range(0, screen_width + period, period):
+            self.strip.blit(tile, (x, 0))
+
+        # The band's part of the backdrop (a view of its pixels)
+        self.band = backdrop.subsurface(self.rect)
+        self.offset = None
+
+    def advance(self, scroll):
+        """Move the band to this course scroll; True if its pixels changed"""
+        offset = int(scroll * self.speed)
+        if offset == self.offset:
+            return False
+        step = offset - self.offset if self.offset is not None else 0
+        self.offset = offset
+
+        # Strip x of the band's left edge
+        left = offset % self.period
+        height = self.rect.height
+        if 0 < step < screen_width:
+            self.band.scroll(-step, 0)
+            self.band.blit(self.strip, (screen_width - step, 0), (left + screen_width - step, 0, step, height))
+        else:
+            # First frame, a new game or a jump back: paint the whole band
+            self.band.blit(self.strip, (0, 0), (left, 0, screen_width, height))
+        return True
+
+
+def paint_sky(tile):
+    tile.fill(SKY)
+    for x, y, width in ((60, 40, 120), (330, 90, 90), (560, 30, 150)):
+        pygame.draw.ellipse(tile, CLOUD, (x, y, width, width // 3))
+        pygame.draw.ellipse(tile, CLOUD, (x + width // 4, y - width // 8, width // 2, width // 3))
+
+
+def paint_hills(tile):
+    tile.fill(SKY)
+    width, height = tile.get_size()
+    # Two sine waves whose periods divide the tile, so it repeats seamlessly
+    points = [(0, height)]
+    for x in range(0, width + 1, 8):
+        rise = 0.55 + 0.25 * math.sin(2 * math.pi * x / width) + 0.12 * math.sin(6 * math.pi * x / width)
+        points.append((x, height - rise * height))
+    points.append((width, height))
+    pygame.draw.polygon(tile, HILL, points)
+    pygame.draw.lines(tile, HILL_EDGE, False, points[1:-1], 2)
+
+
+def paint_road(tile):
+    tile.fill(ROAD)
+    pygame.draw.line(tile, BLACK, (0, ground_y - ROAD_TOP), (tile.get_width(), ground_y - ROAD_TOP), 2)
+    for x in range(0, tile.get_width(), 60):
+        pygame.draw.rect(tile, ROAD_MARK, (x, 50, 30, 4))
+
+# ============================================
+# SCENERY
+# ============================================
+
+class Scenery:
+    """All the parallax layers, on one backdrop surface"""
+
+    def __init__(self):
+        self.backdrop = pygame.Surface((screen_width, screen_height)).convert()
+        self.layers = [
+            ParallaxLayer(self.backdrop, 0, SKY_BOTTOM, 800, 0.1, paint_sky),
+            ParallaxLayer(self.backdrop, SKY_BOTTOM, ROAD_TOP - SKY_BOTTOM, 600, 0.4, paint_hills),
+            ParallaxLayer(self.backdrop, ROAD_TOP, screen_height - ROAD_TOP, 120, 1.0, paint_road),
+        ]
+
+    def advance(self, scroll):
+        """Scroll every band to this course scroll; returns the rects of the bands that changed"""
+        return [layer.rect for layer in self.layers if layer.advance(scroll)]
@@ -0,0 +1,191 @@
+"""
+Particle effects for the cyclist game: sparkles when a coin or heart is
+picked up, dust and debris when the cyclist hits an obstacle.
+
+Every particle lives in a set of NumPy arrays made once at startup
+(position, velocity, gravity, life, color), CAPACITY slots long. A burst
+writes its particles into the next slots round the ring, overwriting the
+oldest if the ring is full, and advance() moves all of them at once with
+a handful of in-place array operations, so the cost hardly depends on
+how many are alive.
+
+Drawing writes the live particles straight into the pixels of one
+transparent overlay through a surfarray view (2x2 pixels each, fading
+out with their life) and hands the renderer a single blit of the area
+they cover. Thousands of particles are one blit, not thousands.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pygame
+
+from game_sim import screen_width, screen_height, ground_y
+
+# ============================================
+# SETTINGS
+# ============================================
+CAPACITY = 4096
+PARTICLE_SIZE = 2
+
+# count, colors, speed range (pixels/s), extra upward speed, gravity (pixels/s^2),
+# life range (s), offset from the event's position to the burst's center
+Effect = namedtuple("Effect", ["count", "colors", "speed", "lift", "gravity", "life", "offset"])
+
+EFFECTS = {
+    "coin": Effect(40, [(255, 215, 0), (255, 245, 160), (255, 255, 255)],
+                   (40, 160), 60, 120, (0.3, 0.7), (12, 12)),
+    "heart": Effect(60, [(255, 50, 90), (255, 150, 180), (255, 255, 255)],
+                    (30, 140), 80, 60, (0.5, 1.0), (15, 15)),
+    "hit": Effect(120, [(200, 40, 40), (150, 30, 30), (120, 110, 100), (170, 160, 150)],
+                  (60, 260), 180, 900, (0.6, 1.2), (10, 40)),
+}
+
+# ============================================
+# PARTICLE SYSTEM
+# ============================================
+
+class ParticleSystem:
+    """Fixed-size ring of particles, advanced and drawn as whole arrays"""
+
+    def __init__(self, capacity=CAPACITY, effects=EFFECTS, seed=None):
+        self.capacity = capacity
+        self.effects = effects
+        # Effects are cosmetic, so they use their own RNG and never touch
+        # the simulation's (replays stay exact)
+        self.rng = np.random.default_rng(seed)
+
+        self.x = np.zeros(capacity, np.float32)
+        self.y = np.zeros(capacity, np.float32)
+        self.vx = np.zeros(capacity, np.float32)
+        self.vy = np.zeros(capacity, np.float32)
+        self.gravity = np.zeros(capacity, np.float32)
+        self.life = np.zeros(capacity, np.float32)
+        self.max_life = np.ones(capacity, np.float32)
+        self.color = np.zeros(capacity, np.uint8)
+        self.scratch = np.zeros(capacity, np.float32)
+        self.mask = np.zeros(capacity, bool)
+        self.next_slot = 0
+
+        # Every effect's colors in one palette; an effect's colors are a slice of it
+        self.palette_rgb = []
+        self.first_color = {}
+        for name, effect in effects.items():
+            self.first_color[name] = len(self.palette_rgb)
+            self.palette_rgb.extend(effect.colors)
+
+        self.overlay = None
+        self.box = None   # Overlay area drawn into last frame
+        self.time = None
+        self.scroll = None
+
+    def __len__(self):
+        return int(np.count_nonzero(self.life > 0))
+
+    def clear(self):
+        self.life.fill(0)
+
+    # ----------------------------------------
+    # Emitting and moving
+    # ----------------------------------------
+
+    def burst(self, kind, x, y):
+        """Start the effect for an event of this kind at (x, y); other kinds are ignored"""
+        effect = self.effects.get(kind)
+        if effect is None:
+            return
+        count = min(effect.count, self.capacity)
+        slots = (self.next_slot + np.arange(count)) % self.capacity
+        self.next_slot = (self.next_slot + count) % self.capacity
+
+        rng = self.rng
+        angle = rng.uniform(0, 2 * np.pi, count)
+        speed = rng.uniform(effect.speed[0], effect.speed[1], count)
+        life = rng.uniform(effect.life[0], effect.life[1], count)
+        self.x[slots] = x + effect.offset[0]
+        self.y[slots] = y + effect.offset[1]
+        self.vx[slots] = np.cos(angle) * speed
+        self.vy[slots] = np.sin(angle) * speed - effect.lift
+        self.gravity[slots] = effect.gravity
+        self.life[slots] = life
+        self.max_life[slots] = life
+        self.color[slots] = self.first_color[kind] + rng.integers(0, len(effect.colors), count)
+
+    def advance(self, time, scroll):
+        """
+        Move everything to this point in play time (seconds) and course
+        scroll; particles drift left with the course
+        """
+        if self.time is None or time < self.time - 0.5:
+            # First frame, or a new game started: nothing carries over
+            self.clear()
+            self.time, self.scroll = time, scroll
+            return
+        dt = max(0.0, time - self.time)
+        dx = scroll - self.scroll
+        self.time, self.scroll = time, scroll
+        if dt == 0.0 and dx == 0.0:
+            return
+
+        scratch = self.scratch
+        np.multiply(self.gravity, dt, out=scratch)
+        self.vy += scratch
+        np.multiply(self.vx, dt, out=scratch)
+        self.x += scratch
+        self.x -= dx
+        np.multiply(self.vy, dt, out=scratch)
+        self.y += scratch
+        self.life -= dt
+
+        # Anything that reaches the ground stops falling and slides to a stop
+        floor = ground_y - PARTICLE_SIZE
+        np.greater_equal(self.y, floor, out=self.mask)
+        np.minimum(self.y, floor, out=self.y)
+        self.vy[self.mask] = 0
+        self.vx[self.mask] *= 0.8
+
+    # ----------------------------------------
+    # Drawing
+    # ----------------------------------------
+
+    def _make_overlay(self):
+        self.overlay = pygame.Surface((screen_width, screen_height), pygame.SRCALPHA)
+        self.overlay.fill((0, 0, 0, 0))
+        rgb = np.array(self.palette_rgb, np.uint32).reshape(-1, 3)
+        shifts = self.overlay.get_shifts()
+        self.palette = (rgb[:, 0] << shifts[0]) | (rgb[:, 1] << shifts[1]) | (rgb[:, 2] << shifts[2])
+        self.alpha_shift = np.uint32(shifts[3])
+
+    def draw(self, target):
+        """One blit of every live, on-screen particle onto a surface or renderer"""
+        np.greater(self.life, 0, out=self.mask)
+        live = np.flatnonzero(self.mask)
+        if self.overlay is None:
+            self._make_overlay()
+        if self.box is not None:
+            self.overlay.fill((0, 0, 0, 0), self.box)
+            self.box = None
+        if live.size == 0:
+            return
+
+        xs = self.x[live].astype(np.int32)
+        ys = self.y[live].astype(np.int32)
+        on_screen = (xs >= 0) & (xs <= screen_width - PARTICLE_SIZE) & (ys >= 0) & (ys <= screen_height - PARTICLE_SIZE)
+        live, xs, ys = live[on_screen], xs[on_screen], ys[on_screen]
+        if live.size == 0:
+            return
+
+        alpha = (self.life[live] / self.max_life[live] * 255).astype(np.uint32)
+        values = self.palette[self.color[live]] | (alpha << self.alpha_shift)
+
+        # surfarray views are indexed [x, y]; the view locks the overlay,
+        # so it is dropped before the overlay is blitted
+        pixels = pygame.surfarray.pixels2d(self.overlay)
+        for dx in range(PARTICLE_SIZE):
+            for dy in range(PARTICLE_SIZE):
+                pixels[xs + dx, ys + dy] = values
+        del pixels
+
+        left, top = int(xs.min()), int(ys.min())
+        self.box = pygame.Rect(left, top, int(xs.max()) + PARTICLE_SIZE - left, int(ys.max()) + PARTICLE_SIZE - top)
+        # A new subsurface each frame, so the renderer sees the change
+        target.blit(self.overlay.subsurface(self.box), self.box.topleft)
@@ -0,0 +1,267 @@
+"""
+Persistent high scores and session stats for the cyclist game.
+
+Every finished game is appended to save_data/sessions.log, one record per
+line with a CRC32 in front so a line torn by a crash or power cut is
+detected and skipped. A small index (save_data/index.json) keeps the top
+scores and per-player totals, plus how many bytes of the log it already
+covers, so startup reads the index and only the few log records written
+after it instead of the whole history.
+
+The game never waits for the disk: record_session() updates the
+in-memory cache and hands the record to a background writer thread
+through a bounded queue. The writer batches whatever has arrived, writes
+it with one fsync, and rewrites the index (atomically, via a temporary
+file) after each batch. If the queue is ever full the record is dropped
+from the log rather than stalling a frame; the cache still has it for
+the rest of the session.
+
+    store = SessionStore()
+    best = store.best_score()                 # loads the cache on first use
+    store.record_session(session_record(sim, "ana"))
+    store.close()                             # flush and stop the writer
+"""
+import copy
+import json
+import os
+import queue
+import threading
+import time
+import zlib
+
+# ============================================
+# SETTINGS
+# ============================================
+SAVE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "save_data")
+LOG_NAME = "sessions.log"
+INDEX_NAME = "index.json"
+INDEX_VERSION = 1
+
+TOP_SCORES = 10
+QUEUE_SIZE = 64
+BATCH_SECONDS = 1.0  # Gather records for up to this long before each fsync
+CLOSE_TIMEOUT = 5.0
+
+# ============================================
+# RECORDS
+# ============================================
+
+def session_record(sim, player):
+    """What gets saved about a finished game"""
+    return {
+        "time": round(time.time(), 3),
+        "player": player,
+        "score": sim.score,
+        "coins": sim.coins_collected,
+        "distance": round(sim.distance, 2),
+        "play_time": round(sim.play_time, 2),
+        "league": sim.player_league,
+        "skills": list(sim.skills_learned),
+        "seed": sim.seed,
+    }
+
+
+def encode_record(record):
+    """One log line: CRC32 of the JSON, a space, the JSON"""
+    data = json.dumps(record, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return b"%08x " % zlib.crc32(data) + data + b"\n"
+
+
+def decode_record(line):
+    """The record in a log line, or None if the line is damaged"""
+    if len(line) < 10 or line[8:9] != b" " or not line.endswith(b"\n"):
+        return None
+    data = line[9:-1]
+    try:
+        if int(line[:8], 16) != zlib.crc32(data):
+            return None
+        return json.loads(data.decode("utf-8"))
+    except ValueError:
+        return None
+
+
+def empty_index():
+    return {"version": INDEX_VERSION, "log_size": 0, "top_scores": [], "players": {}}
+
+
+def apply_record(index, record):
+    """Fold one session into the index's top scores and player totals"""
+    entry = {"score": record["score"], "player": record["player"], "time": record["time"]}
+    top = index["top_scores"]
+    top.append(entry)
+    top.sort(key=lambda item: (-item["score"], item["time"]))
+    del top[TOP_SCORES:]
+
+    player = index["players"].setdefault(record["player"], {
+        "games": 0, "best_score": 0, "total_score": 0, "total_coins": 0, "play_time": 0.0,
+    })
+    player["games"] = player["games"] + 1
+    player["best_score"] = max(player["best_score"], record["score"])
+    player["total_score"] = player["total_score"] + record["score"]
+    player["total_coins"] = player["total_coins"] + record["coins"]
+    player["play_time"] = round(player["play_time"] + record["play_time"], 2)
+
+# ============================================
+# SESSION STORE
+# ============================================
+
+class SessionStore:
+    """In-memory view of the saved stats, written behind the game's back"""
+
+    def __init__(self, directory=SAVE_DIR):
+        self.directory = directory
+        self.log_path = os.path.join(directory, LOG_NAME)
+        self.index_path = os.path.join(directory, INDEX_NAME)
+
+        self.cache = None
+        self.queue = None
+        self.writer = None
+        self.dropped = 0
+        self.write_error = None
+
+    # ----------------------------------------
+    # Reading (from the cache)
+    # ----------------------------------------
+
+    def load(self):
+        """The cached index, read from disk the first time it is needed"""
+        if self.cache is None:
+            self.cache = self._read()
+        return self.cache
+
+    def best_score(self, player=None):
+        """Best score ever saved, overall or for one player"""
+        index = self.load()
+        if player is None:
+            top = index["top_scores"]
+            return top[0]["score"] if top else 0
+        stats = index["players"].get(player)
+        return stats["best_score"] if stats else 0
+
+    def top_scores(self):
+        return list(self.load()["top_scores"])
+
+    def player_stats(self, player):
+        return dict(self.load()["players"].get(player, {}))
+
+    def _read(self):
+        # The index covers the log up to log_size; anything after that was
+        # written after the last index update and is replayed on top
+        index = empty_index()
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            if saved.get("version") == INDEX_VERSION:
+                index = saved
+        except (OSError, ValueError):
+            pass
+
+        try:
+            log_size = os.path.getsize(self.log_path)
+        except OSError:
+            return empty_index()
+        if index["log_size"] > log_size:
+            index = empty_index()  # The log was replaced; rebuild from scratch
+
+        good_size = index["log_size"]
+        with open(self.log_path, "rb") as f:
+            f.seek(good_size)
+            for line in f:
+                record = decode_record(line)
+                if record is not None:
+                    apply_record(index, record)
+                if line.endswith(b"\n"):
+                    good_size = good_size + len(line)
+
+        # Cut off a half-written last line so new records start on a fresh one
+        if good_size < log_size:
+            with open(self.log_path, "r+b") as f:
+                f.truncate(good_size)
+        index["log_size"] = good_size
+        return index
+
+    # ----------------------------------------
+    # Writing (through the background thread)
+    # ----------------------------------------
+
+    def record_session(self, record):
+        """Save a finished game; never waits for the disk"""
+        index = self.load()
+        if self.writer is None:
+            self._start_writer(index)
+        apply_record(index, record)
+
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped = self.dropped + 1
+
+    def _start_writer(self, index):
+        os.makedirs(self.directory, exist_ok=True)
+        self.queue = queue.Queue(maxsize=QUEUE_SIZE)
+        # The writer keeps its own copy of the index, covering only what is
+        # on disk, so the saved index and its log_size always agree
+        self.writer = threading.Thread(target=self._write_loop, args=(copy.deepcopy(index),),
+                                       name="session-writer", daemon=True)
+        self.writer.start()
+
+    def _write_loop(self, index):
+        pending = self.queue
+        stop = False
+        try:
+            log = open(self.log_path, "ab")
+        except OSError as error:
+            self.write_error = error
+            return
+        with log:
+            while not stop:
+                batch = [pending.get()]
+                deadline = time.monotonic() + BATCH_SECONDS
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or batch[-1] is None:
+                        break
+                    try:
+                        batch.append(pending.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+                if batch[-1] is None:
+                    stop = True
+                    batch.pop()
+                if not batch:
+                    continue
+
+                try:
+                    for record in batch:
+                        data = encode_record(record)
+                        log.write(data)
+                        index["log_size"] = index["log_size"] + len(data)
+                        apply_record(index, record)
+                    log.flush()
+                    os.fsync(log.fileno())
+                    self._write_index(index)
+                except OSError as error:
+                    self.write_error = error
+
+    def _write_index(self, index):
+        temp_path = self.index_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.index_path)
+
+    def close(self):
+        """Write out everything queued and stop the writer (call once, on exit)"""
+        if self.writer is None:
+            return
+        try:
+            self.queue.put(None, timeout=CLOSE_TIMEOUT)
+        except queue.Full:
+            pass
+        self.writer.join(CLOSE_TIMEOUT)
+        self.writer = None
+        if self.dropped:
+            print(f"{self.dropped} session(s) could not be saved (save queue was full)")
+        if self.write_error is not None:
+            print(f"Could not save session stats: {self.write_error}")
@@ -0,0 +1,160 @@
+"""
+Per-phase frame profiler for the cyclist game.
+
+The main loop marks the end of each phase (events, update, draw,
+present, wait) and the profiler keeps the last few hundred frames of
+timings in fixed-size ring buffers, from which it reports p50/p95/p99
+and the worst frame. It can draw those numbers as an on-screen overlay
+and write every frame's timings to a CSV file for offline analysis.
+
+When disabled, mark() and end_frame() are swapped for a do-nothing
+function, so leaving the calls in the loop costs one empty call each.
+"""
+import csv
+import time
+from array import array
+
+# ============================================
+# SETTINGS
+# ============================================
+PHASES = ("events", "update", "draw", "present", "wait")
+WINDOW_FRAMES = 600  # Ten seconds at 60 FPS
+OVERLAY_REFRESH_FRAMES = 30  # Recompute the overlay text twice a second
+
+
+def _noop(*args):
+    pass
+
+# ============================================
+# FRAME PROFILER
+# ============================================
+
+class FrameProfiler:
+    """Times each phase of every frame with perf_counter_ns"""
+
+    def __init__(self, enabled=False, csv_path=None, window=WINDOW_FRAMES, phases=PHASES):
+        self.phases = phases
+        self.phase_index = {name: i for i, name in enumerate(phases)}
+        self.window = window
+
+        # One ring buffer of nanosecond timings per phase, plus one for the whole frame
+        self.samples = [array("q", [0] * window) for _ in phases]
+        self.totals = array("q", [0] * window)
+        self.current = [0] * len(phases)
+        self.frames = 0
+        self.worst_ns = 0
+        self.worst_frame = 0
+
+        self.frame_start = 0
+        self.last_mark = 0
+
+        self.overlay_visible = False
+        self.overlay_lines = []
+        self.reports = []
+
+        self.csv_file = None
+        self.csv_writer = None
+        if csv_path:
+            self.csv_file = open(csv_path, "w", newline="", buffering=1 << 16)
+            self.csv_writer = csv.writer(self.csv_file)
+            self.csv_writer.writerow(["frame", "total_ns"] + [f"{name}_ns" for name in phases])
+
+        self.set_enabled(enabled or csv_path is not None)
+
+    def set_enabled(self, enabled):
+        """Turn timing on or off; off makes every profiling call a no-op"""
+        self.enabled = enabled
+        if enabled:
+            self.begin_frame = self._begin_frame
+            self.mark = self._mark
+            self.end_frame = self._end_frame
+            # Switched on mid-frame (F3): time from now, not from zero
+            self.frame_start = self.last_mark = time.perf_counter_ns()
+        else:
+            self.begin_frame = _noop
+            self.mark = _noop
+            self.end_frame = _noop
+            self.overlay_visible = False
+
+    def add_report(self, report):
+        """Show report() - a list of lines - under the phase timings"""
+        self.reports.append(report)
+
+    def toggle_overlay(self):
+        """Show or hide the overlay (turns profiling on when shown)"""
+        if not self.enabled:
+            self.set_enabled(True)
+        self.overlay_visible = not self.overlay_visible
+        self.overlay_lines = self.summary_lines()
+
+    # ----------------------------------------
+    # Timing (hot path)
+    # ----------------------------------------
+
+    def _begin_frame(self):
+        now = time.perf_counter_ns()
+        self.frame_start = now
+        self.last_mark = now
+
+    def _mark(self, phase):
+        now = time.perf_counter_ns()
+        self.current[self.phase_index[phase]] += now - self.last_mark
+        self.last_mark = now
+
+    def _end_frame(self):
+        current = self.current
+        slot = self.frames % self.window
+        total = self.last_mark - self.frame_start
+        for i, value in enumerate(current):
+            self.samples[i][slot] = value
+        self.totals[slot] = total
+
+        if total > self.worst_ns:
+            self.worst_ns = total
+            self.worst_frame = self.frames
+        if self.csv_writer is not None:
+            self.csv_writer.writerow([self.frames, total] + current)
+
+        self.frames = self.frames + 1
+        self.current = [0] * len(current)
+
+        if self.overlay_visible and self.frames % OVERLAY_REFRESH_FRAMES == 0:
+            self.overlay_lines = self.summary_lines()
+
+    # ----------------------------------------
+    # Reporting
+    # ----------------------------------------
+
+    def percentiles(self, samples, qs=(50, 95, 99)):
+        """Percentiles (in ms) of the frames currently in the window"""
+        count = min(self.frames, self.window)
+        if count == 0:
+            return [0.0 for _ in qs]
+        ordered = sorted(samples[:count])
+        return [ordered[min(count - 1, int(q / 100 * count))] / 1e6 for q in qs]
+
+    def summary_lines(self):
+        """Human-readable report: one line for the whole frame, then one per phase"""
+        p50, p95, p99 = self.percentiles(self.totals)
+        lines = [f"frame  p50 {p50:5.2f}  p95 {p95:5.2f}  p99 {p99:5.2f}  worst {self.worst_ns / 1e6:6.2f} ms"]
+        for name, samples in zip(self.phases, self.samples):
+            p50, p95, p99 = self.percentiles(samples)
+            lines.append(f"{name:<7}p50 {p50:5.2f}  p95 {p95:5.2f}  p99 {p99:5.2f}")
+        for report in self.reports:
+            lines.extend(report())
+        return lines
+
+    def draw(self, target, draw_text, color, x=460, y=130, size=20):
+        """Draw the overlay with the given text helper (e.g. text_cache.draw_text)"""
+        if not self.overlay_visible:
+            return
+        for line in self.overlay_lines:
+            draw_text(target, line, size, color, topleft=(x, y))
+            y = y + size - 4
+
+    def close(self):
+        """Flush and close the CSV export, if any"""
+        if self.csv_file is not None:
+            self.csv_file.close()
+            self.csv_file = None
+            self.csv_writer = None
@@ -0,0 +1,179 @@
+"""
+Dirty-rectangle renderer for the cyclist game.
+
+Instead of filling the whole screen, redrawing everything and flipping
+every frame, the game hands each frame's blits to a DirtyRenderer. It
+compares them with the previous frame's blits and only repaints the
+areas that changed: each changed area is restored from a cached
+background, the sprites overlapping it are redrawn (clipped to it) and
+just those rects are pushed with pygame.display.update(). A frame that
+looks exactly like the last one - a paused or menu screen - costs no
+drawing and no display update at all.
+
+Because every sprite and text surface in the game is cached (see
+sprites.py and text_cache.py), "the same blit as last frame" is simply
+the same surface object at the same rect. The one thing allowed to
+change in place is a backdrop (the parallax scenery): a full-screen
+surface shown instead of the background, whose owner reports each area
+it changed with backdrop_changed(). That area is repainted as one rect.
+
+The game always draws in its logical 800x400 coordinates. With
+downscale > 1 the screen is that many times smaller (the low-res mode):
+each surface is shrunk once, the first frame it is blitted, and its
+positions divided, so drawing and filling cost a fraction as much. SDL
+scales the small screen back up to the window.
+"""
+import pygame
+
+# ============================================
+# SETTINGS
+# ============================================
+# If the changed area covers more than this fraction of the screen, a
+# plain full redraw and flip is cheaper than many small updates
+FULL_REDRAW_FRACTION = 0.5
+
+# ============================================
+# DIRTY-RECT RENDERER
+# ============================================
+
+class DirtyRenderer:
+    """Collects one frame of blits and repaints only what changed since the last frame"""
+
+    def __init__(self, screen, background, downscale=1):
+        self.screen = screen
+        self.screen_rect = screen.get_rect()
+        self.downscale = downscale
+        # Shrunk copies for low-res mode, keyed by id() of the original; an
+        # entry lives as long as its surface is blitted every frame or two
+        self.shrunk = {}
+        self.previous_shrunk = {}
+        self.backdrop = None
+        self.backdrop_dirty = []
+        self.set_background(background)
+        self.items = []
+        self.previous = []
+        self.previous_keys = set()
+        self.needs_full_redraw = True
+
+        # Stats for the last presented frame
+        self.dirty_rects = 0
+        self.dirty_area = 0
+        self.full_redraws = 0
+
+    def set_background(self, background):
+        """Replace the cached background (forces a full redraw)"""
+        self.background = background  # Full size, for screens composed on it
+        if self.backdrop is not None:
+            self.screen_background = self.backdrop
+        else:
+            self.screen_background = self._shrink(background)
+        self.invalidate()
+
+    def set_backdrop(self, backdrop):
+        """
+        Show a full-screen surface under every frame instead of the
+        background (None goes back to the background). Full-size screens
+        only: a backdrop changes too often to be shrunk.
+        """
+        self.backdrop = backdrop
+        self.set_background(self.background)
+
+    def backdrop_changed(self, rect):
+        """This area of the backdrop was changed in place; repaint it this frame"""
+        self.backdrop_dirty.append(rect)
+
+    def invalidate(self):
+        """Repaint the whole screen next frame, e.g. after the window was exposed"""
+        self.needs_full_redraw = True
+
+    def blit(self, surface, dest):
+        """
+        Queue a blit for this frame
+
+        Matches Surface.blit so helpers like text_cache.draw_text can
+        draw into the renderer directly. Returns the target rect.
+        """
+        rect = surface.get_rect(topleft=(int(dest[0]), int(dest[1])))
+        if self.downscale == 1:
+            self.items.append((surface, rect))
+        else:
+            shrunk = self._shrink(surface)
+            self.items.append((shrunk, shrunk.get_rect(topleft=(rect.x // self.downscale, rect.y // self.downscale))))
+        return rect
+
+    def _shrink(self, surface):
+        """The surface at 1/downscale size, made once and reused while it stays on screen"""
+        if self.downscale == 1:
+            return surface
+        key = id(surface)
+        entry = self.shrunk.get(key)
+        if entry is None:
+            entry = self.previous_shrunk.get(key)
+            if entry is None:
+                width, height = surface.get_size()
+                size = (max(1, width // self.downscale), max(1, height // self.downscale))
+                # The original is kept in the entry so its id cannot be reused
+                entry = (surface, pygame.transform.smoothscale(surface, size))
+            self.shrunk[key] = entry
+        return entry[1]
+
+    def present(self):
+        """Repaint and push the changed areas, then start a new frame"""
+        items = self.items
+        keys = {(id(surface), tuple(rect)) for surface, rect in items}
+
+        if self.needs_full_redraw:
+            self._redraw_all(items)
+        else:
+            dirty = [rect for surface, rect in items if (id(surface), tuple(rect)) not in self.previous_keys]
+            dirty.extend(rect for surface, rect in self.previous if (id(surface), tuple(rect)) not in keys)
+            dirty = [rect.clip(self.screen_rect) for rect in dirty]
+            dirty = [rect for rect in dirty if rect.width and rect.height]
+
+            # The backdrop's areas are one big rect each, so they don't
+            # count towards switching to a full redraw
+            area = sum(rect.width * rect.height for rect in dirty)
+            if area > FULL_REDRAW_FRACTION * self.screen_rect.width * self.screen_rect.height:
+                self._redraw_all(items)
+            else:
+                dirty.extend(self.backdrop_dirty)
+                self._redraw_rects(items, dirty)
+                self.dirty_area = sum(rect.width * rect.height for rect in dirty)
+
+        # Keep the surfaces referenced so their ids cannot be reused next frame
+        self.previous = items
+        self.previous_keys = keys
+        self.items = []
+        self.backdrop_dirty = []
+        if self.downscale != 1:
+            self.previous_shrunk = self.shrunk
+            self.shrunk = {}
+
+    def _redraw_all(self, items):
+        screen = self.screen
+        screen.blit(self.screen_background, (0, 0))
+        screen.blits(items, doreturn=False)
+        pygame.display.flip()
+
+        self.needs_full_redraw = False
+        self.full_redraws = self.full_redraws + 1
+        self.dirty_rects = 1
+        self.dirty_area = self.screen_rect.width * self.screen_rect.height
+
+    def _redraw_rects(self, items, dirty):
+        self.dirty_rects = len(dirty)
+        if not dirty:
+            return
+
+        screen = self.screen
+        background = self.screen_background
+        for rect in dirty:
+            # Clip so overlapping (and translucent) sprites are only drawn
+            # once over freshly restored background
+            screen.set_clip(rect)
+            screen.blit(background, rect, rect)
+            for surface, item_rect in items:
+                if item_rect.colliderect(rect):
+                    screen.blit(surface, item_rect)
+        screen.set_clip(None)
+        pygame.display.update(dirty)
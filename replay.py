@@ -0,0 +1,261 @@
+"""
+Deterministic input recording and replay for the cyclist game.
+
+A GameSimulation draws every random number from its own seeded RNG, so
+a session is fully described by its seed, its SimConfig and the inputs
+given on each tick. InputRecorder writes exactly that to a small binary
+log; load_recording() reads it back and replay() re-runs it - headless
+at full speed, or tick by tick from the main game for a visual replay -
+and compares the final state against the checksum stored in the log.
+
+File format (little-endian, version 6):
+
+    header   b"CYCREC" | u16 version | u64 seed | i64 starting high score
+             | u32 config length | config JSON
+    input    varint ticks since previous record | u8 action code
+             [answer only: varint byte length | UTF-8 text]
+    footer   varint ticks since previous record | u8 0 | varint final tick | u32 checksum
+
+Usage:
+    python replay.py session.rec            # headless replay + checksum check
+    python replay.py session.rec --info     # just print the header
+"""
+import argparse
+import json
+import os
+import struct
+import sys
+import time
+import zlib
+from dataclasses import asdict, fields
+
+from game_sim import GameSimulation, SimConfig, Input, PRESS_SPACE, PRESS_PAUSE, SUBMIT_ANSWER
+
+# ============================================
+# FORMAT
+# ============================================
+MAGIC = b"CYCREC"
+VERSION = 6  # 2: the world stands still behind the break quiz, 3: leagues roll once on entry,
+             # 4: the starting high score is in the header, 5: the course is built in chunks,
+             # 6: the high score is never made up at game over (no RNG draw)
+HEADER = "<HQqI"
+
+END_OF_LOG = 0
+ACTION_CODES = {PRESS_SPACE: 1, PRESS_PAUSE: 2, SUBMIT_ANSWER: 3}
+CODE_ACTIONS = {code: action for action, code in ACTION_CODES.items()}
+
+
+class ReplayError(Exception):
+    """The log is not a valid recording"""
+
+
+def write_varint(f, value):
+    """Write an unsigned LEB128 integer"""
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value = value >> 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            f.write(out)
+            return
+
+
+def read_varint(f):
+    """Read an unsigned LEB128 integer, or None at end of file"""
+    value = 0
+    shift = 0
+    while True:
+        byte = f.read(1)
+        if not byte:
+            if shift:
+                raise ReplayError("log ends in the middle of a number")
+            return None
+        value = value | ((byte[0] & 0x7F) << shift)
+        if not byte[0] & 0x80:
+            return value
+        shift = shift + 7
+
+
+def new_session_seed():
+    """Fresh random seed for a session that wasn't given one"""
+    return int.from_bytes(os.urandom(8), "little")
+
+
+def seed_argument(text):
+    """argparse type for --seed: an integer that fits the log's u64 seed field"""
+    try:
+        seed = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"seed must be an integer, not {text!r}")
+    if not 0 <= seed < 2 ** 64:
+        raise argparse.ArgumentTypeError(f"seed must be from 0 to 2**64 - 1, not {seed}")
+    return seed
+
+
+def state_checksum(sim):
+    """CRC32 of everything that describes where a run ended up"""
+    state = (
+        sim.tick, sim.game_state, sim.score, sim.coins_collected, sim.distance,
+        sim.player_lives, sim.high_score, sim.player_y, sim.player_velocity_y,
+        sim.obstacle_speed, sim.scroll, list(sim.obstacles), list(sim.coins), list(sim.hearts),
+        sim.skills_learned, sim.player_league, sim.league_members,
+        sim.break_quiz_active, sim.quiz_question, sim.rng.getstate(),
+    )
+    return zlib.crc32(repr(state).encode("utf-8"))
+
+# ============================================
+# RECORDING
+# ============================================
+
+class InputRecorder:
+    """Writes a session's seed, config and per-tick inputs to a binary log"""
+
+    def __init__(self, path, seed, config, high_score=0):
+        self.file = open(path, "wb")
+        self.last_tick = 0
+
+        config_json = json.dumps(asdict(config), sort_keys=True).encode("utf-8")
+        self.file.write(MAGIC)
+        self.file.write(struct.pack(HEADER, VERSION, seed, high_score, len(config_json)))
+        self.file.write(config_json)
+
+    def record(self, tick, inputs):
+        """Log the inputs about to be passed to sim.step() on this tick"""
+        for action, text in inputs:
+            write_varint(self.file, tick - self.last_tick)
+            self.last_tick = tick
+            self.file.write(bytes((ACTION_CODES[action],)))
+            if action == SUBMIT_ANSWER:
+                data = text.encode("utf-8")
+                write_varint(self.file, len(data))
+                self.file.write(data)
+
+    def close(self, sim):
+        """Write the final tick and state checksum, then close the log"""
+        if self.file is None:
+            return
+        write_varint(self.file, sim.tick - self.last_tick)
+        self.file.write(bytes((END_OF_LOG,)))
+        write_varint(self.file, sim.tick)
+        self.file.write(struct.pack("<I", state_checksum(sim)))
+        self.file.close()
+        self.file = None
+
+# ============================================
+# PLAYBACK
+# ============================================
+
+class Recording:
+    """A loaded log: seed, config, inputs by tick and the expected ending"""
+
+    def __init__(self, seed, config, inputs, final_tick, checksum, high_score=0):
+        self.seed = seed
+        self.high_score = high_score
+        self.config = config
+        self.inputs = inputs
+        self.final_tick = final_tick
+        self.checksum = checksum
+
+    def new_simulation(self, world=None):
+        """A fresh simulation in the same starting state as the recorded one"""
+        return GameSimulation(self.config, seed=self.seed, high_score=self.high_score, world=world)
+
+    def inputs_at(self, tick):
+        return self.inputs.get(tick, ())
+
+
+def load_recording(path):
+    """Read a log written by InputRecorder"""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ReplayError(f"{path} is not a cyclist recording")
+        header = f.read(struct.calcsize(HEADER))
+        if len(header) != struct.calcsize(HEADER):
+            raise ReplayError("truncated header")
+        version, seed, high_score, config_length = struct.unpack(HEADER, header)
+        if version != VERSION:
+            raise ReplayError(f"unsupported recording version {version}")
+
+        # Ignore config keys this version doesn't know about
+        known = {field.name for field in fields(SimConfig)}
+        values = json.loads(f.read(config_length).decode("utf-8"))
+        config = SimConfig(**{key: value for key, value in values.items() if key in known})
+
+        inputs = {}
+        tick = 0
+        final_tick = None
+        checksum = None
+        while True:
+            delta = read_varint(f)
+            if delta is None:
+                break  # No footer - the game didn't shut down cleanly
+            tick = tick + delta
+            code = f.read(1)
+            if not code:
+                raise ReplayError("log ends in the middle of a record")
+            code = code[0]
+
+            if code == END_OF_LOG:
+                final_tick = read_varint(f)
+                checksum, = struct.unpack("<I", f.read(4))
+                break
+            if code not in CODE_ACTIONS:
+                raise ReplayError(f"unknown action code {code}")
+
+            action = CODE_ACTIONS[code]
+            text = ""
+            if action == SUBMIT_ANSWER:
+                text = f.read(read_varint(f)).decode("utf-8")
+            inputs.setdefault(tick, []).append(Input(action, text))
+
+    if final_tick is None:
+        final_tick = tick + 1
+    return Recording(seed, config, inputs, final_tick, checksum, high_score)
+
+
+def replay(recording):
+    """Re-run a recording headless as fast as possible; returns the finished simulation"""
+    sim = recording.new_simulation()
+    inputs = recording.inputs
+    empty = ()
+    step = sim.step
+    for tick in range(recording.final_tick):
+        step(inputs.get(tick, empty))
+    return sim
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a recorded cyclist game session headless")
+    parser.add_argument("path")
+    parser.add_argument("--info", action="store_true", help="print the header and exit")
+    args = parser.parse_args(argv)
+
+    recording = load_recording(args.path)
+    input_count = sum(len(items) for items in recording.inputs.values())
+    print(f"seed {recording.seed}, {recording.final_tick} ticks, {input_count} inputs, "
+          f"tick rate {recording.config.tick_rate}")
+    if args.info:
+        return 0
+
+    started = time.perf_counter()
+    sim = replay(recording)
+    elapsed = time.perf_counter() - started
+    checksum = state_checksum(sim)
+
+    print(f"replayed in {elapsed:.2f}s ({recording.final_tick / max(elapsed, 1e-9):,.0f} ticks/s): "
+          f"state {sim.game_state}, score {sim.score}, high score {sim.high_score}")
+    if recording.checksum is None:
+        print(f"no checksum in log (session did not end cleanly); final checksum {checksum:08x}")
+        return 0
+    if checksum != recording.checksum:
+        print(f"CHECKSUM MISMATCH: expected {recording.checksum:08x}, got {checksum:08x}")
+        return 1
+    print(f"checksum OK ({checksum:08x})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+"""
+Pre-rendered sprites for the cyclist game.
+
+The cyclist only has four distinct poses (legs from frame % 40, spokes
+from frame % 8), so instead of ~20 pygame.draw calls per frame we bake
+each pose once into a per-pixel-alpha surface. Hearts, coins, obstacles
+and the HUD lives row are baked the same way, so drawing any of them is
+a single blit. Collisions stay plain hitbox rectangles (see game_sim.py),
+so no collision masks are made.
+"""
+import pygame
+
+from colors import BLACK, BLUE, GRAY, RED, YELLOW, HEART_RED
+
+# ============================================
+# SPRITE SIZES
+# ============================================
+# The cyclist's head, wheels and thick lines poke a few pixels outside
+# its 50x60 hitbox, so its frames are baked with a transparent border
+CYCLIST_PAD = 4
+CYCLIST_SIZE = (64, 74)
+
+HEART_SIZE = (31, 26)
+SMALL_HEART_SIZE = (16, 14)
+SMALL_HEART_SPACING = 25
+
+# ============================================
+# PRIMITIVE DRAWING (USED WHILE BAKING)
+# ============================================
+
+def paint_cyclist(surface, x, y, frame):
+    """
+    Draw a simple person riding a bicycle
+    
+    Parameters:
+    - surface: where to draw (the screen, or an atlas frame while baking)
+    - x: horizontal position (left-right) of the cyclist
+    - y: vertical position (up-down) of the cyclist
+    - frame: animation frame number for pedaling and wheel rotation
+    
+    The cyclist is made of:
+    1. Head (circle)
+    2. Body (line leaning forward)
+    3. Arms (two lines reaching to handlebars)
+    4. Legs (animated to show pedaling motion)
+    5. Bicycle frame (triangle shape)
+    6. Two wheels with rotating spokes
+    """
+    
+    # 1. DRAW HEAD
+    # Simple black circle for the head
+    pygame.draw.circle(surface, BLACK, (int(x + 25), int(y + 5)), 8)
+    
+    # 2. DRAW BODY
+    # Line from head to hip, leaning forward for cycling posture
+    pygame.draw.line(surface, BLACK, (x + 25, y + 13), (x + 30, y + 30), 3)
+    
+    # 3. DRAW ARMS - HOLDING HANDLEBARS
+    # Upper arm from shoulder to elbow
+    pygame.draw.line(surface, BLACK, (x + 25, y + 18), (x + 35, y + 25), 3)
+    # Lower arm from elbow to handlebars
+    pygame.draw.line(surface, BLACK, (x + 35, y + 25), (x + 40, y + 35), 2)
+    
+    # 4. DRAW LEGS - ANIMATED PEDALING MOTION
+    # Use frame number to create cycling animation
+    leg_angle = frame % 40  # Creates a cycle from 0 to 39
+    
+    if leg_angle < 20:
+        # First half of pedal cycle: Left leg down, right leg up
+        pygame.draw.line(surface, BLACK, (x + 30, y + 30), (x + 25, y + 45), 3)  # Left leg extended
+        pygame.draw.line(surface, BLACK, (x + 30, y + 30), (x + 35, y + 38), 3)  # Right leg bent
+    else:
+        # Second half: Right leg down, left leg up
+        pygame.draw.line(surface, BLACK, (x + 30, y + 30), (x + 35, y + 45), 3)  # Right leg extended
+        pygame.draw.line(surface, BLACK, (x + 30, y + 30), (x + 25, y + 38), 3)  # Left leg bent
+    
+    # 5. DRAW BICYCLE FRAME
+    bike_y = y + 45  # Vertical position of bike frame
+    
+    # Main frame forms a triangle (like a real bicycle)
+    pygame.draw.line(surface, BLUE, (x + 15, bike_y), (x + 40, bike_y - 10), 3)  # Top tube (horizontal)
+    pygame.draw.line(surface, BLUE, (x + 15, bike_y), (x + 28, bike_y + 10), 3)  # Seat tube (diagonal down)
+    pygame.draw.line(surface, BLUE, (x + 28, bike_y + 10), (x + 45, bike_y + 10), 3)  # Down tube (bottom)
+    
+    # Handlebars at the front
+    pygame.draw.line(surface, GRAY, (x + 40, bike_y - 10), (x + 40, bike_y - 5), 2)
+    
+    # Seat at the back
+    pygame.draw.line(surface, BLACK, (x + 13, bike_y - 2), (x + 20, bike_y - 2), 3)
+    
+    # 6. DRAW WHEELS
+    wheel_radius = 12
+    
+    # Back wheel (left side)
+    pygame.draw.circle(surface, BLACK, (int(x + 15), int(bike_y + 10)), wheel_radius, 2)
+    
+    # Front wheel (right side)
+    pygame.draw.circle(surface, BLACK, (int(x + 45), int(bike_y + 10)), wheel_radius, 2)
+    
+    # 7. DRAW WHEEL SPOKES - ANIMATED ROTATION
+    # Alternates between + shape and X shape to show spinning
+    if frame % 8 < 4:
+        # Draw + shaped spokes (vertical and horizontal)
+        
+        # Back wheel spokes
+        pygame.draw.line(surface, GRAY, (x + 15, bike_y + 10 - 8), (x + 15, bike_y + 10 + 8), 1)  # Vertical
+        pygame.draw.line(surface, GRAY, (x + 15 - 8, bike_y + 10), (x + 15 + 8, bike_y + 10), 1)  # Horizontal
+        
+        # Front wheel spokes
+        pygame.draw.line(surface, GRAY, (x + 45, bike_y + 10 - 8), (x + 45, bike_y + 10 + 8), 1)  # Vertical
+        pygame.draw.line(surface, GRAY, (x + 45 - 8, bike_y + 10), (x + 45 + 8, bike_y + 10), 1)  # Horizontal
+    else:
+        # Draw X shaped spokes (diagonal)
+        
+        # Back wheel spokes (top-left to bottom-right, top-right to bottom-left)
+        pygame.draw.line(surface, GRAY, (x + 15 - 6, bike_y + 10 - 6), (x + 15 + 6, bike_y + 10 + 6), 1)
+        pygame.draw.line(surface, GRAY, (x + 15 - 6, bike_y + 10 + 6), (x + 15 + 6, bike_y + 10 - 6), 1)
+        
+        # Front wheel spokes
+        pygame.draw.line(surface, GRAY, (x + 45 - 6, bike_y + 10 - 6), (x + 45 + 6, bike_y + 10 + 6), 1)
+        pygame.draw.line(surface, GRAY, (x + 45 - 6, bike_y + 10 + 6), (x + 45 + 6, bike_y + 10 - 6), 1)
+
+def paint_heart(surface, x, y, color=HEART_RED):
+    """Draw a heart shape for lifeline"""
+    # Draw heart using two circles and a triangle
+    # Left circle of heart
+    pygame.draw.circle(surface, color, (int(x + 8), int(y + 8)), 8)
+    # Right circle of heart
+    pygame.draw.circle(surface, color, (int(x + 22), int(y + 8)), 8)
+    # Bottom triangle
+    points = [(x + 2, y + 10), (x + 15, y + 25), (x + 28, y + 10)]
+    pygame.draw.polygon(surface, color, points)
+
+
+def paint_small_heart(surface, x, y, color=HEART_RED):
+    """Draw one of the small hearts used in the HUD lives indicator"""
+    # Small heart circles
+    pygame.draw.circle(surface, color, (int(x + 4), int(y + 4)), 4)
+    pygame.draw.circle(surface, color, (int(x + 11), int(y + 4)), 4)
+    # Small heart triangle
+    points = [(x + 1, y + 5), (x + 7.5, y + 12), (x + 14, y + 5)]
+    pygame.draw.polygon(surface, color, points)
+
+# ============================================
+# SPRITE ATLAS
+# ============================================
+
+def cyclist_pose(frame):
+    """Index of the baked pose for an animation frame (0-3)"""
+    legs = 0 if frame % 40 < 20 else 1
+    spokes = 0 if frame % 8 < 4 else 1
+    return legs * 2 + spokes
+
+
+def new_sprite(size):
+    """Transparent surface, converted for fast blitting once a display exists"""
+    surface = pygame.Surface(size, pygame.SRCALPHA)
+    if pygame.display.get_surface() is not None:
+        surface = surface.convert_alpha()
+    surface.fill((0, 0, 0, 0))
+    return surface
+
+
+class SpriteAtlas:
+    """Every game sprite baked once"""
+
+    def __init__(self, coin_size=25, obstacle_size=(20, 50), max_lives=5):
+        # Cyclist: one frame per pose. Frames 0, 4, 24 and 20 hit every
+        # combination of leg and spoke phase in cyclist_pose() order.
+        self.cyclist_frames = []
+        for frame in (0, 4, 24, 20):
+            sprite = new_sprite(CYCLIST_SIZE)
+            paint_cyclist(sprite, CYCLIST_PAD, CYCLIST_PAD, frame)
+            self.cyclist_frames.append(sprite)
+
+        self.heart = new_sprite(HEART_SIZE)
+        paint_heart(self.heart, 0, 0)
+
+        self.coin = new_sprite((coin_size, coin_size))
+        pygame.draw.circle(self.coin, YELLOW, (coin_size // 2, coin_size // 2), coin_size // 2)
+
+        self.obstacle = new_sprite(obstacle_size)
+        self.obstacle.fill(RED)
+
+        # HUD lives row: one pre-drawn strip for each possible number of lives
+        self.lives_rows = []
+        for lives in range(max_lives + 1):
+            width = max(1, (lives - 1) * SMALL_HEART_SPACING + SMALL_HEART_SIZE[0])
+            row = new_sprite((width, SMALL_HEART_SIZE[1]))
+            for i in range(lives):
+                paint_small_heart(row, i * SMALL_HEART_SPACING, 0)
+            self.lives_rows.append(row)
+
+    def cyclist(self, frame):
+        """Baked cyclist surface for this animation frame"""
+        return self.cyclist_frames[cyclist_pose(frame)]
+
+    def lives_row(self, lives):
+        """Row of small HUD hearts for this many lives"""
+        return self.lives_rows[max(0, min(lives, len(self.lives_rows) - 1))]
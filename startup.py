@@ -0,0 +1,129 @@
+"""
+Startup timing and after-first-frame asset loading for the cyclist game.
+
+The game wants its start screen up as soon as possible, so only what
+the start screen needs is loaded before the first frame. Everything
+else goes through an AssetLoader once that frame is on screen:
+
+- slow, pygame-free work (importing NumPy, synthesizing or reading sound
+  buffers) runs on a worker thread
+- work that must happen on the main thread (mixer init, turning buffers
+  into Sounds, baking sprites) runs one small job per frame from poll()
+
+StartupProfile records how long each step took; the game prints it with
+--profile-startup.
+"""
+import queue
+import threading
+import time
+from collections import deque
+
+# ============================================
+# STARTUP PROFILE
+# ============================================
+
+class StartupProfile:
+    """Named steps of startup, timed from `started` (a time.perf_counter() value)"""
+
+    def __init__(self, started=None):
+        self.started = started if started is not None else time.perf_counter()
+        self.last = self.started
+        self.steps = []        # (name, seconds, seconds since start), main thread
+        self.background = []   # (name, seconds), loader jobs
+        self.first_frame = None
+
+    def mark(self, name):
+        """The step called `name` just finished"""
+        now = time.perf_counter()
+        self.steps.append((name, now - self.last, now - self.started))
+        self.last = now
+
+    def mark_first_frame(self):
+        self.mark("first frame")
+        self.first_frame = self.last - self.started
+
+    def report(self):
+        """Human-readable breakdown, in milliseconds"""
+        lines = ["startup profile (ms)", f"  {'step':<24}{'took':>8}{'at':>9}"]
+        for name, seconds, at in self.steps:
+            lines.append(f"  {name:<24}{seconds * 1000:8.1f}{at * 1000:9.1f}")
+        if self.first_frame is not None:
+            lines.append(f"  time to first frame: {self.first_frame * 1000:.1f} ms")
+        if self.background:
+            lines.append("loaded after the first frame")
+            for name, seconds in self.background:
+                lines.append(f"  {name:<24}{seconds * 1000:8.1f}")
+        return lines
+
+# ============================================
+# ASSET LOADER
+# ============================================
+
+class AssetLoader:
+    """Loads assets behind the start screen without holding up any frame"""
+
+    def __init__(self, profile=None):
+        self.profile = profile
+        self.background_jobs = []
+        self.main_jobs = deque()
+        self.finished = queue.SimpleQueue()
+        self.running = 0
+        self.worker = None
+
+    def in_background(self, name, load, then=None, on_error=None):
+        """
+        Run load() on the worker thread
+
+        then(result) - or on_error(exception) if load() raised - is called
+        later on the main thread, from poll().
+        """
+        self.background_jobs.append((name, load, then, on_error))
+
+    def on_main_thread(self, name, job):
+        """Run job() from poll(), one job per call"""
+        self.main_jobs.append((name, job))
+
+    def start(self):
+        """Start the worker on the queued background jobs"""
+        jobs = self.background_jobs
+        self.background_jobs = []
+        self.running = self.running + len(jobs)
+        self.worker = threading.Thread(target=self._work, args=(jobs,), name="asset-loader", daemon=True)
+        self.worker.start()
+
+    def _work(self, jobs):
+        for name, load, then, on_error in jobs:
+            started = time.perf_counter()
+            try:
+                result, failed = load(), False
+            except Exception as error:
+                result, failed = error, True
+            self.finished.put((name, time.perf_counter() - started, result, failed, then, on_error))
+
+    @property
+    def done(self):
+        return self.running == 0 and not self.main_jobs and not self.background_jobs
+
+    def poll(self):
+        """Hand finished background results to their callbacks, then run one main-thread job"""
+        while not self.finished.empty():
+            name, seconds, result, failed, then, on_error = self.finished.get()
+            self.running = self.running - 1
+            self._record(name, seconds)
+            if failed:
+                if on_error is not None:
+                    on_error(result)
+                else:
+                    print(f"Could not load {name}: {result}")
+            elif then is not None:
+                self.main_jobs.appendleft((name + " (main thread)", lambda then=then, result=result: then(result)))
+
+        if self.main_jobs:
+            name, job = self.main_jobs.popleft()
+            started = time.perf_counter()
+            job()
+            self._record(name, time.perf_counter() - started)
+
+    def _record(self, name, seconds):
+        if self.profile is not None:
+            self.profile.background.append((name, seconds))
@@ -0,0 +1,67 @@
+"""
+Threshold-driven stats for the cyclist game.
+
+Leagues and skills used to be re-checked every tick: the league was
+recomputed (and its member count re-rolled) 60 times a second and every
+coin scanned the skills list. Instead, the simulation now publishes its
+counters (score, coins_collected, distance) to a StatsTracker whenever
+they change, and rules are declared up front as "when this counter
+reaches this value, call this". Each counter keeps its thresholds in a
+sorted table and remembers the next one it will reach, so publishing a
+value that crosses nothing is a single comparison - however many rules
+are registered.
+"""
+from bisect import bisect_right
+
+# ============================================
+# STATS TRACKER
+# ============================================
+
+class StatsTracker:
+    """Counters that fire rules as they reach sorted thresholds"""
+
+    def __init__(self):
+        self.values = {}
+        self.thresholds = {}   # counter -> sorted list of threshold values
+        self.rules = {}        # counter -> callbacks, in the same order as thresholds
+        self.next_index = {}   # counter -> index of the next threshold to reach
+        self.next_value = {}   # counter -> that threshold, or infinity
+
+    def watch(self, counter, threshold, callback):
+        """Call callback() when `counter` reaches `threshold` (rules at equal thresholds fire in order added)"""
+        thresholds = self.thresholds.setdefault(counter, [])
+        rules = self.rules.setdefault(counter, [])
+        position = bisect_right(thresholds, threshold)
+        thresholds.insert(position, threshold)
+        rules.insert(position, callback)
+        self._seek(counter, self.values.get(counter, 0))
+
+    def reset(self, counter, value=0):
+        """Start the counter again at `value`, firing every rule at or below it"""
+        self.values[counter] = value
+        self.next_index[counter] = 0
+        self.next_value[counter] = float("-inf")
+        self.publish(counter, value)
+
+    def publish(self, counter, value):
+        """Report the counter's new value; fires the rules for any thresholds it reached"""
+        self.values[counter] = value
+        if value >= self.next_value.get(counter, float("inf")):
+            self._cross(counter, value)
+
+    def _cross(self, counter, value):
+        thresholds = self.thresholds.get(counter, ())
+        rules = self.rules.get(counter, ())
+        i = self.next_index[counter]
+        while i < len(thresholds) and thresholds[i] <= value:
+            self.next_index[counter] = i + 1
+            rules[i]()
+            i = i + 1
+        self.next_value[counter] = thresholds[i] if i < len(thresholds) else float("inf")
+
+    def _seek(self, counter, value):
+        # Point at the first threshold above value without firing anything
+        thresholds = self.thresholds.get(counter, ())
+        i = bisect_right(thresholds, value)
+        self.next_index[counter] = i
+        self.next_value[counter] = thresholds[i] if i < len(thresholds) else float("inf")
@@ -0,0 +1,162 @@
+"""
+Tiny NumPy synthesizer and on-disk sound bank for the cyclist game.
+
+Sounds are described by a handful of parameters (frequency, duration,
+waveform, volume, envelope, pan). The first time a sound is asked for it
+is synthesized and saved under sound_cache/, keyed by a hash of those
+parameters, so later launches just load the saved buffer.
+"""
+import hashlib
+import os
+
+import numpy as np
+
+# ============================================
+# SETTINGS
+# ============================================
+SAMPLE_RATE = 22050
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sound_cache")
+
+# Bump this whenever the synthesis code changes so old cache files are ignored
+SYNTH_VERSION = 1
+
+WAVEFORMS = ("square", "sine", "triangle", "sawtooth", "noise")
+
+# ============================================
+# WAVEFORMS
+# ============================================
+
+def oscillator(waveform, frequency, n_samples, sample_rate=SAMPLE_RATE, seed=0):
+    """
+    Generate one channel of raw waveform samples as float32
+
+    "square" reproduces the game's original beep exactly: a 0/1 pulse
+    whose period is a whole number of samples. The other waveforms are
+    centred on zero and run from -1 to 1.
+    """
+    i = np.arange(n_samples)
+
+    if waveform == "square":
+        period = int(sample_rate / frequency)
+        return ((i % period) < (sample_rate / frequency / 2)).astype(np.float32)
+
+    phase = (i * (frequency / sample_rate)) % 1.0
+    if waveform == "sine":
+        wave = np.sin(2 * np.pi * phase)
+    elif waveform == "triangle":
+        wave = 4 * np.abs(phase - 0.5) - 1
+    elif waveform == "sawtooth":
+        wave = 2 * phase - 1
+    elif waveform == "noise":
+        wave = np.random.default_rng(seed).uniform(-1, 1, n_samples)
+    else:
+        raise ValueError(f"Unknown waveform {waveform!r}, expected one of {WAVEFORMS}")
+    return wave.astype(np.float32)
+
+
+def envelope(n_samples, attack=0.0, decay=0.0, sustain=1.0, release=0.0,
+             sample_rate=SAMPLE_RATE):
+    """
+    Build an ADSR volume envelope (times in seconds, sustain as 0-1 level)
+
+    Attack, decay and release are clipped so they always fit inside the sound.
+    """
+    env = np.full(n_samples, sustain, dtype=np.float32)
+
+    a = min(int(attack * sample_rate), n_samples)
+    d = min(int(decay * sample_rate), n_samples - a)
+    r = min(int(release * sample_rate), n_samples - a - d)
+
+    if a:
+        env[:a] = np.linspace(0, 1, a, endpoint=False)
+    if d:
+        env[a:a + d] = np.linspace(1, sustain, d, endpoint=False)
+    if r:
+        env[n_samples - r:] = np.linspace(sustain, 0, r)
+    return env
+
+
+def synthesize(frequency, duration, waveform="square", volume=0.3,
+               adsr=None, pan=0.0, sample_rate=SAMPLE_RATE, seed=0):
+    """
+    Synthesize a stereo int16 buffer ready for pygame.sndarray.make_sound
+
+    Parameters:
+    - frequency: pitch in Hz
+    - duration: length in seconds
+    - waveform: one of WAVEFORMS
+    - volume: peak level from 0 to 1
+    - adsr: optional (attack, decay, sustain, release) tuple for envelope()
+    - pan: -1 is hard left, 0 is centre, 1 is hard right
+    """
+    n_samples = int(round(duration * sample_rate))
+    wave = oscillator(waveform, frequency, n_samples, sample_rate, seed)
+    if adsr is not None:
+        wave *= envelope(n_samples, *adsr, sample_rate=sample_rate)
+
+    # Linear pan law - the centre position keeps both channels at full level
+    left = volume * min(1.0, 1.0 - pan)
+    right = volume * min(1.0, 1.0 + pan)
+
+    buf = np.empty((n_samples, 2), dtype=np.int16)
+    buf[:, 0] = (32767 * left * wave).astype(np.int16)
+    buf[:, 1] = (32767 * right * wave).astype(np.int16)
+    return buf
+
+# ============================================
+# SOUND BANK (DISK CACHE)
+# ============================================
+
+class SoundBank:
+    """Synthesized sound buffers, cached on disk keyed by their parameters"""
+
+    def __init__(self, cache_dir=CACHE_DIR, sample_rate=SAMPLE_RATE):
+        self.cache_dir = cache_dir
+        self.sample_rate = sample_rate
+        self.buffers = {}
+
+    def cache_key(self, frequency, duration, **options):
+        """Stable hash of everything that affects the synthesized samples"""
+        params = dict(options, frequency=frequency, duration=duration,
+                      sample_rate=self.sample_rate, version=SYNTH_VERSION)
+        text = repr(sorted(params.items()))
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def get(self, frequency, duration, **options):
+        """Return the int16 stereo buffer for these parameters, synthesizing it if needed"""
+        key = self.cache_key(frequency, duration, **options)
+        if key in self.buffers:
+            return self.buffers[key]
+
+        path = os.path.join(self.cache_dir, key + ".npy")
+        buf = self._load(path)
+        if buf is None:
+            buf = synthesize(frequency, duration, sample_rate=self.sample_rate, **options)
+            self._save(path, buf)
+
+        self.buffers[key] = buf
+        return buf
+
+    def _load(self, path):
+        try:
+            buf = np.load(path, allow_pickle=False)
+        except (OSError, ValueError):
+            return None
+        if buf.dtype != np.int16 or buf.ndim != 2 or buf.shape[1] != 2:
+            return None
+        return buf
+
+    def _save(self, path, buf):
+        # Write to a temp file first so a crash never leaves a half-written cache entry
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                np.save(f, buf, allow_pickle=False)
+            os.replace(tmp_path, path)
+        except OSError:
+            # A read-only install still works, it just synthesizes every launch
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
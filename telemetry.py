@@ -0,0 +1,286 @@
+"""
+Session telemetry for the cyclist game.
+
+Gameplay events (jumps, hits, pickups, quiz answers, league and skill
+changes, game overs) and a frame-time summary every few seconds are
+recorded as fixed-size binary records into a ring buffer allocated once
+at startup. Recording an event is a single struct.pack_into() into that
+ring - no record object or buffer is made per event, and the ring never
+grows: if the records are not shipped fast enough the newest are dropped
+and counted.
+
+Every few seconds (or when the ring is half full) a background task
+copies out what has accumulated and hands it to the thread pool, which
+compresses it with zlib and sends it to a sink: a local file, or an
+HTTP endpoint on this machine. Only one batch is in flight at a time, so
+memory stays bounded by the ring plus one batch.
+
+Telemetry is off unless the game is started with --telemetry.
+
+    python telemetry.py --serve 8765            # local HTTP stand-in
+    python addictive_game2.py --telemetry http://127.0.0.1:8765/
+    python telemetry.py --dump telemetry/events.bin
+"""
+import argparse
+import os
+import struct
+import threading
+import time
+import urllib.request
+import zlib
+from array import array
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+# ============================================
+# SETTINGS
+# ============================================
+TELEMETRY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "telemetry")
+DEFAULT_PATH = os.path.join(TELEMETRY_DIR, "events.bin")
+RING_RECORDS = 4096
+FLUSH_SECONDS = 5.0
+FRAME_WINDOW = 300  # Frames per frame-time summary record
+COMPRESS_LEVEL = 6
+HTTP_TIMEOUT = 2.0
+
+# Record: seconds since the session started, sim tick, kind, two values
+RECORD = struct.Struct("<dIBff")
+# Batch: magic, format version, record count, session id, compressed size
+BATCH = struct.Struct("<4sBxHQI")
+MAGIC = b"CTEL"
+VERSION = 1
+
+KINDS = ("session", "jump", "hit", "coin", "heart", "quiz_right", "quiz_wrong",
+         "league", "skill", "game_over", "frames")
+KIND_CODES = {name: code for code, name in enumerate(KINDS)}
+
+# ============================================
+# SINKS
+# ============================================
+
+class FileSink:
+    """Appends batches to a local file"""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+
+    def send(self, data):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, "ab") as f:
+            f.write(data)
+
+
+class HttpSink:
+    """POSTs each batch to an HTTP endpoint (see --serve)"""
+
+    def __init__(self, url):
+        self.url = url
+
+    def send(self, data):
+        request = urllib.request.Request(self.url, data=data, method="POST",
+                                         headers={"Content-Type": "application/octet-stream"})
+        with urllib.request.urlopen(request, timeout=HTTP_TIMEOUT) as response:
+            response.read()
+
+
+def open_sink(destination):
+    """A sink for a file path or an http:// URL"""
+    if destination.startswith(("http://", "https://")):
+        return HttpSink(destination)
+    return FileSink(destination)
+
+# ============================================
+# TELEMETRY
+# ============================================
+
+class Telemetry:
+    """Fixed-size ring of event records, shipped in compressed batches"""
+
+    def __init__(self, sink, capacity=RING_RECORDS, session_id=None):
+        self.sink = sink
+        self.session_id = session_id if session_id is not None else int.from_bytes(os.urandom(8), "little") >> 1
+        self.started = time.perf_counter()
+
+        self.capacity = capacity
+        self.ring = bytearray(capacity * RECORD.size)
+        self.written = 0   # records ever recorded
+        self.shipped = 0   # records ever taken for a batch
+        self.dropped = 0
+        self.batches = 0
+        self.failed = 0
+        self.send_lock = threading.Lock()  # one batch reaches the sink at a time
+
+        self.frame_times = array("d", [0.0] * FRAME_WINDOW)
+        self.frame_count = 0
+        self.last_frame = None
+
+    # ----------------------------------------
+    # Recording (hot path)
+    # ----------------------------------------
+
+    def record(self, kind, tick, a=0.0, b=0.0):
+        """Add one record; dropped (and counted) if the ring is full"""
+        written = self.written
+        if written - self.shipped >= self.capacity:
+            self.dropped = self.dropped + 1
+            return
+        RECORD.pack_into(self.ring, (written % self.capacity) * RECORD.size,
+                         time.perf_counter() - self.started, tick, KIND_CODES[kind], a, b)
+        self.written = written + 1
+
+    def record_event(self, event, sim):
+        """Record a GameSimulation Event with the values worth knowing about it"""
+        kind = event.kind
+        if kind == "league":
+            self.record(kind, sim.tick, sim.score, sim.league_members)
+        elif kind == "skill":
+            self.record(kind, sim.tick, len(sim.skills_learned), sim.score)
+        elif kind == "game_over":
+            self.record(kind, sim.tick, sim.score, sim.distance)
+        elif kind == "hit" or kind == "heart":
+            self.record(kind, sim.tick, sim.player_lives, sim.score)
+        else:
+            self.record(kind, sim.tick, event.x, event.y)
+
+    def frame(self, tick):
+        """Call once per frame; every FRAME_WINDOW frames records p50 and worst frame time"""
+        now = time.perf_counter()
+        if self.last_frame is not None:
+            self.frame_times[self.frame_count] = now - self.last_frame
+            self.frame_count = self.frame_count + 1
+            if self.frame_count == FRAME_WINDOW:
+                ordered = sorted(self.frame_times)
+                self.record("frames", tick, ordered[FRAME_WINDOW // 2] * 1000, ordered[-1] * 1000)
+                self.frame_count = 0
+        self.last_frame = now
+
+    # ----------------------------------------
+    # Shipping
+    # ----------------------------------------
+
+    def take_batch(self):
+        """Copy out every record not yet shipped (one copy per batch), or None"""
+        count = self.written - self.shipped
+        if count == 0:
+            return None
+        size = RECORD.size
+        start = (self.shipped % self.capacity) * size
+        end = start + count * size
+        if end <= len(self.ring):
+            records = bytes(self.ring[start:end])
+        else:
+            records = bytes(self.ring[start:]) + bytes(self.ring[:end - len(self.ring)])
+        self.shipped = self.written
+        return count, records
+
+    def ship(self, batch):
+        """Compress a batch and send it (blocking - runs on the thread pool)"""
+        count, records = batch
+        payload = zlib.compress(records, COMPRESS_LEVEL)
+        data = BATCH.pack(MAGIC, VERSION, count, self.session_id, len(payload)) + payload
+        with self.send_lock:
+            try:
+                self.sink.send(data)
+                self.batches = self.batches + 1
+            except OSError as error:
+                # Said once; after that failures are only counted (see summary_lines)
+                if not self.failed:
+                    print(f"Could not send telemetry: {error}")
+                self.failed = self.failed + 1
+
+    async def run(self, tasks, name="telemetry"):
+        """Background task: ship a batch every FLUSH_SECONDS, or sooner if the ring fills up"""
+        last_flush = time.perf_counter()
+        while True:
+            await tasks.checkpoint(name, wait_for_next_frame=True)
+            pending = self.written - self.shipped
+            if pending * 2 >= self.capacity or (pending and time.perf_counter() - last_flush >= FLUSH_SECONDS):
+                await tasks.offload(self.ship, self.take_batch())
+                last_flush = time.perf_counter()
+
+    def close(self):
+        """Ship whatever is left (call once, on exit)"""
+        batch = self.take_batch()
+        if batch is not None:
+            self.ship(batch)
+        if self.dropped:
+            print(f"{self.dropped} telemetry record(s) dropped (buffer was full)")
+        if self.failed > 1:
+            print(f"{self.failed} telemetry batch(es) could not be sent")
+
+    def summary_lines(self):
+        return [f"telemetry  {self.written - self.shipped} buffered  {self.batches} batches sent  "
+                f"{self.dropped} dropped  {self.failed} failed"]
+
+# ============================================
+# READING BATCHES
+# ============================================
+
+def read_batches(data):
+    """(session id, [(seconds, tick, kind, a, b), ...]) for every batch in `data`"""
+    offset = 0
+    while offset + BATCH.size <= len(data):
+        magic, version, count, session_id, size = BATCH.unpack_from(data, offset)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"not a telemetry batch at byte {offset}")
+        offset = offset + BATCH.size
+        records = zlib.decompress(data[offset:offset + size])
+        offset = offset + size
+        yield session_id, [(t, tick, KINDS[kind], a, b) for t, tick, kind, a, b in RECORD.iter_unpack(records)]
+
+
+def dump(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    kinds = Counter()
+    sessions = set()
+    for session_id, records in read_batches(data):
+        sessions.add(session_id)
+        for seconds, tick, kind, a, b in records:
+            kinds[kind] = kinds[kind] + 1
+            print(f"{session_id:016x} {seconds:9.3f} {tick:8d} {kind:<11}{a:10.2f}{b:10.2f}")
+    print(f"{len(sessions)} session(s): " + ", ".join(f"{kind} {count}" for kind, count in kinds.most_common()))
+
+# ============================================
+# LOCAL HTTP STAND-IN
+# ============================================
+
+def serve(port, path):
+    """Accept POSTed batches on localhost and append them to `path`"""
+    sink = FileSink(path)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            data = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            sink.send(data)
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    print(f"Receiving telemetry on http://127.0.0.1:{port}/ into {path}")
+    with HTTPServer(("127.0.0.1", port), Handler) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cyclist game telemetry tools")
+    parser.add_argument("--serve", type=int, metavar="PORT", help="receive telemetry over HTTP on localhost")
+    parser.add_argument("--out", default=os.path.join(TELEMETRY_DIR, "received.bin"),
+                        help="where --serve stores what it receives")
+    parser.add_argument("--dump", metavar="PATH", help="print the records in a telemetry file")
+    args = parser.parse_args(argv)
+    if args.serve:
+        serve(args.serve, args.out)
+    elif args.dump:
+        dump(args.dump)
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
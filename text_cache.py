@@ -0,0 +1,90 @@
+"""
+Shared text rendering for the cyclist game.
+
+Fonts are created once per size and rendered strings are kept in an LRU
+cache keyed by (text, size, color, antialias), so a frame that shows the
+same HUD text as the last one does no font work at all.
+"""
+from collections import OrderedDict
+
+import pygame
+
+# ============================================
+# SETTINGS
+# ============================================
+# Roughly 8 MB of rendered text; plenty for every screen in the game
+DEFAULT_BUDGET_BYTES = 8 * 1024 * 1024
+
+# ============================================
+# TEXT CACHE
+# ============================================
+
+class TextCache:
+    """One font object per size plus an LRU cache of rendered text surfaces"""
+
+    def __init__(self, budget_bytes=DEFAULT_BUDGET_BYTES, font_name=None):
+        self.budget_bytes = budget_bytes
+        self.font_name = font_name
+        self.fonts = {}
+        self.surfaces = OrderedDict()
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def font(self, size):
+        """Return the shared font for this size, creating it on first use"""
+        font = self.fonts.get(size)
+        if font is None:
+            font = pygame.font.Font(self.font_name, size)
+            self.fonts[size] = font
+        return font
+
+    def render(self, text, size, color, antialias=True):
+        """Return a cached surface for this text, rendering it only on a miss"""
+        key = (text, size, tuple(color), antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            self.hits = self.hits + 1
+            return surface
+
+        self.misses = self.misses + 1
+        surface = self.font(size).render(text, antialias, color)
+        self.surfaces[key] = surface
+        self.used_bytes = self.used_bytes + surface_bytes(surface)
+
+        # Evict least recently used text until we are back under budget,
+        # but always keep the surface we just rendered
+        while self.used_bytes > self.budget_bytes and len(self.surfaces) > 1:
+            _, old = self.surfaces.popitem(last=False)
+            self.used_bytes = self.used_bytes - surface_bytes(old)
+        return surface
+
+    def blit(self, target, text, size, color, antialias=True, **position):
+        """
+        Render text and blit it onto target
+
+        Position is given the same way as Surface.get_rect, e.g.
+        center=(400, 60) or topleft=(10, 10). Returns the blitted rect.
+        """
+        surface = self.render(text, size, color, antialias)
+        rect = surface.get_rect(**position)
+        target.blit(surface, rect)
+        return rect
+
+    def clear(self):
+        """Drop every cached surface (fonts are kept)"""
+        self.surfaces.clear()
+        self.used_bytes = 0
+
+
+def surface_bytes(surface):
+    """Approximate memory used by a surface's pixels"""
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+# ============================================
+# SHARED INSTANCE
+# ============================================
+text_cache = TextCache()
+render_text = text_cache.render
+draw_text = text_cache.blit
@@ -0,0 +1,273 @@
+"""
+Monte Carlo difficulty tuner for the cyclist game.
+
+Sweeps the spawn and speed numbers in SimConfig over a grid or a random
+search, runs many seeded simulated games per configuration on a process
+pool (one worker per core by default) and streams every run's outcome
+to a CSV file as results come back, so even millions of runs never sit
+in memory. A per-configuration summary of survival time, score and lives
+lost is written at the end from fixed-size streaming histograms.
+
+Example:
+    python tuner.py --speed 4 5 6 --coin-rate 90 120 --runs 20000
+    python tuner.py --search random --samples 50 --runs 5000 --out sweep.csv.gz
+"""
+import argparse
+import csv
+import gzip
+import itertools
+import os
+import random
+import time
+from dataclasses import replace
+from multiprocessing import Pool
+
+import numpy as np
+
+import batch_sim
+from game_sim import SimConfig
+
+# ============================================
+# SETTINGS
+# ============================================
+# Parameters the tuner may vary, mapped to their SimConfig field
+TUNABLES = {
+    "speed": "base_obstacle_speed",
+    "gap_min": "obstacle_gap_min",
+    "gap_max": "obstacle_gap_max",
+    "coin_rate": "coin_spawn_rate",
+    "heart_rate": "heart_spawn_rate",
+    "decay": "easy_decay",
+}
+INTEGER_TUNABLES = {"gap_min", "gap_max", "coin_rate", "heart_rate"}
+
+POLICIES = {
+    "never": batch_sim.never_jump,
+    "close": batch_sim.jump_when_close,
+    "sloppy": batch_sim.sloppy_jumper,
+}
+
+RUN_COLUMNS = ["config_id", "chunk", "run", "ticks_survived", "seconds_survived",
+               "score", "coins_collected", "lives_lost", "finished"]
+
+# ============================================
+# SEARCH SPACE
+# ============================================
+
+def grid_configs(values):
+    """Every combination of the listed values"""
+    names = list(values)
+    for combo in itertools.product(*(values[name] for name in names)):
+        yield dict(zip(names, combo))
+
+
+def random_configs(values, samples, seed):
+    """Random points between the smallest and largest value given for each parameter"""
+    rng = random.Random(seed)
+    for _ in range(samples):
+        params = {}
+        for name, options in values.items():
+            low, high = min(options), max(options)
+            if name in INTEGER_TUNABLES:
+                params[name] = rng.randint(int(low), int(high))
+            else:
+                params[name] = round(rng.uniform(low, high), 4)
+        yield params
+
+
+def make_config(params, base=None):
+    """SimConfig with the tuned parameters applied (breaks off - nobody answers quizzes here)"""
+    fields = {TUNABLES[name]: value for name, value in params.items()}
+    config = replace(base or SimConfig(), breaks_enabled=False, **fields)
+    if config.obstacle_gap_max < config.obstacle_gap_min:
+        config = replace(config, obstacle_gap_max=config.obstacle_gap_min)
+    return config
+
+# ============================================
+# WORKER
+# ============================================
+
+def run_chunk(task):
+    """Run one seeded chunk of games for one configuration (runs in a worker process)"""
+    config_id, chunk, params, n_games, seed, policy_name, max_ticks = task
+    batch = batch_sim.BatchSimulation(n_games, make_config(params), seed=seed)
+    results = batch.run(POLICIES[policy_name], max_ticks)
+    return config_id, chunk, results
+
+
+def make_tasks(configs, runs, chunk_size, seed, policy, max_ticks):
+    """One task per chunk of runs, each with its own independent seed"""
+    seeds = np.random.SeedSequence(seed)
+    for config_id, params in enumerate(configs):
+        for chunk, start in enumerate(range(0, runs, chunk_size)):
+            n_games = min(chunk_size, runs - start)
+            chunk_seed = seeds.spawn(1)[0]
+            yield (config_id, chunk, params, n_games, chunk_seed, policy, max_ticks)
+
+# ============================================
+# STREAMING SUMMARY
+# ============================================
+
+class StreamingHistogram:
+    """Fixed-bin histogram that can report percentiles without keeping samples"""
+
+    def __init__(self, upper, bins=1000):
+        self.edges = np.linspace(0, upper, bins + 1)
+        self.counts = np.zeros(bins + 1, dtype=np.int64)  # last bin holds overflow
+        self.total = 0.0
+        self.n = 0
+
+    def add(self, values):
+        index = np.searchsorted(self.edges, values, side="right") - 1
+        np.add.at(self.counts, np.clip(index, 0, len(self.counts) - 1), 1)
+        self.total = self.total + float(values.sum())
+        self.n = self.n + len(values)
+
+    def mean(self):
+        return self.total / self.n if self.n else 0.0
+
+    def percentile(self, q):
+        if not self.n:
+            return 0.0
+        rank = np.searchsorted(np.cumsum(self.counts), q / 100 * self.n)
+        return float(self.edges[min(rank, len(self.edges) - 1)])
+
+
+class ConfigSummary:
+    """Survival, score and lives-lost distributions for one configuration"""
+
+    def __init__(self, params, max_ticks, tick_rate, max_lives):
+        self.params = params
+        self.tick_rate = tick_rate
+        self.survival = StreamingHistogram(max_ticks / tick_rate)
+        self.score = StreamingHistogram(max(1000, max_ticks // 5))
+        self.lives_lost = np.zeros(max_lives + max_ticks // 600 + 2, dtype=np.int64)
+        self.finished = 0
+
+    def add(self, results):
+        self.survival.add(results["ticks_survived"] / self.tick_rate)
+        self.score.add(results["score"])
+        lost = np.minimum(results["lives_lost"], len(self.lives_lost) - 1)
+        np.add.at(self.lives_lost, lost, 1)
+        self.finished = self.finished + int(results["finished"].sum())
+
+    def row(self, config_id):
+        n = self.survival.n
+        row = {"config_id": config_id}
+        row.update(self.params)
+        row.update({
+            "runs": n,
+            "game_over_rate": round(self.finished / n, 4) if n else 0,
+            "survival_mean_s": round(self.survival.mean(), 2),
+            "survival_p10_s": round(self.survival.percentile(10), 2),
+            "survival_p50_s": round(self.survival.percentile(50), 2),
+            "survival_p90_s": round(self.survival.percentile(90), 2),
+            "score_mean": round(self.score.mean(), 1),
+            "score_p10": round(self.score.percentile(10), 1),
+            "score_p50": round(self.score.percentile(50), 1),
+            "score_p90": round(self.score.percentile(90), 1),
+            "lives_lost_mean": round(float(np.dot(np.arange(len(self.lives_lost)), self.lives_lost)) / n, 3) if n else 0,
+            "lives_lost_hist": " ".join(str(int(c)) for c in np.trim_zeros(self.lives_lost, "b")),
+        })
+        return row
+
+# ============================================
+# OUTPUT
+# ============================================
+
+def open_output(path):
+    """Open a CSV for streaming writes; a .gz suffix compresses it"""
+    if path.endswith(".gz"):
+        return gzip.open(path, "wt", newline="")
+    return open(path, "w", newline="")
+
+
+def write_run_rows(writer, config_id, chunk, results, tick_rate):
+    """Write one CSV row per simulated game in this chunk"""
+    ticks = results["ticks_survived"]
+    columns = zip(ticks, ticks / tick_rate, results["score"], results["coins_collected"],
+                  results["lives_lost"], results["finished"])
+    for run, (t, seconds, score, coins, lost, finished) in enumerate(columns):
+        writer.writerow((config_id, chunk, run, int(t), round(float(seconds), 3),
+                         int(score), int(coins), int(lost), int(finished)))
+
+# ============================================
+# SWEEP
+# ============================================
+
+def sweep(configs, runs, chunk_size=1000, seed=0, policy="sloppy", max_ticks=36000,
+          workers=None, out_path="tuning_runs.csv", summary_path="tuning_summary.csv"):
+    """Run the sweep and return the list of per-configuration summary rows"""
+    configs = list(configs)
+    base = SimConfig()
+    summaries = [ConfigSummary(params, max_ticks, base.tick_rate, base.max_lives) for params in configs]
+    tasks = make_tasks(configs, runs, chunk_size, seed, policy, max_ticks)
+    total_chunks = len(configs) * -(-runs // chunk_size)
+
+    started = time.perf_counter()
+    with open_output(out_path) as f, Pool(workers or os.cpu_count()) as pool:
+        writer = csv.writer(f)
+        writer.writerow(RUN_COLUMNS)
+        for done, (config_id, chunk, results) in enumerate(pool.imap_unordered(run_chunk, tasks), 1):
+            write_run_rows(writer, config_id, chunk, results, base.tick_rate)
+            summaries[config_id].add(results)
+            if done % 10 == 0 or done == total_chunks:
+                elapsed = time.perf_counter() - started
+                print(f"  {done}/{total_chunks} chunks, {done * chunk_size / elapsed:,.0f} runs/s", flush=True)
+
+    rows = [summary.row(config_id) for config_id, summary in enumerate(summaries)]
+    if rows:
+        with open(summary_path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+    return rows
+
+
+def parse_args(argv=None):
+    defaults = SimConfig()
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--search", choices=["grid", "random"], default="grid")
+    parser.add_argument("--samples", type=int, default=20, help="configurations to try in a random search")
+    parser.add_argument("--speed", type=float, nargs="+", default=[defaults.base_obstacle_speed])
+    parser.add_argument("--gap-min", type=int, nargs="+", default=[defaults.obstacle_gap_min],
+                        help="pixels between one obstacle and the next")
+    parser.add_argument("--gap-max", type=int, nargs="+", default=[defaults.obstacle_gap_max])
+    parser.add_argument("--coin-rate", type=int, nargs="+", default=[defaults.coin_spawn_rate])
+    parser.add_argument("--heart-rate", type=int, nargs="+", default=[defaults.heart_spawn_rate])
+    parser.add_argument("--decay", type=float, nargs="+", default=[defaults.easy_decay],
+                        help="speed lost per tick once the game gets easier after score 300")
+    parser.add_argument("--runs", type=int, default=10000, help="simulated games per configuration")
+    parser.add_argument("--chunk", type=int, default=1000, help="games per worker task")
+    parser.add_argument("--max-ticks", type=int, default=36000, help="cap on game length (60 ticks = 1 second)")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="sloppy")
+    parser.add_argument("--workers", type=int, default=None, help="default: one per CPU core")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="tuning_runs.csv", help="per-run CSV (.gz to compress)")
+    parser.add_argument("--summary", default="tuning_summary.csv")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    values = {name: getattr(args, name) for name in TUNABLES}
+
+    if args.search == "grid":
+        configs = list(grid_configs(values))
+    else:
+        configs = list(random_configs(values, args.samples, args.seed))
+
+    print(f"Tuning {len(configs)} configuration(s) x {args.runs} runs with the '{args.policy}' policy")
+    rows = sweep(configs, args.runs, args.chunk, args.seed, args.policy, args.max_ticks,
+                 args.workers, args.out, args.summary)
+
+    for row in rows:
+        params = ", ".join(f"{name}={row[name]}" for name in TUNABLES)
+        print(f"[{row['config_id']}] {params}: survival p50 {row['survival_p50_s']}s, "
+              f"score p50 {row['score_p50']}, lives lost {row['lives_lost_mean']}, "
+              f"game over {row['game_over_rate']:.0%}")
+    print(f"Runs written to {args.out}, summary to {args.summary}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Retained-mode screens for the cyclist game.
+
+The start, pause, break-quiz, break and game-over screens hardly ever
+change while they are up, so instead of drawing a dozen text lines onto
+the screen every frame, each one is composed once into a full-screen
+surface and kept. It is only rebuilt when its key - the values shown on
+it, such as the score, the skills list or what the player has typed -
+changes. Between rebuilds the screen is one blit of the same surface,
+which DirtyRenderer recognises as unchanged and doesn't repaint at all.
+"""
+
+# ============================================
+# RETAINED SCREEN
+# ============================================
+
+class RetainedScreen:
+    """A full-screen surface painted by `paint` and rebuilt only when its key changes"""
+
+    def __init__(self, paint):
+        self.paint = paint
+        self.key = None
+        self.surface = None
+        self.builds = 0
+
+    def get(self, key, base, *args):
+        """
+        The composed surface for this key
+
+        On a rebuild `base` (usually the background) is copied and
+        paint(surface, *args) draws the screen onto the copy.
+        """
+        if self.surface is None or key != self.key:
+            surface = base.copy()
+            self.paint(surface, *args)
+            self.surface = surface
+            self.key = key
+            self.builds = self.builds + 1
+        return self.surface
+
+    def clear(self):
+        """Forget the cached surface, e.g. after the background changed"""
+        self.surface = None
+        self.key = None
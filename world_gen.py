@@ -0,0 +1,258 @@
+"""
+Chunked world generation for the cyclist game.
+
+The course ahead of the player is built in chunks: fixed lengths of
+track (CHUNK_LENGTH pixels) holding the obstacles, coins and hearts that
+sit on them, at x offsets from the start of the chunk. GameSimulation
+takes the next chunk whenever the course it has loaded gets within
+LOOKAHEAD pixels of the right edge of the screen, copies its contents
+into the entity rings, and hands the chunk back to be reused.
+
+Where chunks come from:
+
+- SeededCourse generates them. Chunk i draws its random numbers from an
+  RNG seeded with (seed, i), so a run's course depends only on its seed,
+  never on when or on which thread the chunks were made.
+- Course replays a fixed course from a JSON file in courses/ (for
+  events), looping at its end:
+
+      {"chunk_length": 1200,
+       "chunks": [{"obstacles": [0, 450], "coins": [[300, 275]], "hearts": []}]}
+
+A WorldStream hands out the chunks. Inline (the default) it fills a chunk
+when asked; with threaded=True a worker thread keeps a few chunks ready
+ahead of time. Either way there are only ever POOL_CHUNKS Chunk objects:
+used ones go back to the pool and are refilled in place, so memory and
+generation cost per chunk stay the same however long a session runs.
+"""
+import copy
+import json
+import os
+import queue
+import random
+import threading
+
+# ============================================
+# SETTINGS
+# ============================================
+CHUNK_LENGTH = 1200  # Pixels of course per chunk
+LOOKAHEAD = 200      # Load the next chunk when the course ends this close to the screen's right edge
+POOL_CHUNKS = 4      # Chunks in existence per stream (ready, being filled or in use)
+COURSE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "courses")
+
+# ============================================
+# CHUNKS
+# ============================================
+
+class Chunk:
+    """One stretch of course; its lists are cleared and refilled, never replaced"""
+
+    def __init__(self):
+        self.index = 0
+        self.length = CHUNK_LENGTH
+        self.obstacles = []   # x offsets from the chunk's start, ascending
+        self.coins = []       # (x, y), ascending x
+        self.hearts = []      # (x, y), ascending x
+
+    def clear(self):
+        del self.obstacles[:]
+        del self.coins[:]
+        del self.hearts[:]
+
+# ============================================
+# CHUNK SOURCES
+# ============================================
+
+class SeededCourse:
+    """
+    Random course with the game's spacing rules
+
+    Obstacles are obstacle_gap_min..obstacle_gap_max apart. Coins and
+    hearts are as far apart as they used to spawn at the starting speed
+    (spawn rate in ticks times base speed), so they now come at fixed
+    distances along the course rather than fixed times. Spacing carries
+    over from one chunk to the next, so chunk borders don't show.
+    """
+
+    def __init__(self, config, seed, ground_y, coin_height, chunk_length=CHUNK_LENGTH):
+        self.config = config
+        self.seed = seed
+        self.ground_y = ground_y
+        self.coin_height = coin_height
+        self.chunk_length = chunk_length
+        self.coin_spacing = config.coin_spawn_rate * config.base_obstacle_speed
+        self.heart_spacing = config.heart_spawn_rate * config.base_obstacle_speed
+
+        self.index = 0
+        # Where the next of each item goes, from the start of the next chunk
+        self.next_obstacle = 0
+        self.next_coin = self.coin_spacing
+        self.next_heart = self.heart_spacing
+
+    def fill(self, chunk):
+        config = self.config
+        length = self.chunk_length
+        rng = random.Random(f"{self.seed}:{self.index}")
+        chunk.clear()
+        chunk.index = self.index
+        chunk.length = length
+
+        x = self.next_obstacle
+        while x < length:
+            chunk.obstacles.append(x)
+            x = x + rng.randint(config.obstacle_gap_min, config.obstacle_gap_max)
+        self.next_obstacle = x - length
+
+        x = self.next_coin
+        while x < length:
+            # Half the coins sit on the ground, half are up where a jump reaches
+            if rng.random() < 0.5:
+                coin_y = self.ground_y - self.coin_height
+            else:
+                coin_y = self.ground_y - 100 - rng.randint(0, 50)
+            chunk.coins.append((x, coin_y))
+            x = x + self.coin_spacing
+        self.next_coin = x - length
+
+        x = self.next_heart
+        while x < length:
+            # Hearts appear in the air
+            chunk.hearts.append((x, self.ground_y - 80 - rng.randint(0, 40)))
+            x = x + self.heart_spacing
+        self.next_heart = x - length
+
+        self.index = self.index + 1
+
+
+class Course:
+    """A fixed course loaded from a JSON file, looped"""
+
+    def __init__(self, name_or_path):
+        path = name_or_path
+        if not os.path.exists(path):
+            path = os.path.join(COURSE_DIR, name_or_path + ".json")
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self.chunk_length = data.get("chunk_length", CHUNK_LENGTH)
+        if not is_number(self.chunk_length) or self.chunk_length <= 0:
+            raise ValueError(f"course {path}: chunk_length must be a positive number, not {self.chunk_length!r}")
+        if not data.get("chunks"):
+            raise ValueError(f"course {path} has no chunks")
+
+        # Checked and sorted once here, so fill() (maybe on the worker
+        # thread) only copies, and the rings always get ascending x
+        self.chunks = []
+        for number, layout in enumerate(data["chunks"]):
+            where = f"course {path}, chunk {number}"
+            obstacles = sorted(self.check_x(x, f"{where}, obstacle") for x in layout.get("obstacles", []))
+            coins = sorted(self.check_item(item, f"{where}, coin") for item in layout.get("coins", []))
+            hearts = sorted(self.check_item(item, f"{where}, heart") for item in layout.get("hearts", []))
+            self.chunks.append((obstacles, coins, hearts))
+        self.index = 0
+
+    def check_x(self, x, where):
+        if not is_number(x) or not 0 <= x < self.chunk_length:
+            raise ValueError(f"{where}: x must be a number from 0 up to (not including) {self.chunk_length}, not {x!r}")
+        return x
+
+    def check_item(self, item, where):
+        if not isinstance(item, list) or len(item) != 2 or not is_number(item[1]):
+            raise ValueError(f"{where}: expected [x, y], not {item!r}")
+        return (self.check_x(item[0], where), item[1])
+
+    def rewound(self):
+        """A copy that starts again from the first chunk, sharing the loaded layouts"""
+        course = copy.copy(self)
+        course.index = 0
+        return course
+
+    def fill(self, chunk):
+        obstacles, coins, hearts = self.chunks[self.index % len(self.chunks)]
+        chunk.clear()
+        chunk.index = self.index
+        chunk.length = self.chunk_length
+        chunk.obstacles.extend(obstacles)
+        chunk.coins.extend(coins)
+        chunk.hearts.extend(hearts)
+        self.index = self.index + 1
+
+
+def is_number(value):
+    # JSON true/false load as bools, which Python also counts as ints
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+# ============================================
+# WORLD STREAM
+# ============================================
+
+class WorldStream:
+    """Hands out chunks from a source, made inline or ahead of time on a worker thread"""
+
+    def __init__(self, threaded=False, pool=POOL_CHUNKS):
+        self.threaded = threaded
+        self.free = queue.SimpleQueue()
+        for _ in range(pool):
+            self.free.put(Chunk())
+        self.ready = queue.SimpleQueue()
+        self.source = None
+        self.worker = None
+
+    def restart(self, source):
+        """Start handing out chunks from a new source (a new game)"""
+        self._stop_worker()
+        # Chunks made for the old course go back to the pool (a failed
+        # worker's error is dropped with them)
+        while not self.ready.empty():
+            item = self.ready.get()
+            if isinstance(item, Chunk):
+                self.free.put(item)
+        self.source = source
+        if self.threaded:
+            self.worker = threading.Thread(target=self._work, args=(source,), name="world-gen", daemon=True)
+            self.worker.start()
+
+    def next_chunk(self):
+        """The next chunk of course; give it back with recycle() once it is copied out"""
+        if self.threaded:
+            item = self.ready.get()
+            if isinstance(item, BaseException):
+                raise item
+            return item
+        chunk = self.free.get()
+        self.source.fill(chunk)
+        return chunk
+
+    def recycle(self, chunk):
+        self.free.put(chunk)
+
+    def _work(self, source):
+        # Fill every free chunk as soon as it comes back; None means stop.
+        # If the source fails, the error goes in place of the chunk so
+        # next_chunk() raises it on the game's thread instead of waiting forever
+        while True:
+            chunk = self.free.get()
+            if chunk is None:
+                return
+            try:
+                source.fill(chunk)
+            except Exception as error:
+                self.free.put(chunk)
+                self.ready.put(error)
+                return
+            self.ready.put(chunk)
+
+    def _stop_worker(self):
+        if self.worker is not None:
+            self.free.put(None)
+            self.worker.join()
+            self.worker = None
+            # A worker that stopped on an error never took its None
+            chunks = []
+            while not self.free.empty():
+                chunks.append(self.free.get())
+            for chunk in chunks:
+                if chunk is not None:
+                    self.free.put(chunk)
+
+    def close(self):
+        self._stop_worker()